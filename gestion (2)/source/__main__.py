@@ -0,0 +1,9 @@
+# Permite ejecutar la línea de comandos con "python -m source" (o "python source")
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main
+
+sys.exit(main())
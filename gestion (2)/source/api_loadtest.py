@@ -0,0 +1,147 @@
+"""Prueba de carga de la API HTTP (api_server.py).
+
+Uso (desde la carpeta source):
+    python api_loadtest.py [--clients 20] [--requests 5000] [--writes 0.2]
+    python api_loadtest.py --url http://127.0.0.1:8765   (servidor ya en marcha)
+
+Sin --url levanta un servidor propio sobre un archivo temporal con
+--tasks tareas. Cada cliente mantiene una conexión abierta (keep-alive) y
+mezcla lecturas de tareas con actualizaciones. Informa peticiones por
+segundo y latencias p50/p99.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+
+async def request(reader, writer, method, path, body=None, headers=None):
+    """Envía una petición por una conexión abierta.
+    Devuelve (estado, cabeceras, cuerpo JSON o None)."""
+    payload = b"" if body is None else json.dumps(body).encode("utf-8")
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost",
+             f"Content-Length: {len(payload)}"]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    length = int(response_headers.get("content-length", 0))
+    data = await reader.readexactly(length) if length else b""
+    return status, response_headers, json.loads(data) if data else None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_load(host, port, task_ids, clients=20, requests=5000, writes=0.2, seed=1):
+    """Lanza los clientes y devuelve un resumen con req/s y latencias (ms)."""
+    latencies = []
+    statuses = {}
+    per_client = max(1, requests // clients)
+
+    async def client(number):
+        rng = random.Random(seed + number)
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in range(per_client):
+                task_id = rng.choice(task_ids)
+                start = time.perf_counter()
+                if rng.random() < writes:
+                    status, _, _ = await request(reader, writer, "PATCH", f"/tasks/{task_id}",
+                                                 {"priority": rng.randint(0, 10)})
+                else:
+                    status, _, _ = await request(reader, writer, "GET", f"/tasks/{task_id}")
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "statuses": statuses,
+    }
+
+
+async def _load_against(url, args):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        _, _, tasks = await request(reader, writer, "GET", "/tasks?limit=1000")
+    finally:
+        writer.close()
+    if not tasks:
+        raise SystemExit("El servidor no tiene tareas para la prueba")
+    return await run_load(parts.hostname, parts.port, [task["id"] for task in tasks],
+                          args.clients, args.requests, args.writes)
+
+
+async def _load_local(args):
+    from api_server import TaskAPI, serve
+    from cli import open_storage
+    from models import Task
+    from task_manager import TaskManager
+
+    folder = tempfile.TemporaryDirectory()
+    storage = open_storage(os.path.join(folder.name, "tasks" + args.extension))
+    manager = TaskManager(storage)
+    manager.add_tasks(Task(f"Tarea {i}", "", "General", "2025-12-01", priority=i % 10)
+                      for i in range(args.tasks))
+    server = await serve(TaskAPI(manager), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await run_load("127.0.0.1", port, [task.id for task in manager.iter_tasks()],
+                              args.clients, args.requests, args.writes)
+    finally:
+        server.close()
+        await server.wait_closed()
+        if hasattr(storage, "close"):
+            storage.close()
+        folder.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de tareas")
+    parser.add_argument("--url", help="servidor ya en marcha (p. ej. http://127.0.0.1:8765)")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--writes", type=float, default=0.2, help="fracción de escrituras")
+    parser.add_argument("--tasks", type=int, default=1000, help="tareas del servidor local")
+    parser.add_argument("--extension", default=".jsonl",
+                        help="tipo de almacenamiento del servidor local (.json, .jsonl, .db)")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        result = asyncio.run(_load_against(args.url, args))
+    else:
+        result = asyncio.run(_load_local(args))
+    print(f"{result['requests']} peticiones en {result['seconds']:.2f} s: "
+          f"{result['requests_per_second']:.0f} req/s, "
+          f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    print(f"Códigos de estado: {result['statuses']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
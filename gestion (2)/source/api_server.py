@@ -0,0 +1,386 @@
+"""API HTTP/JSON local sobre TaskManager (solo biblioteca estándar).
+
+Uso (desde la carpeta source):
+    python api_server.py [--store data/tasks.json] [--port 8765]
+
+Rutas:
+    GET    /tasks?status=&category=&due_after=&due_before=&q=&offset=&limit=
+    GET    /tasks/<id>
+    POST   /tasks                  (crea; 201)
+    PUT    /tasks/<id>             (reemplaza los campos enviados)
+    PATCH  /tasks/<id>             (igual que PUT)
+    DELETE /tasks/<id>
+
+Cada tarea lleva un número de versión calculado a partir de su contenido:
+cambia con cada modificación y sigue siendo el mismo si se reinicia el
+servidor. PUT/PATCH/DELETE aceptan la versión esperada (cabecera If-Match o
+campo "version" del cuerpo); si otro cliente la cambió antes se responde 409
+con la tarea actual, en lugar de pisar sus cambios.
+
+Las lecturas comparten un candado de lectura/escritura; las escrituras lo
+toman en exclusiva y se ejecutan en un hilo aparte para que guardar en
+disco no frene al resto de las conexiones.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 1 << 20
+EDITABLE_FIELDS = ("title", "description", "category", "deadline", "priority", "status")
+TEXT_FIELDS = ("title", "description", "category", "deadline", "status")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, body=None):
+        super().__init__(message)
+        self.status = status
+        self.body = body if body is not None else {"error": message}
+
+
+class RWLock:
+    """Candado de lectura/escritura para asyncio.
+
+    Varios lectores pueden entrar a la vez; un escritor entra solo. Los
+    escritores en espera tienen preferencia para que las lecturas continuas
+    no los dejen esperando para siempre."""
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    async def acquire_read(self):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    async def acquire_write(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+
+    async def release_write(self):
+        async with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class TaskAPI:
+    """Traduce las peticiones HTTP a operaciones de TaskManager."""
+
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        self.lock = RWLock()
+        # Versión por tarea (un resumen de su contenido), memorizada desde
+        # que se pide hasta que la tarea cambia
+        self._versions = {}
+        task_manager.subscribe(self._on_task_change)
+
+    def _on_task_change(self, event, payload):
+        # Cualquier cambio (también los de reprioritize) mueve la versión
+        if event in ("added", "updated"):
+            self._versions.pop(payload.id, None)
+        elif event == "deleted":
+            self._versions.pop(payload, None)
+
+    def version(self, task):
+        # No depende de este proceso: tras reiniciar, una versión vieja
+        # sigue sin coincidir. 48 bits para que un cliente JavaScript la
+        # represente sin perder precisión
+        version = self._versions.get(task.id)
+        if version is None:
+            content = json.dumps(task.to_dict(), sort_keys=True, ensure_ascii=False)
+            digest = hashlib.blake2b(content.encode("utf-8"), digest_size=6).digest()
+            version = self._versions[task.id] = int.from_bytes(digest, "big")
+        return version
+
+    def _to_json(self, task):
+        data = dict(task.to_dict())
+        data["version"] = self.version(task)
+        return data
+
+    async def handle(self, method, target, headers, body):
+        """Devuelve (estado, cuerpo, cabeceras extra)."""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if not parts or parts[0] != "tasks" or len(parts) > 2:
+            raise HTTPError(404, "Ruta desconocida")
+        task_id = parts[1] if len(parts) == 2 else None
+
+        if method == "GET":
+            await self.lock.acquire_read()
+            try:
+                if task_id is None:
+                    return 200, self._list(parse_qs(url.query)), {}
+                task = self._get(task_id)
+                return 200, self._to_json(task), self._etag(task)
+            finally:
+                await self.lock.release_read()
+
+        if task_id is None:
+            if method != "POST":
+                raise HTTPError(405, "Método no permitido")
+            data = self._parse_body(body)
+            return await self._write(self._create, data)
+        if method in ("PUT", "PATCH"):
+            data = self._parse_body(body)
+            expected = self._expected_version(headers, data)
+            return await self._write(self._update, task_id, data, expected)
+        if method == "DELETE":
+            expected = self._expected_version(headers, {})
+            return await self._write(self._delete, task_id, expected)
+        raise HTTPError(405, "Método no permitido")
+
+    async def _write(self, operation, *args):
+        # Una escritura a la vez, fuera del bucle de eventos
+        await self.lock.acquire_write()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, operation, *args)
+        finally:
+            await self.lock.release_write()
+
+    # --- lecturas (con el candado de lectura) ---
+    def _list(self, params):
+        def param(name):
+            values = params.get(name)
+            return values[0] if values else None
+
+        try:
+            offset = int(param("offset") or 0)
+            limit = int(param("limit")) if param("limit") else None
+        except ValueError:
+            raise HTTPError(400, "offset y limit deben ser números")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise HTTPError(400, "offset y limit no pueden ser negativos")
+
+        filters = {name: param(name) for name in ("status", "category", "due_after", "due_before")}
+        if param("q") or any(filters.values()):
+            try:
+                tasks = self.task_manager.query(**filters) if any(filters.values()) else None
+            except ValueError:
+                raise HTTPError(400, "Las fechas deben tener el formato YYYY-MM-DD")
+            if param("q"):
+                # Búsqueda de texto, combinada con los filtros si los hay
+                found = self.task_manager.search(param("q"))
+                if tasks is not None:
+                    allowed = {task.id for task in tasks}
+                    found = [task for task in found if task.id in allowed]
+                tasks = found
+        elif limit is not None:
+            tasks = self.task_manager.get_page(offset, limit)
+            offset, limit = 0, None
+        else:
+            tasks = self.task_manager.get_all_tasks()
+
+        end = None if limit is None else offset + limit
+        return [self._to_json(task) for task in tasks[offset:end]]
+
+    def _get(self, task_id):
+        task = self.task_manager.get_task(task_id)
+        if task is None:
+            raise HTTPError(404, f"No existe la tarea {task_id}")
+        return task
+
+    def _etag(self, task):
+        return {"ETag": f'"{self.version(task)}"'}
+
+    # --- escrituras (en exclusiva, en un hilo del ejecutor) ---
+    def _create(self, data):
+        from models import Task
+        fields = {name: data[name] for name in EDITABLE_FIELDS if name in data}
+        if not fields.get("title") or not fields.get("deadline"):
+            raise HTTPError(400, "title y deadline son obligatorios")
+        task = self._build(Task.from_dict, fields)
+        self.task_manager.add_task(task)
+        return 201, self._to_json(task), self._etag(task)
+
+    def _update(self, task_id, data, expected):
+        from models import Task
+        current = self._get(task_id)
+        self._check_version(current, expected)
+        fields = dict(current.to_dict())
+        fields.update((name, data[name]) for name in EDITABLE_FIELDS if name in data)
+        # Se reemplaza por una tarea nueva: nadie ve la tarea a medio cambiar
+        task = self._build(Task.from_dict, fields)
+        self.task_manager.update_task(task)
+        return 200, self._to_json(task), self._etag(task)
+
+    def _delete(self, task_id, expected):
+        current = self._get(task_id)
+        self._check_version(current, expected)
+        self.task_manager.delete_task(task_id)
+        return 204, None, {}
+
+    def _check_version(self, current, expected):
+        if expected is not None and expected != self.version(current):
+            raise HTTPError(409, "La tarea cambió desde la versión indicada",
+                            {"error": "Conflicto de versión", "task": self._to_json(current)})
+
+    @staticmethod
+    def _build(from_dict, fields):
+        # Se valida todo antes de tocar TaskManager: una tarea con un campo
+        # de otro tipo fallaría a mitad del alta, ya dentro del índice
+        for name in TEXT_FIELDS:
+            if name in fields and not isinstance(fields[name], str):
+                raise HTTPError(400, f"{name} debe ser texto")
+        if "deadline" in fields:
+            try:
+                datetime.strptime(fields["deadline"], "%Y-%m-%d")
+            except ValueError:
+                raise HTTPError(400, "deadline debe tener el formato YYYY-MM-DD")
+        if "priority" in fields:
+            try:
+                fields["priority"] = int(fields["priority"])
+            except (TypeError, ValueError, OverflowError):
+                raise HTTPError(400, "priority debe ser un número entero")
+        return from_dict(fields)
+
+    @staticmethod
+    def _parse_body(body):
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "El cuerpo debe ser JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "El cuerpo debe ser un objeto JSON")
+        return data
+
+    @staticmethod
+    def _expected_version(headers, data):
+        value = headers.get("if-match", data.get("version"))
+        if value is None:
+            return None
+        try:
+            return int(str(value).strip('"'))
+        except ValueError:
+            raise HTTPError(400, "Versión no válida")
+
+
+# ===========================
+# SERVIDOR HTTP/1.1 MÍNIMO
+# ===========================
+async def _read_request(reader):
+    # Devuelve (método, destino, cabeceras, cuerpo) o None si se cerró la conexión
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Petición mal formada")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length no válido")
+    if length < 0:
+        raise HTTPError(400, "Content-Length no válido")
+    if length > MAX_BODY:
+        raise HTTPError(413, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _write_response(writer, status, body, extra_headers=None, keep_alive=True):
+    payload = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+             f"Content-Length: {len(payload)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if body is not None:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    lines.extend(f"{name}: {value}" for name, value in (extra_headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+
+
+async def serve(api, host="127.0.0.1", port=8765):
+    """Crea el servidor asyncio (sin arrancar el bucle: usar serve_forever)."""
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                request = None
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, response, extra = await api.handle(method, target, headers, body)
+                except HTTPError as e:
+                    status, response, extra = e.status, e.body, {}
+                    if request is None:
+                        # Falló la lectura (p. ej. 413 sin leer el cuerpo): lo
+                        # que sigue en la conexión no es una petición, se cierra
+                        keep_alive = False
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, response, extra, keep_alive = 500, {"error": str(e)}, {}, False
+                _write_response(writer, status, response, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle_connection, host, port)
+
+
+def main(argv=None):
+    from cli import default_store, open_storage
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local de tareas")
+    parser.add_argument("--store", default=default_store())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    from task_manager import TaskManager
+    storage = open_storage(args.store)
+    api = TaskAPI(TaskManager(storage))
+
+    async def run():
+        server = await serve(api, args.host, args.port)
+        print(f"Escuchando en http://{args.host}:{args.port}/tasks")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if hasattr(storage, "close"):
+            storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
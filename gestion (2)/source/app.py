@@ -1,4 +1,5 @@
 import os
+from storage_async import AsyncStorage, StorageWorker
 from storage_json import JSONStorage
 from task_manager import TaskManager
 from ui import TaskUI
@@ -19,13 +20,15 @@ def run_app():
 
     print(f"Guardando datos en: {tasks_file}")  # verificar la ruta
 
-    storage = JSONStorage(tasks_file)
+    # La lectura y escritura del archivo se hacen en un hilo aparte
+    worker = StorageWorker()
+    storage = AsyncStorage(JSONStorage(tasks_file), worker)
 
-    # Administrador de tareas
-    manager = TaskManager(storage)
+    # Administrador de tareas (las tareas se cargan desde la interfaz)
+    manager = TaskManager(storage, load=False)
 
     # Interfaz gráfica
-    ui = TaskUI(manager)
+    ui = TaskUI(manager, worker=worker)
     ui.run()
 
 
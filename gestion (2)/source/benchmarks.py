@@ -0,0 +1,374 @@
+"""Benchmarks reproducibles del sistema de tareas.
+
+Uso (desde la carpeta source):
+    python benchmarks.py                         # 1k, 10k y 100k tareas
+    python benchmarks.py --sizes 1000 1000000 10000000
+    python benchmarks.py --save-baseline         # guarda la línea base
+    python benchmarks.py --threshold 0.25        # falla si algo empeora > 25 %
+
+Las tareas se generan con una semilla fija (mismos datos en cada corrida):
+categorías y estados con distribución sesgada, fechas límite concentradas
+en las próximas semanas (algunas vencidas) y textos en castellano.
+
+Cada caso corre en --processes procesos nuevos (salvo --in-process) y cada
+medición es el mejor de --repeat intentos por proceso, con el recolector de
+basura apagado. Los resultados se guardan en --output y se comparan con
+--baseline; lo que empeora más que --threshold se vuelve a medir hasta
+--retries veces y, si sigue peor, el programa termina con código 1. Junto
+con cada caso se mide un trabajo fijo de referencia (calibrate) y la línea
+base se escala por la diferencia, para que una máquina que en ese momento
+anda más lenta no parezca una regresión. La línea base (la corrida
+mediana de --baseline-runs, por caso) depende de la máquina:
+conviene regenerarla con --save-baseline al cambiar de equipo y comprobar
+que corridas normales la pasan.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(HERE, "benchmarks_baseline.json")
+RESULTS_FILE = os.path.join(HERE, "benchmarks_results.json")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# Fecha fija: las fechas límite y las prioridades no dependen del día de la corrida
+TODAY = date(2025, 11, 1)
+# Diferencias menores a esto (segundos) se consideran ruido: el fsync de
+# save y el reparto de la CPU en una máquina compartida agregan unos
+# milisegundos que no dependen del código
+NOISE_FLOOR = 0.005
+
+# Categorías y estados con pesos sesgados (pocas categorías concentran casi todo)
+CATEGORIES = [("Universidad", 40), ("Trabajo", 25), ("Personal", 15), ("General", 8),
+              ("Hogar", 5), ("Salud", 3), ("Finanzas", 2), ("Viajes", 1), ("Deportes", 1)]
+STATUSES = [("Pendiente", 60), ("En progreso", 25), ("Completado", 15)]
+VERBS = ["Revisar", "Entregar", "Preparar", "Estudiar", "Llamar a", "Comprar", "Pagar",
+         "Organizar", "Redactar", "Corregir", "Enviar", "Planificar", "Leer", "Actualizar"]
+OBJECTS = ["el informe de laboratorio", "la presentación del proyecto", "el parcial de álgebra",
+           "la factura de luz", "el dentista", "los apuntes de física", "la reunión del equipo",
+           "el presupuesto anual", "la tesis", "el contrato", "las vacaciones de invierno",
+           "el pedido del supermercado", "la solicitud de beca", "el código de la práctica"]
+DETAILS = ["antes del viernes", "con la profesora", "según lo acordado", "versión final",
+           "revisar ortografía", "adjuntar comprobante", "pedir ayuda si hace falta",
+           "incluir gráficos", "confirmar por correo", "sin falta", "para la próxima semana"]
+
+
+def generate_tasks(n, seed=42, today=TODAY):
+    """Genera n tareas reproducibles (generador: memoria acotada)."""
+    from models import Task
+
+    rng = random.Random(seed)
+    categories = [name for name, _ in CATEGORIES]
+    category_weights = [weight for _, weight in CATEGORIES]
+    statuses = [name for name, _ in STATUSES]
+    status_weights = [weight for _, weight in STATUSES]
+    today_ordinal = today.toordinal()
+    for i in range(n):
+        # Mayoría de fechas en las próximas semanas; ~10 % ya vencidas
+        days = int(rng.expovariate(1 / 20))
+        if rng.random() < 0.1:
+            days = -days
+        deadline = date.fromordinal(today_ordinal + days).isoformat()
+        title = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+        description = ", ".join(rng.sample(DETAILS, rng.randint(0, 3)))
+        yield Task(title, description,
+                   rng.choices(categories, category_weights)[0], deadline,
+                   priority=rng.randint(0, 10),
+                   status=rng.choices(statuses, status_weights)[0],
+                   task_id=f"t{i:08d}")
+
+
+class _NullStorage:
+    # Almacenamiento que no guarda nada: mide TaskManager sin disco
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def load_all(self):
+        return self.tasks
+
+    def save_all(self, tasks):
+        pass
+
+
+def _best(func, repeat, setup=None):
+    # Mejor tiempo de repeat intentos (setup no se mide). Antes de cada
+    # intento se recolecta la basura y durante la medición el recolector
+    # queda apagado: así el tiempo no depende de lo que dejaron los casos
+    # anteriores
+    best = None
+    argument = None
+    for _ in range(repeat):
+        # Se suelta el intento anterior antes de preparar el siguiente
+        argument = None
+        argument = setup() if setup is not None else None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func(argument)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate(repeat=5):
+    """Tiempo de un trabajo fijo de referencia (diccionario de textos y un
+    ordenamiento, como los casos). Se mide junto con cada caso para comparar
+    con la línea base aunque la máquina ande más rápida o más lenta que
+    cuando se tomó."""
+    def work(_):
+        values = {str(i): i for i in range(200_000)}
+        sorted(values, key=values.get)
+    return _best(work, repeat)
+
+
+CASES = ["save", "load", "crud", "sort", "query", "search", "reprioritize", "ui_refresh"]
+
+
+def run_case(case, size, repeat=3, seed=42):
+    """Mide un caso con size tareas y devuelve los segundos (None si no se
+    puede medir, p. ej. ui_refresh sin pantalla)."""
+    from models import Task
+    from priority_strategies import DatePriorityStrategy
+    from storage_json import JSONStorage
+    from task_manager import TaskManager
+
+    ops = min(1_000, size)
+
+    # Cada intento genera sus tareas desde la semilla: nunca hay más de una
+    # copia en memoria (y los benchmarks las modifican)
+    def new_tasks():
+        return list(generate_tasks(size, seed))
+
+    def new_manager():
+        return TaskManager(_NullStorage(generate_tasks(size, seed)))
+
+    if case in ("save", "load"):
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, "tasks.json")
+            storage = JSONStorage(filename)
+            if case == "save":
+                return _best(storage.save_all, repeat, new_tasks)
+            storage.save_all(generate_tasks(size, seed))
+            return _best(lambda _: JSONStorage(filename).load_all(), repeat)
+
+    if case == "ui_refresh":
+        return _ui_refresh(new_manager(), repeat)
+
+    def crud(manager):
+        # ops altas, lecturas, cambios y bajas de una en una
+        for i in range(ops):
+            manager.add_task(Task(f"Nueva {i}", "", "General", "2025-12-01"))
+        for task in manager.get_page(0, ops):
+            task = manager.get_task(task.id)
+            task.status = "Completado"
+            manager.update_task(task)
+        for task in manager.get_page(size, ops):
+            manager.delete_task(task.id)
+
+    measured = {
+        "crud": crud,
+        "sort": lambda manager: (manager.sort_tasks(reverse=True), manager.get_all_tasks()),
+        "query": lambda manager: manager.query(status="Pendiente", category="Trabajo",
+                                               due_after="2025-11-01", due_before="2025-11-30"),
+        "search": lambda manager: manager.search("informe lab"),
+        "reprioritize": lambda manager: manager.reprioritize(DatePriorityStrategy(TODAY)),
+    }
+    return _best(measured[case], repeat, new_manager)
+
+
+def _run_isolated(case, size, repeat, seed):
+    # Corre el caso en un proceso nuevo: el tiempo no depende del estado
+    # (memoria, recolector, cachés) que dejaron los casos anteriores.
+    # Devuelve (segundos, segundos de calibrate() en ese mismo proceso)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--case", case, "--sizes", str(size),
+         "--repeat", str(repeat), "--seed", str(seed)],
+        check=True, capture_output=True, text=True, cwd=HERE).stdout
+    return tuple(json.loads(output.strip().splitlines()[-1]))
+
+
+def run_suite(sizes, repeat=3, seed=42, ui=True, log=print, isolate=False, processes=3,
+              calibration=None):
+    """Ejecuta todos los benchmarks y devuelve {"nombre/tamaño": segundos}.
+    Con isolate=True cada caso corre en processes procesos nuevos y se toma
+    el mejor: en una máquina compartida el mismo caso varía bastante de un
+    proceso a otro. Si se pasa un diccionario calibration, se llena con el
+    tiempo de calibrate() que acompaña a cada medición."""
+    results = {}
+    for size in sizes:
+        log(f"{size} tareas:")
+        reference = None if isolate else calibrate()
+        for case in CASES:
+            if case == "ui_refresh" and not ui:
+                continue
+            if isolate:
+                runs = [_run_isolated(case, size, repeat, seed) for _ in range(processes)]
+                if any(seconds is None for seconds, _ in runs):
+                    seconds = None
+                else:
+                    # El más rápido en proporción a la referencia de su proceso
+                    seconds, reference = min(runs, key=lambda run: run[0] / run[1])
+            else:
+                seconds = run_case(case, size, repeat, seed)
+            if seconds is None:
+                log("  (sin pantalla: se omite ui_refresh)")
+                ui = False
+                continue
+            results[f"{case}/{size}"] = seconds
+            if calibration is not None:
+                calibration[f"{case}/{size}"] = reference
+
+        for name in sorted(key for key in results if key.endswith(f"/{size}")):
+            log(f"  {name:<24} {results[name] * 1000:10.2f} ms")
+    return results
+
+
+def confirm(results, baseline, threshold, repeat=3, seed=42, retries=2, log=print,
+            calibration=None, baseline_calibration=None, processes=1):
+    """Vuelve a medir (en processes procesos nuevos) lo que empeoró más que
+    threshold y se queda con la mejor medición: una corrida lenta aislada no cuenta
+    como regresión. Devuelve las regresiones que persisten (ver compare)."""
+    for _ in range(retries):
+        regressions = compare(results, baseline, threshold, calibration, baseline_calibration)
+        if not regressions:
+            break
+        for name, _, _, _ in regressions:
+            case, size = name.split("/")
+            for _ in range(processes):
+                seconds, reference = _run_isolated(case, int(size), repeat, seed)
+                if calibration is not None:
+                    if seconds / reference < results[name] / calibration[name]:
+                        results[name], calibration[name] = seconds, reference
+                else:
+                    results[name] = min(results[name], seconds)
+            log(f"  {name:<24} {results[name] * 1000:10.2f} ms (repetido)")
+    return compare(results, baseline, threshold, calibration, baseline_calibration)
+
+
+def _ui_refresh(manager, repeat):
+    # Tiempo de refresh_list con la tabla ya creada; None si no hay pantalla
+    try:
+        from ui import TaskUI
+        task_ui = TaskUI(manager)
+    except Exception:
+        return None
+    try:
+        return _best(lambda _: (task_ui.refresh_list(), task_ui.root.update_idletasks()), repeat)
+    finally:
+        task_ui.root.destroy()
+
+
+def compare(results, baseline, threshold, calibration=None, baseline_calibration=None):
+    """Devuelve [(nombre, base, actual, cambio)] de lo que empeoró más que
+    threshold. Con las calibraciones de ambas corridas, la base se lleva
+    antes a la velocidad actual de la máquina."""
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if calibration and baseline_calibration and baseline_calibration.get(name):
+            previous *= calibration[name] / baseline_calibration[name]
+        if current > previous * (1 + threshold) and current - previous > NOISE_FLOOR:
+            regressions.append((name, previous, current, current / previous - 1))
+    return regressions
+
+
+def _write(filename, results, seed, calibration=None):
+    data = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "seed": seed, "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "results": results,
+        "calibration": calibration,
+    }
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de tareas")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=3,
+                        help="procesos por caso (se toma el mejor)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="empeoramiento tolerado (0.25 = 25 %%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guardar estos resultados como línea base")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="corridas completas para la línea base (se guarda la mediana)")
+    parser.add_argument("--no-ui", action="store_true", help="no medir la interfaz")
+    parser.add_argument("--in-process", action="store_true",
+                        help="correr todos los casos en este proceso (más rápido, más ruido)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="veces que se vuelve a medir una regresión antes de darla por buena")
+    parser.add_argument("--case", choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case is not None:
+        # Uso interno de _run_isolated: un caso y un tamaño, resultado en JSON
+        reference = calibrate()
+        print(json.dumps([run_case(args.case, args.sizes[0], args.repeat, args.seed),
+                          reference]))
+        return 0
+
+    # La línea base es la mediana de varias corridas: una sola puede caer
+    # en un momento especialmente rápido (o lento) de la máquina
+    runs = []
+    for _ in range(args.baseline_runs if args.save_baseline else 1):
+        calibration = {}
+        results = run_suite(args.sizes, args.repeat, args.seed, ui=not args.no_ui,
+                            isolate=not args.in_process, processes=args.processes,
+                            calibration=calibration)
+        runs.append((results, calibration))
+    # Por caso se toma la corrida con la proporción mediana frente a su
+    # referencia (tiempo y calibración de la misma medición)
+    results, calibration = {}, {}
+    for name in runs[0][0]:
+        pairs = sorted(((run[name], reference[name]) for run, reference in runs if name in run),
+                       key=lambda pair: pair[0] / pair[1])
+        if len(pairs) == len(runs):
+            results[name], calibration[name] = pairs[len(pairs) // 2]
+    if args.save_baseline:
+        _write(args.output, results, args.seed, calibration)
+        _write(args.baseline, results, args.seed, calibration)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        _write(args.output, results, args.seed)
+        print("No hay línea base para comparar (usar --save-baseline)")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        data = json.load(f)
+    baseline = data["results"]
+    regressions = confirm(results, baseline, args.threshold, args.repeat, args.seed,
+                          args.retries, calibration=calibration,
+                          baseline_calibration=data.get("calibration"),
+                          processes=args.processes)
+    _write(args.output, results, args.seed, calibration)
+    for name, previous, current, change in regressions:
+        print(f"REGRESIÓN {name}: {previous * 1000:.2f} ms -> {current * 1000:.2f} ms "
+              f"(+{change:.0%})")
+    if regressions:
+        return 1
+    print(f"Sin regresiones mayores al {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
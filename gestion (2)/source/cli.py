@@ -0,0 +1,294 @@
+"""Línea de comandos sin interfaz gráfica.
+
+Uso (desde la carpeta source, o con python -m source desde la raíz):
+    python -m cli list [--sort] [--limit N]
+    python -m cli add "Título" --deadline 2025-12-31 [--category C] [--priority N]
+    python -m cli done ID
+    python -m cli query [--status S] [--category C] [--due-after F] [--due-before F]
+    python -m cli reprioritize [--strategy date|category]
+    python -m cli stats [--json]
+    python -m cli import|export ARCHIVO [--format csv|jsonl]
+
+Opciones generales: --metrics informe.json|informe.prom guarda métricas de
+la ejecución; --profile perfil.out la perfila con cProfile y tracemalloc.
+
+Los módulos se importan solo cuando un comando los necesita (nunca tkinter),
+así el arranque es rápido y funciona en servidores sin pantalla.
+"""
+import argparse
+import json
+import os
+import sys
+from itertools import islice
+
+
+FIELDS = ["id", "title", "description", "category", "deadline", "priority", "status"]
+
+
+def default_store():
+    # El mismo archivo que usa la aplicación gráfica (data/tasks.json)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "tasks.json")
+
+
+def open_storage(filename, bulk=False):
+    """Elige el almacenamiento según la extensión del archivo:
+    .jsonl -> JournalStorage, .db/.sqlite -> SQLiteStorage,
+    .snap -> SnapshotStorage (binaria columnar), otro -> JSONStorage.
+    Con bulk=True, JSONStorage agrupa todas las escrituras hasta close()."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".jsonl":
+        from storage_journal import JournalStorage
+        return JournalStorage(filename)
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        from storage_sqlite import SQLiteStorage
+        return SQLiteStorage(filename)
+    if extension == ".snap":
+        from storage_snapshot import SnapshotStorage
+        return SnapshotStorage(filename)
+    from storage_json import JSONStorage
+    if bulk:
+        return JSONStorage(filename, flush_every=sys.maxsize)
+    return JSONStorage(filename)
+
+
+def _detect_format(filename, format):
+    if format:
+        return format
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_records(f, format):
+    # Genera diccionarios desde CSV o JSON Lines, uno por fila (streaming)
+    if format == "csv":
+        import csv
+        for row in csv.DictReader(f):
+            # Las celdas vacías toman el valor por defecto de Task
+            record = {key: value for key, value in row.items() if key in FIELDS and value}
+            if "priority" in record:
+                record["priority"] = int(record["priority"])
+            yield record
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_records(f, tasks, format):
+    count = 0
+    if format == "csv":
+        import csv
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for task in tasks:
+            writer.writerow(task.to_dict())
+            count += 1
+    else:
+        for task in tasks:
+            f.write(json.dumps(task.to_dict(), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def import_tasks(manager, filename, format=None, batch_size=10000):
+    """Importa tareas por lotes: cada lote se guarda con una sola operación."""
+    from models import Task
+    format = _detect_format(filename, format)
+    total = 0
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        tasks = Task.from_dicts(read_records(f, format))
+        while True:
+            batch = list(islice(tasks, batch_size))
+            if not batch:
+                break
+            manager.add_tasks(batch)
+            total += len(batch)
+    return total
+
+
+def export_tasks(manager, filename, format=None):
+    """Exporta las tareas recorriéndolas sin armar una lista completa."""
+    format = _detect_format(filename, format)
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        return write_records(f, manager.iter_tasks(), format)
+
+
+def format_task(task):
+    data = task.to_dict()
+    return "\t".join(str(data[field]) for field in
+                     ("id", "deadline", "priority", "status", "category", "title"))
+
+
+# ===========================
+# COMANDOS
+# ===========================
+def cmd_list(manager, args):
+    if args.sort:
+        manager.sort_tasks(reverse=True)
+    if args.sort and args.limit is not None:
+        # Solo las primeras: índice de prioridad o LIMIT en la base de datos
+        tasks = manager.top_k(args.limit)
+    else:
+        tasks = manager.iter_tasks()
+        if args.limit is not None:
+            tasks = islice(tasks, args.limit)
+    for task in tasks:
+        print(format_task(task))
+    return 0
+
+
+def cmd_query(manager, args):
+    tasks = manager.query(status=args.status, category=args.category,
+                          due_after=args.due_after, due_before=args.due_before)
+    for task in tasks:
+        print(format_task(task))
+    return 0
+
+
+def cmd_add(manager, args):
+    from models import Task
+    task = Task(args.title, args.description, args.category, args.deadline,
+                priority=args.priority, status=args.status)
+    manager.add_task(task)
+    print(task.id)
+    return 0
+
+
+def cmd_done(manager, args):
+    task = manager.get_task(args.id)
+    if task is None:
+        print(f"No existe la tarea {args.id}", file=sys.stderr)
+        return 1
+    task.status = "Completado"
+    manager.update_task(task)
+    return 0
+
+
+def cmd_reprioritize(manager, args):
+    import priority_strategies
+    strategy = {
+        "date": priority_strategies.DatePriorityStrategy,
+        "category": priority_strategies.CategoryPriorityStrategy,
+    }[args.strategy]()
+    changed = manager.reprioritize(strategy)
+    print(f"{len(changed)} tareas cambiaron de prioridad")
+    return 0
+
+
+def cmd_stats(manager, args):
+    summary = manager.statistics().summary()
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=4))
+        return 0
+    print(f"Total: {summary['total']}")
+    print(f"Vencidas: {summary['overdue']}")
+    for title, counts in (("Por estado", summary["by_status"]),
+                          ("Por categoría", summary["by_category"]),
+                          ("Por semana de vencimiento", summary["due_by_week"])):
+        print(f"{title}:")
+        for key, count in counts.items():
+            print(f"  {key:<20} {count}")
+    return 0
+
+
+def cmd_import(manager, args):
+    total = import_tasks(manager, args.file, args.format, args.batch_size)
+    print(f"Importadas {total} tareas")
+    return 0
+
+
+def cmd_export(manager, args):
+    total = export_tasks(manager, args.file, args.format)
+    print(f"Exportadas {total} tareas")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Gestión de tareas sin interfaz gráfica")
+    parser.add_argument("--store", default=default_store(),
+                        help="archivo de tareas (.json, .jsonl, .db o .snap)")
+    parser.add_argument("--metrics", metavar="ARCHIVO",
+                        help="guardar métricas (.json, o .prom para Prometheus)")
+    parser.add_argument("--profile", metavar="ARCHIVO",
+                        help="perfilar con cProfile y tracemalloc")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="listar tareas")
+    list_parser.add_argument("--sort", action="store_true", help="ordenar por prioridad")
+    list_parser.add_argument("--limit", type=int)
+    list_parser.set_defaults(func=cmd_list)
+
+    add_parser = commands.add_parser("add", help="agregar una tarea")
+    add_parser.add_argument("title")
+    add_parser.add_argument("--description", default="")
+    add_parser.add_argument("--category", default="General")
+    add_parser.add_argument("--deadline", required=True, help="YYYY-MM-DD")
+    add_parser.add_argument("--priority", type=int, default=5)
+    add_parser.add_argument("--status", default="Pendiente")
+    add_parser.set_defaults(func=cmd_add)
+
+    done_parser = commands.add_parser("done", help="marcar una tarea como completada")
+    done_parser.add_argument("id")
+    done_parser.set_defaults(func=cmd_done)
+
+    query_parser = commands.add_parser("query", help="filtrar tareas")
+    query_parser.add_argument("--status")
+    query_parser.add_argument("--category")
+    query_parser.add_argument("--due-after", help="YYYY-MM-DD")
+    query_parser.add_argument("--due-before", help="YYYY-MM-DD")
+    query_parser.set_defaults(func=cmd_query)
+
+    reprioritize_parser = commands.add_parser("reprioritize", help="recalcular prioridades")
+    reprioritize_parser.add_argument("--strategy", choices=["date", "category"], default="date")
+    reprioritize_parser.set_defaults(func=cmd_reprioritize)
+
+    stats_parser = commands.add_parser("stats", help="resumen por estado, categoría y semana")
+    stats_parser.add_argument("--json", action="store_true")
+    stats_parser.set_defaults(func=cmd_stats)
+
+    import_parser = commands.add_parser("import", help="importar tareas desde CSV o JSON Lines")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"])
+    import_parser.add_argument("--batch-size", type=int, default=10000)
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = commands.add_parser("export", help="exportar tareas a CSV o JSON Lines")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"])
+    export_parser.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics or args.profile:
+        return _run_measured(args)
+    return _run(args)
+
+
+def _run(args):
+    storage = open_storage(args.store, bulk=args.command == "import")
+    try:
+        from task_manager import TaskManager
+        return args.func(TaskManager(storage), args)
+    finally:
+        if hasattr(storage, "close"):
+            storage.close()
+
+
+def _run_measured(args):
+    import contextlib
+    import metrics
+    if args.metrics:
+        metrics.enable()
+    profile = metrics.profiling(args.profile) if args.profile else contextlib.nullcontext()
+    try:
+        with profile:
+            return _run(args)
+    finally:
+        if args.metrics:
+            metrics.write_report(args.metrics)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Candado consultivo entre procesos sobre un archivo auxiliar (.lock).
+
+    Se bloquea un archivo aparte y no el de datos porque este se reemplaza
+    en cada escritura atómica. Usa fcntl.flock en POSIX y msvcrt.locking
+    en Windows. Es reentrante dentro del proceso (se puede anidar) y
+    también sirve de candado entre hilos.
+
+        with FileLock("tasks.json.lock"):
+            ...
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.filename, "a+b")
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                else:
+                    self._file.seek(0)
+                    # LK_LOCK reintenta durante unos segundos; se repite hasta lograrlo
+                    while True:
+                        try:
+                            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            pass
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def file_signature(filename):
+    """Huella barata de un archivo: (inodo, tamaño, mtime en ns), o None si
+    no existe. Cada escritura atómica crea un archivo nuevo, así que el
+    inodo funciona como número de versión aunque tamaño y hora coincidan."""
+    try:
+        st = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
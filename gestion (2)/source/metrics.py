@@ -0,0 +1,217 @@
+"""Métricas livianas: contadores e histogramas que se pueden apagar.
+
+Apagadas (lo normal) cada punto medido cuesta una comparación con el
+indicador enabled. Se activan con enable() o con variables de entorno:
+
+    TAREAS_METRICS=1                 recolecta (consultar con snapshot())
+    TAREAS_METRICS=informe.json      además escribe el informe al salir
+    TAREAS_METRICS=informe.prom      ... en formato de texto de Prometheus
+    TAREAS_PROFILE=perfil.out        cProfile + tracemalloc de toda la
+                                     ejecución (perfil.out y perfil.out.mem.txt)
+
+La línea de comandos acepta también --metrics ARCHIVO y --profile ARCHIVO.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+# Límites de los histogramas (como los "le" de Prometheus)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+enabled = False
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def inc(name, amount=1, **labels):
+    """Suma amount al contador name (con etiquetas opcionales)."""
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Registra un valor en el histograma name."""
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets),
+                                            "count": 0, "sum": 0.0}
+        for position, limit in enumerate(buckets):
+            if value <= limit:
+                histogram["counts"][position] += 1
+                break
+        histogram["count"] += 1
+        histogram["sum"] += value
+
+
+def timed(name, **labels):
+    """Decorador: mide la duración de cada llamada en el histograma name."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+
+# ===========================
+# INFORMES
+# ===========================
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+def snapshot():
+    """Copia de las métricas como diccionario (lo que se exporta en JSON)."""
+    with _lock:
+        counters = {name + _label_text(labels): value
+                    for (name, labels), value in _counters.items()}
+        histograms = {}
+        for (name, labels), histogram in _histograms.items():
+            cumulative, buckets = 0, {}
+            for limit, count in zip(histogram["buckets"], histogram["counts"]):
+                cumulative += count
+                buckets[str(limit)] = cumulative
+            histograms[name + _label_text(labels)] = {
+                "count": histogram["count"], "sum": histogram["sum"], "buckets": buckets}
+
+    derived = {}
+    loaded = counters.get("tasks_loaded_total")
+    load_time = sum(h["sum"] for key, h in histograms.items()
+                    if key.startswith("storage_load_seconds"))
+    if loaded and load_time:
+        derived["tasks_loaded_per_second"] = loaded / load_time
+    saves = histograms.get("storage_save_bytes")
+    if saves and saves["count"]:
+        derived["bytes_per_save"] = saves["sum"] / saves["count"]
+    return {"counters": counters, "histograms": histograms, "derived": derived}
+
+
+def to_prometheus():
+    """Las métricas en formato de texto de Prometheus."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, dict(h, counts=list(h["counts"])))
+                            for key, h in _histograms.items())
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_label_text(labels)} {value}")
+    for (name, labels), histogram in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for limit, count in zip(histogram["buckets"], histogram["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_label_text(labels + (('le', limit),))} {cumulative}")
+        lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {histogram['count']}")
+        lines.append(f"{name}_sum{_label_text(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{_label_text(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(filename):
+    """Escribe el informe: .prom o .txt en formato Prometheus, si no JSON."""
+    if filename.endswith((".prom", ".txt")):
+        text = to_prometheus()
+    else:
+        text = json.dumps(snapshot(), indent=4)
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+# ===========================
+# PERFILADO
+# ===========================
+@contextmanager
+def profiling(filename, top=30):
+    """Perfila el bloque con cProfile y tracemalloc.
+
+    Guarda las estadísticas de cProfile en filename (se leen con pstats o
+    snakeviz) y las líneas que más memoria reservaron en filename.mem.txt."""
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
+        memory = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        with open(filename + ".mem.txt", "w", encoding="utf-8") as f:
+            f.write(f"Memoria actual: {current / 1e6:.1f} MB, pico: {peak / 1e6:.1f} MB\n\n")
+            for stat in memory.statistics("lineno")[:top]:
+                f.write(f"{stat}\n")
+
+
+def start_profiling(filename):
+    # Perfila desde ahora hasta que termine el programa
+    context = profiling(filename)
+    context.__enter__()
+    atexit.register(context.__exit__, None, None, None)
+
+
+def configure(report=None, profile=None):
+    """Activa las métricas (y el informe al salir) y/o el perfilado."""
+    if report:
+        enable()
+        if report not in ("1", "true", "yes"):
+            atexit.register(write_report, report)
+    if profile:
+        start_profiling(profile)
+
+
+configure(os.environ.get("TAREAS_METRICS"), os.environ.get("TAREAS_PROFILE"))
@@ -1,7 +1,13 @@
+import sys
 from uuid import uuid4
-from datetime import datetime
+from datetime import date, datetime
 
 class Task:
+    # __slots__ evita el __dict__ por instancia: con millones de tareas
+    # el ahorro de memoria es considerable
+    __slots__ = ("id", "title", "description", "category", "priority", "status",
+                 "_deadline", "_dict")
+
     def __init__(self, title, description, category, deadline, priority=5, status="Pendiente", task_id=None):
         self.id = task_id if task_id else str(uuid4())
         self.title = title
@@ -9,24 +15,49 @@ class Task:
         self.category = category
         self.priority = priority
         self.status = status
+        self.deadline = deadline
+
+    def __setattr__(self, name, value):
+        # Categoría y estado se repiten mucho: se internan para compartir
+        # una sola cadena y acelerar las búsquedas por categoría
+        if (name == "category" or name == "status") and type(value) is str:
+            value = sys.intern(value)
+        # Cualquier cambio invalida la serialización en caché
+        object.__setattr__(self, name, value)
+        if name != "_dict":
+            object.__setattr__(self, "_dict", None)
 
+    # La fecha límite se guarda como ordinal (días desde 0001-01-01)
+    @property
+    def deadline(self):
+        return datetime.fromordinal(self._deadline)
+
+    @deadline.setter
+    def deadline(self, value):
         # Convertir la fecha
-        if isinstance(deadline, str):
-            self.deadline = datetime.strptime(deadline, "%Y-%m-%d")
-        else:
-            self.deadline = deadline
+        if isinstance(value, str):
+            value = datetime.strptime(value, "%Y-%m-%d")
+        self._deadline = value.toordinal()
+
+    @property
+    def deadline_ordinal(self):
+        return self._deadline
 
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "category": self.category,
-            "deadline": self.deadline.strftime("%Y-%m-%d"),
-            "priority": self.priority,
-            "status": self.status
-        }
+        # Se reutiliza el diccionario mientras la tarea no cambie.
+        # No debe modificarse: se comparte entre llamadas.
+        if self._dict is None:
+            self._dict = {
+                "id": self.id,
+                "title": self.title,
+                "description": self.description,
+                "category": self.category,
+                "deadline": date.fromordinal(self._deadline).isoformat(),
+                "priority": self.priority,
+                "status": self.status
+            }
+        return self._dict
 
 
     @staticmethod
@@ -36,7 +67,86 @@ class Task:
             description=data.get("description", ""),
             category=data.get("category", "General"),
             deadline=data.get("deadline", "2000-01-01"),
-            priority=data.get("priority", 5),
+            priority=_as_priority(data.get("priority", 5)),
             status=data.get("status", "Pendiente"),
             task_id=data.get("id")
         )
+
+
+    @staticmethod
+    def from_dicts(items):
+        """Construye tareas en bloque a partir de diccionarios (generador).
+
+        Para cargas grandes: las fechas se convierten con date.fromisoformat
+        y se memorizan (las fechas límite se repiten mucho), y los registros
+        completos se asignan sin pasar por __init__ ni por los valores por
+        defecto. Al ser un generador, las tareas se crean a medida que se
+        consumen."""
+        ordinals = {}
+        intern = sys.intern
+        new = Task.__new__
+        set_attr = object.__setattr__
+        for data in items:
+            try:
+                task_id = data["id"]
+                deadline = data["deadline"]
+                ordinal = ordinals.get(deadline)
+                if ordinal is None:
+                    ordinal = ordinals[deadline] = _parse_ordinal(deadline)
+                task = new(Task)
+                set_attr(task, "id", task_id)
+                set_attr(task, "title", data["title"])
+                set_attr(task, "description", data["description"])
+                set_attr(task, "category", intern(data["category"]))
+                priority = data["priority"]
+                if type(priority) is not int:
+                    priority = _as_priority(priority)
+                set_attr(task, "priority", priority)
+                set_attr(task, "status", intern(data["status"]))
+                set_attr(task, "_deadline", ordinal)
+                set_attr(task, "_dict", None)
+            except (KeyError, TypeError):
+                # Registro incompleto: ruta normal con valores por defecto
+                task = Task.from_dict(data)
+            if not task.id:
+                task.id = str(uuid4())
+            yield task
+
+    @staticmethod
+    def from_columns(ids, titles, descriptions, categories, deadlines, priorities, statuses):
+        """Construye tareas a partir de columnas paralelas (generador).
+
+        Las fechas límite llegan como ordinales y categoría/estado ya
+        internados, así que cada tarea se arma sin conversiones."""
+        new = Task.__new__
+        set_attr = object.__setattr__
+        for task_id, title, description, category, deadline, priority, status in zip(
+                ids, titles, descriptions, categories, deadlines, priorities, statuses):
+            task = new(Task)
+            set_attr(task, "id", task_id)
+            set_attr(task, "title", title)
+            set_attr(task, "description", description)
+            set_attr(task, "category", category)
+            set_attr(task, "priority", priority)
+            set_attr(task, "status", status)
+            set_attr(task, "_deadline", deadline)
+            set_attr(task, "_dict", None)
+            yield task
+
+
+def _as_priority(value):
+    # Un registro editado a mano puede traer la prioridad como texto ("5")
+    # o con decimales; si no es un número se usa la prioridad por defecto
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return 5
+
+
+def _parse_ordinal(text):
+    # fromisoformat es mucho más rápido que strptime; strptime queda como
+    # respaldo para fechas sin ceros a la izquierda (p. ej. 2025-1-5)
+    try:
+        return date.fromisoformat(text).toordinal()
+    except ValueError:
+        return datetime.strptime(text, "%Y-%m-%d").toordinal()
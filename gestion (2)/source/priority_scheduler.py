@@ -0,0 +1,94 @@
+import heapq
+from datetime import date
+from priority_strategies import DatePriorityStrategy
+
+
+class DatePriorityScheduler:
+    """Mantiene al día las prioridades por fecha recalculando solo lo necesario.
+
+    La prioridad de DatePriorityStrategy solo cambia en días concretos (al
+    entrar en la ventana de 30 días, cada día dentro de ella y al vencer).
+    Cada tarea se guarda en el "cubo" del día de su próximo cambio y tick()
+    recalcula únicamente los cubos que ya vencieron: O(cambios), no O(todas).
+    Las tareas que se agregan o editan quedan para el siguiente tick().
+    """
+
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        self.strategy = None
+        self._today = None
+        self._updating = False
+        self._buckets = {}   # ordinal del día -> ids que cambian ese día
+        self._heap = []      # días con cubo, para sacar el más próximo
+        self._due = {}       # id -> día de su próximo cambio
+        self.task_manager.subscribe(self._on_task_change)
+
+    def start(self, today=None):
+        # Recalcula todas las tareas una vez y las reparte en cubos
+        self._set_today(today)
+        self._recalculate(list(self.task_manager.iter_tasks()))
+
+    def stop(self):
+        # Deja de seguir los cambios de TaskManager
+        self.task_manager.unsubscribe(self._on_task_change)
+        self._today = None
+        self._buckets.clear()
+        self._heap.clear()
+        self._due.clear()
+
+    def tick(self, today=None):
+        """Recalcula las tareas cuyo cubo ya venció (p. ej. tras cambiar de día).
+        Devuelve las tareas cuya prioridad cambió."""
+        self._set_today(today)
+        due = []
+        while self._heap and self._heap[0] <= self._today:
+            day = heapq.heappop(self._heap)
+            for task_id in self._buckets.pop(day):
+                # Las entradas viejas (tarea reprogramada o eliminada) se ignoran
+                if self._due.get(task_id) != day:
+                    continue
+                del self._due[task_id]
+                task = self.task_manager.get_task(task_id)
+                if task is not None:
+                    due.append(task)
+        return self._recalculate(due)
+
+    def pending(self):
+        # Cantidad de tareas con un cambio de prioridad programado
+        return len(self._due)
+
+    def _set_today(self, today):
+        self._today = (today or date.today()).toordinal()
+        self.strategy = DatePriorityStrategy(today=date.fromordinal(self._today))
+
+    def _recalculate(self, tasks):
+        # Los "updated" que notifica reprioritize no deben reprogramar nada
+        self._updating = True
+        try:
+            changed = self.task_manager.reprioritize(self.strategy, tasks)
+        finally:
+            self._updating = False
+        for task in tasks:
+            self._schedule(task.id, self.strategy.next_change(task.deadline_ordinal, self._today))
+        return changed
+
+    def _schedule(self, task_id, day):
+        if day is None:
+            self._due.pop(task_id, None)
+            return
+        self._due[task_id] = day
+        if day not in self._buckets:
+            self._buckets[day] = []
+            heapq.heappush(self._heap, day)
+        self._buckets[day].append(task_id)
+
+    def _on_task_change(self, event, payload):
+        if self._today is None or self._updating:
+            return
+        if event in ("added", "updated"):
+            self._schedule(payload.id, self._today)
+        elif event == "loaded":
+            for task in payload:
+                self._schedule(task.id, self._today)
+        elif event == "deleted":
+            self._due.pop(payload, None)
@@ -1,5 +1,13 @@
+import json
+import sys
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy es opcional: sin él los cálculos en bloque usan Python puro
+    np = None
 
 
 class PriorityStrategy(ABC):
@@ -16,6 +24,19 @@ class PriorityStrategy(ABC):
         task.priority = self.calculate_priority(task)
         return task
 
+    def calculate_priorities(self, tasks):
+        # Versión en bloque de calculate_priority. Las subclases la
+        # redefinen para calcular todo el lote de una vez.
+        return [self.calculate_priority(task) for task in tasks]
+
+    def assign_priorities(self, tasks):
+
+        # Asigna prioridades a un lote de tareas en una sola pasada.
+        tasks = list(tasks)
+        for task, priority in zip(tasks, self.calculate_priorities(tasks)):
+            task.priority = int(priority)
+        return tasks
+
 
 class ManualPriorityStrategy(PriorityStrategy):
     # Prioridad manual: usa el valor ya ingresado por el usuario
@@ -27,15 +48,104 @@ class DatePriorityStrategy(PriorityStrategy):
 
     # Prioridad basada en fecha límite.
     # Las tareas más cercanas a la fecha límite tendrán prioridad más alta.
+    # Los días restantes se cuentan en días de calendario.
+
+    # A partir de cuántos días restantes la prioridad empieza a subir
+    WINDOW = 30
+
+    def __init__(self, today=None):
+        # today: fecha fija para los cálculos (por defecto, la de hoy)
+        self.today = today
+
+    def _today_ordinal(self):
+        return (self.today or date.today()).toordinal()
+
     def calculate_priority(self, task):
-        days_remaining = (task.deadline - datetime.now()).days
+        days_remaining = task.deadline_ordinal - self._today_ordinal()
         if days_remaining <= 0:
             return 100  # urgencia máxima
-        return max(1, 30 - days_remaining)
+        return max(1, self.WINDOW - days_remaining)
+
+    def next_change(self, deadline_ordinal, today_ordinal):
+        # Ordinal del próximo día en que cambia la prioridad (None si ya no cambia)
+        days_remaining = deadline_ordinal - today_ordinal
+        if days_remaining <= 0:
+            return None
+        if days_remaining >= self.WINDOW - 1:
+            # Fuera de la ventana la prioridad es 1 hasta que falten WINDOW - 2 días
+            return deadline_ordinal - (self.WINDOW - 2)
+        return today_ordinal + 1
+
+    def calculate_priorities(self, tasks):
+        # "Hoy" se toma una sola vez para todo el lote
+        today = self._today_ordinal()
+        if np is not None:
+            deadlines = np.fromiter((task.deadline_ordinal for task in tasks),
+                                    dtype=np.int64, count=len(tasks))
+            days_remaining = deadlines - today
+            return np.where(days_remaining <= 0, 100,
+                            np.maximum(1, self.WINDOW - days_remaining)).tolist()
+        return [100 if days <= 0 else max(1, self.WINDOW - days)
+                for days in (task.deadline_ordinal - today for task in tasks)]
 
 
 class CategoryPriorityStrategy(PriorityStrategy):
 
     # Prioridad basada en categoría.
+    # Tabla por defecto; se puede reemplazar con una tabla propia o con
+    # un archivo JSON {"Categoría": prioridad, ...} (ver from_file).
+    CATEGORY_PRIORITY = {
+        "Universidad": 8,
+        "Universitaria": 8,
+        "Trabajo": 7,
+        "Personal": 5,
+        "General": 3,
+    }
+
+    def __init__(self, table=None, default=0):
+        # Las claves se internan igual que Task.category, así la búsqueda
+        # en el diccionario suele resolverse comparando identidad
+        table = self.CATEGORY_PRIORITY if table is None else table
+        self.table = {sys.intern(category): int(priority)
+                      for category, priority in table.items()}
+        self.default = default
+
+    @classmethod
+    def from_file(cls, filename, default=0):
+        with open(filename, "r", encoding="utf-8") as f:
+            return cls(json.load(f), default=default)
+
+    def calculate_priority(self, task):
+        return self.table.get(task.category, self.default)
+
+    def calculate_priorities(self, tasks):
+        # Una búsqueda en el diccionario por tarea
+        get = self.table.get
+        default = self.default
+        return [get(task.category, default) for task in tasks]
+
+
+class WeightedPriorityStrategy(PriorityStrategy):
+
+    # Combina varias estrategias: prioridad = suma(peso * prioridad).
+    # Ejemplo: WeightedPriorityStrategy([(DatePriorityStrategy(), 0.7),
+    #                                    (CategoryPriorityStrategy(), 0.3)])
+    def __init__(self, weighted_strategies):
+        self.weighted_strategies = list(weighted_strategies)
+
     def calculate_priority(self, task):
-        return self.CATEGORY_PRIORITY.get(task.category, 0)
+        return round(sum(weight * strategy.calculate_priority(task)
+                         for strategy, weight in self.weighted_strategies))
+
+    def calculate_priorities(self, tasks):
+        # Cada estrategia calcula el lote completo y se combinan en una pasada
+        tasks = list(tasks)
+        columns = [(strategy.calculate_priorities(tasks), weight)
+                   for strategy, weight in self.weighted_strategies]
+        if np is not None:
+            total = np.zeros(len(tasks))
+            for priorities, weight in columns:
+                total += weight * np.asarray(priorities, dtype=np.float64)
+            return np.round(total).astype(np.int64).tolist()
+        return [round(sum(weight * priorities[i] for priorities, weight in columns))
+                for i in range(len(tasks))]
@@ -0,0 +1,155 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from task_indexes import BULK_MIN
+
+_WORD = re.compile(r"\w+")
+
+
+class _CombiningTable(dict):
+    # Tabla para str.translate que borra las marcas combinantes (acentos);
+    # cada carácter se consulta a unicodedata una sola vez
+    def __missing__(self, codepoint):
+        value = self[codepoint] = None if unicodedata.combining(chr(codepoint)) else codepoint
+        return value
+
+
+_STRIP_COMBINING = _CombiningTable()
+
+
+def normalize(text):
+    # Minúsculas y sin acentos: "Diseño" -> "diseno"
+    if text.isascii():
+        return text.casefold()
+    return unicodedata.normalize("NFKD", text).translate(_STRIP_COMBINING).casefold()
+
+
+def tokenize(text):
+    return _WORD.findall(normalize(text)) if text else []
+
+
+class SearchIndex:
+    """Índice invertido sobre título y descripción de las tareas.
+
+    Cada palabra (normalizada sin acentos) apunta al conjunto de ids que la
+    contienen. El vocabulario se mantiene ordenado para resolver prefijos
+    con búsqueda binaria. Tiene la misma interfaz add/remove/update/rebuild
+    que los índices de task_indexes, así TaskManager lo mantiene al día.
+    Se recuerda el texto indexado de cada tarea: los cambios que no tocan
+    título ni descripción (prioridad, estado...) no vuelven a tokenizar.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        self._postings = {}    # palabra -> ids
+        self._tokens = {}      # id -> palabras de la tarea
+        self._texts = {}       # id -> (título, descripción) indexados
+        for task in tasks:
+            self._add_postings(task)
+        # El vocabulario se ordena una sola vez, no palabra por palabra
+        self._vocabulary = sorted(self._postings)  # palabras ordenadas (para prefijos)
+
+    def add(self, task):
+        for token in self._add_postings(task):
+            insort(self._vocabulary, token)
+
+    def remove(self, task_id):
+        for token in self._remove_postings(task_id):
+            del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def update(self, task):
+        if self._texts.get(task.id) != (task.title, task.description):
+            self.remove(task.id)
+            self.add(task)
+
+    def update_many(self, tasks):
+        # Agrega o actualiza un lote; con lotes grandes el vocabulario se
+        # ordena una sola vez al final
+        if len(tasks) < BULK_MIN:
+            for task in tasks:
+                self.update(task)
+            return
+        new_tokens, emptied = set(), set()
+        for task in tasks:
+            if self._texts.get(task.id) != (task.title, task.description):
+                emptied.update(self._remove_postings(task.id))
+                new_tokens.update(self._add_postings(task))
+        self._merge_vocabulary(new_tokens, emptied)
+
+    def remove_many(self, task_ids):
+        if len(task_ids) < BULK_MIN:
+            for task_id in task_ids:
+                self.remove(task_id)
+            return
+        emptied = set()
+        for task_id in task_ids:
+            emptied.update(self._remove_postings(task_id))
+        self._merge_vocabulary(set(), emptied)
+
+    def _add_postings(self, task):
+        # Agrega la tarea a las listas de ids; devuelve las palabras nuevas
+        tokens = frozenset(tokenize(task.title) + tokenize(task.description))
+        self._tokens[task.id] = tokens
+        self._texts[task.id] = (task.title, task.description)
+        new_tokens = []
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                new_tokens.append(token)
+            ids.add(task.id)
+        return new_tokens
+
+    def _remove_postings(self, task_id):
+        # Quita la tarea de las listas de ids; devuelve las palabras que quedaron sin tareas
+        emptied = []
+        self._texts.pop(task_id, None)
+        for token in self._tokens.pop(task_id, ()):
+            ids = self._postings[token]
+            ids.discard(task_id)
+            if not ids:
+                del self._postings[token]
+                emptied.append(token)
+        return emptied
+
+    def _merge_vocabulary(self, new_tokens, emptied):
+        vocabulary = self._vocabulary
+        if emptied:
+            vocabulary = [token for token in vocabulary if token in self._postings]
+        added = {token for token in new_tokens if token in self._postings}
+        if added & emptied:
+            # Palabras que se vaciaron y volvieron en el mismo lote: pueden seguir en la lista
+            added -= set(vocabulary)
+        if added:
+            vocabulary.extend(sorted(added))
+            vocabulary.sort()
+        self._vocabulary = vocabulary
+
+    def search(self, text):
+        """ids que contienen todas las palabras de text. Cada palabra se
+        toma como prefijo: "dis" encuentra "Diseño" y "disco"."""
+        terms = tokenize(text)
+        if not terms:
+            return set()
+        matches = sorted((self._prefix_ids(term) for term in set(terms)), key=len)
+        return matches[0].intersection(*matches[1:])
+
+    def _prefix_ids(self, prefix):
+        ids = set()
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            ids.update(self._postings[vocabulary[i]])
+            i += 1
+        return ids
+
+
+def matches(task, text):
+    # Mismo criterio que SearchIndex.search, sin índice (recorrido directo)
+    terms = tokenize(text)
+    if not terms:
+        return False
+    tokens = tokenize(task.title) + tokenize(task.description)
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
@@ -0,0 +1,216 @@
+import queue
+import threading
+import traceback
+
+
+class StorageWorker:
+    """Hilo único que ejecuta la E/S de almacenamiento en orden (FIFO).
+
+    Los resultados no se entregan desde el hilo de trabajo: se encolan y el
+    hilo de la interfaz los procesa con process_results() (por ejemplo desde
+    root.after), así los callbacks nunca tocan Tk desde otro hilo.
+    """
+
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self.on_error = self._print_error
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, callback=None):
+        # callback(resultado, error) se ejecuta luego en process_results
+        self._jobs.put((func, args, callback))
+
+    def stream(self, iterable_factory, on_batch, on_done=None, batch_size=1000):
+        # Recorre iterable_factory() en el hilo de trabajo y entrega los
+        # elementos por lotes: on_batch(lista) y al final on_done(None, error)
+        self._jobs.put((self._stream, (iterable_factory, on_batch, batch_size), on_done))
+
+    def process_results(self, limit=None):
+        # Ejecuta los callbacks pendientes; debe llamarse desde el hilo de la UI
+        processed = 0
+        while limit is None or processed < limit:
+            try:
+                callback, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if callback is None:
+                self.on_error(error)
+            else:
+                callback(result, error)
+            processed += 1
+        return processed
+
+    def close(self):
+        # Espera a que terminen todos los trabajos encolados
+        if self._thread.is_alive():
+            self._jobs.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            func, args, callback = job
+            result, error = None, None
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+            if callback is not None:
+                self._results.put((callback, result, error))
+            elif error is not None:
+                self._results.put((None, None, error))
+
+    def _stream(self, iterable_factory, on_batch, batch_size):
+        batch = []
+        for item in iterable_factory():
+            batch.append(item)
+            if len(batch) >= batch_size:
+                self._results.put((lambda result, error, b=batch: on_batch(b), None, None))
+                batch = []
+        if batch:
+            self._results.put((lambda result, error, b=batch: on_batch(b), None, None))
+
+    @staticmethod
+    def _print_error(error):
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+
+class _Snapshot:
+    # Copia inmutable de una tarea tomada en el hilo principal: el hilo de
+    # trabajo nunca lee (ni cachea) atributos de una Task que puede cambiar
+    __slots__ = ("id", "_data")
+
+    def __init__(self, task):
+        self._data = task.to_dict()
+        self.id = self._data["id"]
+
+    def to_dict(self):
+        return self._data
+
+
+class AsyncStorage:
+    """Envuelve un almacenamiento para que las escrituras se hagan en un
+    StorageWorker. Expone las mismas operaciones que el almacenamiento
+    original (incluidas append/update/delete si las tiene), pero no las
+    consultas: TaskManager trabaja en memoria.
+
+    Si el almacenamiento solo sabe reescribir todo (p. ej. JSONStorage), el
+    hilo de trabajo guarda su propia copia id -> tarea (llenada al leer) y
+    AsyncStorage ofrece igualmente append/update/delete: el hilo de la
+    interfaz solo copia las tareas que cambiaron y la lista completa se
+    arma en el hilo de trabajo.
+    """
+
+    def __init__(self, storage, worker):
+        self.storage = storage
+        self.worker = worker
+        # Copia del hilo de trabajo (None: el almacenamiento es incremental)
+        self._records = None
+        incremental = all(hasattr(storage, op) for op in ("append", "update", "delete"))
+        if incremental:
+            self.append = self._append
+            self.update = self._update
+            self.delete = self._delete
+        if all(hasattr(storage, op) for op in ("append_many", "update_many", "delete_many")):
+            self.append_many = self._append_many
+            self.update_many = self._update_many
+            self.delete_many = self._delete_many
+        if not incremental:
+            self._records = {}
+            self.append = self.update = lambda task: self._put_records([task])
+            self.append_many = self.update_many = self._put_records
+            self.delete = lambda task_id: self._delete_records([task_id])
+            self.delete_many = self._delete_records
+        if hasattr(storage, "changed"):
+            # changed() es un stat barato; load_changes debe ejecutarse en el
+            # hilo de trabajo (worker.submit) para que vaya después de lo encolado
+            self.changed = storage.changed
+            self.load_changes = self._load_changes
+
+    def load_all(self):
+        return self._remember(self.storage.load_all())
+
+    def iter_all(self):
+        # Un archivo dañado lanza ValueError, quizá después de entregar
+        # algunas tareas: quien recorre debe descartarlas y usar load_all
+        # (que recupera la última copia buena), p. ej. con merge_external
+        if self._records is not None:
+            self._records = {}
+        if not hasattr(self.storage, "iter_all"):
+            yield from self.load_all()
+            return
+        for task in self.storage.iter_all():
+            # La copia se toma antes de entregar la tarea a la interfaz
+            if self._records is not None:
+                self._records[task.id] = _Snapshot(task)
+            yield task
+
+    def save_all(self, tasks, changed_ids=None):
+        snapshots = [_Snapshot(task) for task in tasks]
+        if changed_ids is not None:
+            changed_ids = list(changed_ids)
+        self.worker.submit(self._save_snapshots, snapshots, changed_ids)
+
+    def _load_changes(self):
+        return self._remember(self.storage.load_changes())
+
+    def _remember(self, tasks):
+        if self._records is not None:
+            self._records = {task.id: _Snapshot(task) for task in tasks}
+        return tasks
+
+    def _save_snapshots(self, snapshots, changed_ids):
+        # En el hilo de trabajo
+        if self._records is not None:
+            self._records = {snapshot.id: snapshot for snapshot in snapshots}
+        if changed_ids is None:
+            self.storage.save_all(snapshots)
+        else:
+            self.storage.save_all(snapshots, changed_ids)
+
+    def _put_records(self, tasks):
+        self.worker.submit(self._apply, [_Snapshot(task) for task in tasks], ())
+
+    def _delete_records(self, task_ids):
+        self.worker.submit(self._apply, [], list(task_ids))
+
+    def _apply(self, snapshots, deleted):
+        # En el hilo de trabajo: se actualiza la copia y se reescribe desde ella
+        for snapshot in snapshots:
+            self._records[snapshot.id] = snapshot
+        for task_id in deleted:
+            self._records.pop(task_id, None)
+        if hasattr(self.storage, "changed"):
+            changed_ids = [snapshot.id for snapshot in snapshots]
+            changed_ids.extend(deleted)
+            self.storage.save_all(list(self._records.values()), changed_ids)
+        else:
+            self.storage.save_all(list(self._records.values()))
+
+    def _append(self, task):
+        self.worker.submit(self.storage.append, _Snapshot(task))
+
+    def _update(self, task):
+        self.worker.submit(self.storage.update, _Snapshot(task))
+
+    def _delete(self, task_id):
+        self.worker.submit(self.storage.delete, task_id)
+
+    def _append_many(self, tasks):
+        self.worker.submit(self.storage.append_many, [_Snapshot(task) for task in tasks])
+
+    def _update_many(self, tasks):
+        self.worker.submit(self.storage.update_many, [_Snapshot(task) for task in tasks])
+
+    def _delete_many(self, task_ids):
+        self.worker.submit(self.storage.delete_many, list(task_ids))
+
+    def close(self):
+        # Vacía la cola (en orden) y luego cierra el almacenamiento
+        self.worker.close()
+        if hasattr(self.storage, "close"):
+            self.storage.close()
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import threading
+from models import Task
+
+
+class JournalStorage:
+    """Almacenamiento en un diario (JSON Lines) de solo anexado.
+
+    Cada cambio escribe un registro pequeño al final del archivo en lugar
+    de reescribir todas las tareas. Al cargar se reproducen los registros
+    y, cuando el diario crece demasiado, se compacta en segundo plano.
+    """
+
+    def __init__(self, filename, compact_threshold=4 * 1024 * 1024, background=True):
+        self.filename = filename
+        self.compact_threshold = compact_threshold
+        self.background = background
+        self._lock = threading.Lock()
+        self._compactor = None
+        # Aumenta con cada reescritura del archivo (save_all o compactación)
+        self._generation = 0
+        self._file = open(self.filename, "ab")
+        self._compacted_size = self._file.tell()
+        self._terminate_partial_line()
+
+    # ===========================
+    # CONTRATO COMÚN (load/save)
+    # ===========================
+    def load_all(self):
+        return list(self.iter_all())
+
+    def iter_all(self):
+        # Reproducir el diario exige conocer el último registro de cada id,
+        # pero las tareas se crean a medida que se consumen
+        with self._lock:
+            self._file.flush()
+            records = self._replay()
+        yield from Task.from_dicts(json.loads(line)["task"] for line in records.values())
+
+    def save_all(self, tasks):
+        # Reescribe el diario como una instantánea (un registro por tarea)
+        lines = [self._encode({"op": "put", "task": task.to_dict()}) for task in tasks]
+        with self._lock:
+            self._rewrite(lines, tail_from=None)
+
+    # ===========================
+    # OPERACIONES INCREMENTALES
+    # ===========================
+    def append(self, task):
+        self._write({"op": "put", "task": task.to_dict()})
+
+    def update(self, task):
+        self._write({"op": "put", "task": task.to_dict()})
+
+    def delete(self, task_id):
+        self._write({"op": "del", "id": task_id})
+
+    # Versiones en lote: todos los registros en una sola escritura
+    def append_many(self, tasks):
+        self._write_many([{"op": "put", "task": task.to_dict()} for task in tasks])
+
+    def update_many(self, tasks):
+        self._write_many([{"op": "put", "task": task.to_dict()} for task in tasks])
+
+    def delete_many(self, task_ids):
+        self._write_many([{"op": "del", "id": task_id} for task_id in task_ids])
+
+    def compact(self):
+        # Fase 1: reproducir el diario hasta la posición actual sin bloquear
+        with self._lock:
+            self._file.flush()
+            offset = self._file.tell()
+            generation = self._generation
+        records = self._replay(limit=offset)
+
+        # Fase 2: copiar lo escrito mientras tanto y reemplazar el archivo.
+        # Si entretanto otro save_all reescribió el diario, offset ya no
+        # apunta al mismo contenido: se abandona la compactación
+        with self._lock:
+            if self._generation != generation:
+                return
+            self._rewrite(list(records.values()), tail_from=offset)
+
+    def close(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self._file.close()
+
+    # ===========================
+    # AUXILIARES
+    # ===========================
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _write(self, record):
+        self._write_many([record])
+
+    def _write_many(self, records):
+        data = b"".join(self._encode(record) for record in records)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            size = self._file.tell()
+        self._maybe_compact(size)
+
+    def _terminate_partial_line(self):
+        # Si la última escritura quedó cortada, cerrar la línea para que el
+        # siguiente registro no se mezcle con el incompleto
+        if self._compacted_size == 0:
+            return
+        with open(self.filename, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+        if last != b"\n":
+            self._file.write(b"\n")
+            self._file.flush()
+
+    def _maybe_compact(self, size):
+        # Solo compactar si el diario superó el umbral y al menos duplicó
+        # el tamaño que tenía tras la última compactación
+        if size < self.compact_threshold or size < 2 * self._compacted_size:
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if not self.background:
+            self.compact()
+            return
+        self._compactor = threading.Thread(target=self.compact, daemon=True)
+        self._compactor.start()
+
+    def _replay(self, limit=None):
+        # Devuelve {id: línea} con el último registro vivo de cada tarea
+        records = {}
+        with open(self.filename, "rb") as f:
+            read = 0
+            for line in f:
+                read += len(line)
+                if limit is not None and read > limit:
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Registro incompleto (p. ej. corte durante una escritura)
+                    continue
+                if record.get("op") == "put":
+                    records[record["task"]["id"]] = line if line.endswith(b"\n") else line + b"\n"
+                elif record.get("op") == "del":
+                    records.pop(record.get("id"), None)
+        return records
+
+    def _rewrite(self, lines, tail_from):
+        # Debe llamarse con self._lock tomado
+        tmp = self.filename + ".tmp"
+        self._file.flush()
+        with open(tmp, "wb") as out:
+            out.writelines(lines)
+            if tail_from is not None:
+                with open(self.filename, "rb") as src:
+                    src.seek(tail_from)
+                    shutil.copyfileobj(src, out)
+            out.flush()
+            os.fsync(out.fileno())
+        self._file.close()
+        os.replace(tmp, self.filename)
+        self._file = open(self.filename, "ab")
+        self._compacted_size = self._file.tell()
+        self._generation += 1
@@ -1,29 +1,285 @@
+import atexit
 import json
 import os
+import sys
+import threading
+import time
+import metrics
+from file_lock import FileLock, file_signature
 from models import Task
 
+
+CHUNK_SIZE = 64 * 1024
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """Recorre un arreglo JSON de un archivo abierto, elemento a elemento.
+
+    Lee el archivo por bloques de chunk_size caracteres, de modo que la
+    memoria usada no depende del tamaño del archivo. Un archivo vacío se
+    trata como un arreglo vacío; uno mal formado lanza ValueError."""
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        # Descarta lo ya procesado y añade el siguiente bloque
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        # Saltar espacios (y comas entre elementos)
+        while True:
+            while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ",")):
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            fill()
+
+        if pos >= len(buf):
+            if started:
+                raise ValueError("Arreglo JSON incompleto")
+            return
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Se esperaba un arreglo JSON")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+
+        try:
+            item, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # El elemento quedó partido entre bloques: leer más
+            fill()
+            continue
+        if end == len(buf) and not eof:
+            # Un número o literal al final del bloque podría seguir en el siguiente
+            fill()
+            continue
+        pos = end
+        yield item
+
+
 class JSONStorage:
-    def __init__(self, filename):
+    """Almacenamiento en un archivo JSON.
+
+    Las escrituras son atómicas (archivo temporal + fsync + rename) y la
+    versión anterior se conserva en <archivo>.bak para recuperarla si el
+    archivo principal aparece dañado.
+
+    flush_every / flush_interval_ms agrupan ráfagas de cambios: el archivo
+    se escribe cada flush_every llamadas a save_all o, como mucho,
+    flush_interval_ms milisegundos después del primer cambio pendiente
+    (y siempre al cerrar el programa). Si solo se indica el intervalo, la
+    cantidad de cambios no fuerza escrituras. Por defecto se escribe en
+    cada cambio.
+
+    Varios procesos pueden compartir el archivo: lecturas y escrituras se
+    hacen con un candado consultivo (<archivo>.lock) y changed() indica, con
+    un solo stat, si otro proceso lo modificó desde la última lectura o
+    escritura. Si save_all recibe changed_ids (los ids que cambiaron en este
+    proceso) y el archivo cambió por fuera, se combinan ambas versiones en
+    lugar de pisar los cambios ajenos; luego changed() sigue en True hasta
+    que se vuelva a leer, para que TaskManager incorpore lo ajeno.
+    """
+
+    def __init__(self, filename, flush_every=None, flush_interval_ms=0):
         self.filename = filename
-        if not os.path.exists(self.filename):
-            with open(self.filename, "w") as f:
-                f.write("[]")
+        self.backup_filename = filename + ".bak"
+        if flush_every is None:
+            flush_every = sys.maxsize if flush_interval_ms > 0 else 1
+        self.flush_every = max(1, flush_every)
+        self.flush_interval_ms = flush_interval_ms
 
+        self._lock = threading.RLock()
+        self._pending = None
+        self._pending_count = 0
+        self._timer = None
+
+        self._file_lock = FileLock(filename + ".lock")
+        # Huella del archivo en la última lectura/escritura de este proceso
+        self._signature = None
+        # Ids cambiados aquí desde entonces (None: se guarda todo tal cual)
+        self._dirty = None
+        # True si se combinaron cambios ajenos que aún no se volvieron a leer
+        self._external = False
+
+        with self._file_lock:
+            if not os.path.exists(self.filename) and not os.path.exists(self.backup_filename):
+                self._write_atomic("[]")
+                self._signature = file_signature(self.filename)
+        if self.flush_every > 1 or self.flush_interval_ms > 0:
+            atexit.register(self.flush)
+
+    @metrics.timed("storage_load_seconds", storage="json")
     def load_all(self):
+        with self._lock, self._file_lock:
+            try:
+                tasks = self._read(self.filename)
+            except (FileNotFoundError, ValueError):
+                # Archivo dañado o ausente: apartarlo (nunca sobrescribirlo) y
+                # recuperar la última instantánea buena
+                if os.path.exists(self.filename):
+                    os.replace(self.filename, self.filename + ".corrupt")
+                try:
+                    tasks = self._read(self.backup_filename)
+                except (FileNotFoundError, ValueError):
+                    tasks = []
+            self._synced()
+            metrics.inc("tasks_loaded_total", len(tasks))
+            return tasks
+
+    def iter_all(self):
+        # Genera las tareas leyendo el archivo por partes (memoria acotada).
+        # A diferencia de load_all, un archivo dañado lanza ValueError.
+        # El candado solo se toma para abrir: el archivo abierto no cambia
+        # aunque otro proceso lo reemplace mientras se recorre
+        with self._file_lock:
+            filename = self.filename if os.path.exists(self.filename) else self.backup_filename
+            f = open(filename, "r")
+            signature = file_signature(self.filename)
+        with f:
+            if not metrics.enabled:
+                yield from Task.from_dicts(iter_json_array(f))
+            else:
+                count = 0
+                for task in Task.from_dicts(iter_json_array(f)):
+                    count += 1
+                    yield task
+                metrics.inc("tasks_streamed_total", count)
+        self._synced(signature)
+
+    def changed(self):
+        """True si el archivo cambió desde la última lectura o escritura de
+        este proceso (o si hay cambios ajenos combinados sin releer)."""
+        return self._external or file_signature(self.filename) != self._signature
+
+    def locked(self):
+        # Candado entre procesos, para agrupar varias operaciones
+        return self._file_lock
+
+    def load_changes(self):
+        """Escribe lo pendiente y vuelve a leer el archivo completo."""
+        with self._lock:
+            self.flush()
+            return self.load_all()
+
+    def save_all(self, tasks, changed_ids=None):
+        with self._lock:
+            # Sin temporizador la escritura ocurre en este mismo hilo (al
+            # juntar flush_every cambios, en flush o al cerrar): se guarda la
+            # colección recibida (p. ej. la vista viva de TaskManager) y se
+            # recorre recién al escribir, sin copiarla en cada lote. Con
+            # temporizador se copia, porque la escribe otro hilo.
+            self._pending = list(tasks) if self.flush_interval_ms > 0 else tasks
+            self._pending_count += 1
+            metrics.inc("storage_save_calls_total")
+            if changed_ids is None:
+                self._dirty = None
+            elif self._dirty is not None:
+                self._dirty.update(changed_ids)
+            elif self._pending_count == 1:
+                self._dirty = set(changed_ids)
+
+            if self._pending_count >= self.flush_every:
+                self.flush()
+            elif self.flush_interval_ms > 0 and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval_ms / 1000, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        # Escribe los cambios pendientes, si los hay
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is None:
+                return
+            tasks, self._pending, self._pending_count = self._pending, None, 0
+            start = time.perf_counter() if metrics.enabled else 0
+            records = [task.to_dict() for task in tasks]
+            with self._file_lock:
+                # Otro proceso escribió desde nuestra última lectura, o ya se
+                # combinó lo ajeno y la memoria del llamador aún no lo tiene
+                if self._dirty is not None and self._signature is not None and (
+                        self._external or file_signature(self.filename) != self._signature):
+                    records = self._merge(records, self._dirty)
+                    self._external = True
+                    metrics.inc("storage_merges_total")
+                text = json.dumps(records, indent=4)
+                self._write_atomic(text)
+                self._signature = file_signature(self.filename)
+                self._dirty = None
+            if metrics.enabled:
+                metrics.observe("storage_save_seconds", time.perf_counter() - start)
+                metrics.observe("storage_save_bytes", len(text), buckets=metrics.SIZE_BUCKETS)
+                metrics.inc("storage_save_bytes_total", len(text))
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def _merge(self, records, dirty):
+        # Parte del archivo actual y aplica encima solo lo que cambió en
+        # este proceso: ediciones y altas locales reemplazan, bajas locales
+        # eliminan. Lo demás (cambios, altas y bajas ajenas) se conserva.
+        ours = {record["id"]: record for record in records}
+        merged = {}
         try:
             with open(self.filename, "r") as f:
-                content = f.read().strip()
-                if not content:
-                    return []
-                data = json.loads(content)
+                for record in iter_json_array(f):
+                    task_id = record.get("id")
+                    if task_id not in dirty:
+                        merged[task_id] = record
+                    elif task_id in ours:
+                        merged[task_id] = ours[task_id]
+        except (FileNotFoundError, ValueError):
+            # Lo ajeno no se puede leer: se guarda la versión local
+            return records
+        for task_id in dirty:
+            if task_id in ours and task_id not in merged:
+                merged[task_id] = ours[task_id]
+        return list(merged.values())
+
+    def _synced(self, signature=None):
+        # Lo que hay en memoria coincide con el archivo leído
+        self._signature = signature or file_signature(self.filename)
+        self._external = False
+        if self._pending is None:
+            self._dirty = None
+
+    def _read(self, filename):
+        # Se procesa en streaming: nunca está el texto completo en memoria
+        with open(filename, "r") as f:
+            return list(Task.from_dicts(iter_json_array(f)))
+
+    def _write_atomic(self, text):
+        write_atomic(self.filename, text, self.backup_filename)
 
-            return [Task.from_dict(item) for item in data]
 
-        except (json.JSONDecodeError, ValueError):
-            with open(self.filename, "w") as f:
-                f.write("[]")
-            return []
+def write_atomic(filename, data, backup_filename=None):
+    """Escribe data (texto o bytes) en un temporal con fsync y lo renombra
+    sobre filename: nunca queda un archivo a medio escribir. La versión
+    anterior pasa a backup_filename (por defecto <archivo>.bak)."""
+    tmp = filename + ".tmp"
+    with open(tmp, "wb" if isinstance(data, (bytes, bytearray)) else "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
 
-    def save_all(self, tasks):
-        with open(self.filename, "w") as f:
-            json.dump([task.to_dict() for task in tasks], f, indent=4)
+    # La versión actual pasa a ser la copia de seguridad
+    if os.path.exists(filename):
+        os.replace(filename, backup_filename or filename + ".bak")
+    os.replace(tmp, filename)
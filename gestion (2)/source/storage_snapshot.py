@@ -0,0 +1,329 @@
+import argparse
+import json
+import lzma
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from itertools import accumulate
+from models import Task
+from storage_json import JSONStorage, write_atomic
+
+
+MAGIC = b"TASKSNP1"
+# Cada columna empieza en un múltiplo de 8 bytes dentro del archivo
+ALIGNMENT = 8
+COMPRESSORS = {
+    None: (lambda data: data, lambda data: data),
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+STRING_COLUMNS = ("id", "title", "description")
+DICTIONARY_COLUMNS = ("category", "status")
+INTEGER_COLUMNS = ("deadline", "priority")
+
+
+def _little_endian(values):
+    # Los enteros se guardan siempre en little-endian
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_strings(values):
+    # Columna de texto: offsets (en caracteres) + todo el texto en UTF-8.
+    # Al leer se decodifica el bloque de una vez y cada valor es un recorte.
+    offsets = array("Q", accumulate(map(len, values), initial=0))
+    return _little_endian(offsets) + "".join(values).encode("utf-8")
+
+
+def _encode_dictionary(values):
+    # Columna con pocos valores distintos: diccionario + un código por fila
+    dictionary = {}
+    codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+    typecode = "B" if len(dictionary) <= 1 << 8 else "H" if len(dictionary) <= 1 << 16 else "I"
+    return list(dictionary), typecode, _little_endian(array(typecode, codes))
+
+
+def write_snapshot(filename, tasks, compression=None):
+    """Escribe las tareas en formato columnar.
+
+    Disposición: MAGIC, largo del encabezado (uint32), encabezado JSON
+    (cantidad, compresión, diccionarios y posición de cada columna) y las
+    columnas, cada una comprimida por separado si se pide compresión."""
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Compresión desconocida: {compression}")
+    columns = {name: [] for name in STRING_COLUMNS + DICTIONARY_COLUMNS}
+    deadlines = array("i")
+    # 64 bits: la prioridad es un entero cualquiera (la API no la acota)
+    priorities = array("q")
+    for task in tasks:
+        if not isinstance(task, Task):
+            # p. ej. las copias que encola AsyncStorage: solo tienen to_dict
+            task = next(Task.from_dicts([task.to_dict()]))
+        columns["id"].append(task.id)
+        columns["title"].append(task.title)
+        columns["description"].append(task.description)
+        columns["category"].append(task.category)
+        columns["status"].append(task.status)
+        deadlines.append(task.deadline_ordinal)
+        priorities.append(task.priority)
+
+    header = {"count": len(deadlines), "compression": compression, "columns": {}}
+    blobs = {name: _encode_strings(columns[name]) for name in STRING_COLUMNS}
+    for name in DICTIONARY_COLUMNS:
+        values, typecode, blobs[name] = _encode_dictionary(columns[name])
+        header[name + "_values"] = values
+        header[name + "_typecode"] = typecode
+    blobs["deadline"] = _little_endian(deadlines)
+    blobs["priority"] = _little_endian(priorities)
+    header["priority_typecode"] = priorities.typecode
+
+    compress = COMPRESSORS[compression][0]
+    body = bytearray()
+    for name, blob in blobs.items():
+        blob = compress(blob)
+        body.extend(b"\0" * (-len(body) % ALIGNMENT))
+        header["columns"][name] = [len(body), len(blob)]
+        body.extend(blob)
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    prefix += b"\0" * (-len(prefix) % ALIGNMENT)
+    write_atomic(filename, prefix + body)
+    return header["count"]
+
+
+class _StringColumn:
+    # Valores de una columna de texto, recortados del bloque decodificado
+    __slots__ = ("_text", "_offsets")
+
+    def __init__(self, text, offsets):
+        self._text = text
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return self._text[self._offsets[index]:self._offsets[index + 1]]
+
+    def __iter__(self):
+        text = self._text
+        offsets = iter(self._offsets)
+        start = next(offsets)
+        for end in offsets:
+            yield text[start:end]
+            start = end
+
+
+class SnapshotReader:
+    """Lee una instantánea mapeando el archivo en memoria (mmap).
+
+    Las columnas se decodifican recién cuando se piden (column) y una sola
+    vez: contar tareas o por estado no toca los textos. Sin compresión los
+    enteros se leen directamente del archivo mapeado, sin copiarlos."""
+
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Archivo vacío
+            self._file.close()
+            raise ValueError("Instantánea vacía")
+        self._views = []
+        self._columns = {}
+        try:
+            if self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError("No es una instantánea de tareas")
+            (header_length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+            start = len(MAGIC) + 4
+            self.header = json.loads(self._map[start:start + header_length])
+            end = start + header_length
+            self._data_start = end + (-end % ALIGNMENT)
+            self._decompress = COMPRESSORS[self.header["compression"]][1]
+        except (ValueError, KeyError, struct.error):
+            self.close()
+            raise ValueError("Encabezado de instantánea dañado")
+
+    def __len__(self):
+        return self.header["count"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name):
+        """Devuelve la columna name (decodificada la primera vez)."""
+        if name not in self._columns:
+            self._columns[name] = self._decode(name)
+        return self._columns[name]
+
+    def tasks(self):
+        # Generador de tareas armadas fila por fila a partir de las columnas
+        return Task.from_columns(*(self.column(name) for name in (
+            "id", "title", "description", "category", "deadline", "priority", "status")))
+
+    def close(self):
+        # Las vistas sobre el mapa deben liberarse antes de cerrarlo
+        self._columns.clear()
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._map.close()
+        self._file.close()
+
+    def _raw(self, name):
+        offset, length = self.header["columns"][name]
+        start = self._data_start + offset
+        if self.header["compression"] is None:
+            view = memoryview(self._map)[start:start + length]
+            self._views.append(view)
+            return view
+        return self._decompress(self._map[start:start + length])
+
+    def _integers(self, raw, typecode):
+        if sys.byteorder == "big":
+            values = array(typecode, bytes(raw))
+            values.byteswap()
+            return values
+        view = memoryview(raw).cast(typecode)
+        self._views.append(view)
+        return view
+
+    def _decode(self, name):
+        raw = self._raw(name)
+        if name in INTEGER_COLUMNS:
+            # Los archivos anteriores guardaban la prioridad en 32 bits
+            return self._integers(raw, self.header.get(name + "_typecode", "i"))
+        if name in DICTIONARY_COLUMNS:
+            values = [sys.intern(value) for value in self.header[name + "_values"]]
+            codes = self._integers(raw, self.header[name + "_typecode"])
+            return [values[code] for code in codes]
+        size = (self.header["count"] + 1) * 8
+        offsets = self._integers(raw[:size], "Q")
+        return _StringColumn(str(raw[size:], "utf-8"), offsets)
+
+
+class SnapshotStorage:
+    """Almacenamiento en una instantánea binaria columnar.
+
+    Mismo contrato que JSONStorage (load_all/save_all/iter_all), pero con
+    categoría y estado codificados por diccionario, fechas como ordinales y
+    compresión opcional ("zlib" o "lzma"). Sin compresión indicada se
+    conserva la del archivo existente. reader() da acceso a columnas sueltas
+    sin construir las tareas.
+    """
+
+    def __init__(self, filename, compression=None):
+        self.filename = filename
+        self.backup_filename = filename + ".bak"
+        self.compression = compression
+        if compression is None and os.path.exists(filename):
+            try:
+                with SnapshotReader(filename) as reader:
+                    self.compression = reader.header["compression"]
+            except ValueError:
+                pass
+        if not os.path.exists(self.filename) and not os.path.exists(self.backup_filename):
+            write_snapshot(self.filename, [], self.compression)
+
+    def load_all(self):
+        try:
+            return self._read(self.filename)
+        except (FileNotFoundError, ValueError):
+            pass
+        # Igual que JSONStorage: se aparta el archivo dañado y se usa la copia
+        if os.path.exists(self.filename):
+            os.replace(self.filename, self.filename + ".corrupt")
+        try:
+            return self._read(self.backup_filename)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def iter_all(self):
+        filename = self.filename if os.path.exists(self.filename) else self.backup_filename
+        with SnapshotReader(filename) as reader:
+            yield from reader.tasks()
+
+    def save_all(self, tasks):
+        write_snapshot(self.filename, tasks, self.compression)
+
+    def reader(self):
+        # Para leer columnas sueltas: with storage.reader() as r: r.column("status")
+        return SnapshotReader(self.filename)
+
+    def _read(self, filename):
+        with SnapshotReader(filename) as reader:
+            return list(reader.tasks())
+
+
+# ===========================
+# CONVERSIÓN Y COMPARACIÓN
+# ===========================
+def json_to_snapshot(json_file, snapshot_file, compression=None):
+    # Convierte un tasks.json en una instantánea binaria
+    if not os.path.exists(json_file):
+        raise FileNotFoundError(json_file)
+    return write_snapshot(snapshot_file, JSONStorage(json_file).iter_all(), compression)
+
+
+def snapshot_to_json(snapshot_file, json_file):
+    # Convierte una instantánea en un tasks.json
+    if not os.path.exists(snapshot_file):
+        raise FileNotFoundError(snapshot_file)
+    tasks = SnapshotStorage(snapshot_file).load_all()
+    JSONStorage(json_file).save_all(tasks)
+    return len(tasks)
+
+
+def compare_formats(json_file, folder=None):
+    """Tamaño y tiempo de carga del JSON frente a la instantánea con cada
+    compresión. Devuelve [(formato, bytes, segundos)]."""
+    folder = folder or os.path.dirname(os.path.abspath(json_file))
+    start = time.perf_counter()
+    tasks = JSONStorage(json_file).load_all()
+    results = [("json", os.path.getsize(json_file), time.perf_counter() - start)]
+    for compression in COMPRESSORS:
+        filename = os.path.join(folder, f"comparacion.{compression or 'sin'}.snap")
+        write_snapshot(filename, tasks, compression)
+        start = time.perf_counter()
+        SnapshotStorage(filename).load_all()
+        results.append((f"snapshot {compression or 'sin compresión'}",
+                        os.path.getsize(filename), time.perf_counter() - start))
+        for suffix in ("", ".bak"):
+            if os.path.exists(filename + suffix):
+                os.remove(filename + suffix)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instantáneas binarias de tareas")
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_snapshot = commands.add_parser("to-snapshot", help="convertir tasks.json a instantánea")
+    to_snapshot.add_argument("json_file")
+    to_snapshot.add_argument("snapshot_file")
+    to_snapshot.add_argument("--compression", choices=["zlib", "lzma"])
+    to_json = commands.add_parser("to-json", help="convertir una instantánea a tasks.json")
+    to_json.add_argument("snapshot_file")
+    to_json.add_argument("json_file")
+    compare = commands.add_parser("compare", help="comparar tamaño y tiempo de carga")
+    compare.add_argument("json_file")
+    args = parser.parse_args()
+
+    if args.command == "to-snapshot":
+        total = json_to_snapshot(args.json_file, args.snapshot_file, args.compression)
+        print(f"Convertidas {total} tareas a {args.snapshot_file}")
+    elif args.command == "to-json":
+        total = snapshot_to_json(args.snapshot_file, args.json_file)
+        print(f"Convertidas {total} tareas a {args.json_file}")
+    else:
+        for name, size, seconds in compare_formats(args.json_file):
+            print(f"{name:<26} {size / 1e6:10.2f} MB {seconds * 1000:10.1f} ms")
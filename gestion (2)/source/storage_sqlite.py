@@ -0,0 +1,185 @@
+import argparse
+import os
+import sqlite3
+from datetime import date, datetime
+from models import Task
+from storage_json import JSONStorage
+
+
+COLUMNS = ("id", "title", "description", "category", "deadline", "priority", "status")
+
+# Columnas por las que se permite ordenar (evita inyectar SQL en ORDER BY)
+SORTABLE = {"title", "category", "deadline", "priority", "status"}
+
+
+def _date_key(value):
+    # Las fechas se guardan como texto YYYY-MM-DD, que ordena igual que la fecha
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+class SQLiteStorage:
+    """Almacenamiento en SQLite con índices para consultar sin cargar todo.
+
+    Implementa el mismo contrato que JSONStorage (load_all/save_all), las
+    operaciones por tarea de JournalStorage y además get/query, que
+    TaskManager usa para resolver búsquedas, filtros y orden en SQL.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Permite usar la conexión desde un StorageWorker (E/S en otro hilo)
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        with self.conn:
+            # id es PRIMARY KEY, por lo que ya tiene su propio índice
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id TEXT PRIMARY KEY, title TEXT, description TEXT, "
+                "category TEXT, deadline TEXT, priority INTEGER, status TEXT)"
+            )
+            for column in ("status", "category", "deadline", "priority"):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks ({column})")
+
+    # ===========================
+    # CONTRATO COMÚN (load/save)
+    # ===========================
+    def load_all(self):
+        return self.query()
+
+    def iter_all(self):
+        # El cursor entrega las filas de a poco: memoria acotada
+        rows = self.conn.execute("SELECT * FROM tasks ORDER BY rowid")
+        yield from Task.from_dicts(dict(zip(COLUMNS, row)) for row in rows)
+
+    def save_all(self, tasks):
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self.conn.executemany(
+                "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._to_row(task) for task in tasks))
+
+    # ===========================
+    # OPERACIONES INCREMENTALES
+    # ===========================
+    def append(self, task):
+        self.append_many([task])
+
+    def update(self, task):
+        self.update_many([task])
+
+    def delete(self, task_id):
+        self.delete_many([task_id])
+
+    # Versiones en lote: una sola transacción
+    def append_many(self, tasks):
+        # ON CONFLICT conserva el rowid, y con él la posición de la tarea
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET title=excluded.title, "
+                "description=excluded.description, category=excluded.category, "
+                "deadline=excluded.deadline, priority=excluded.priority, "
+                "status=excluded.status",
+                (self._to_row(task) for task in tasks))
+
+    def update_many(self, tasks):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tasks SET title=?, description=?, category=?, deadline=?, "
+                "priority=?, status=? WHERE id=?",
+                (row[1:] + row[:1] for row in map(self._to_row, tasks)))
+
+    def delete_many(self, task_ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE id=?",
+                                  ((task_id,) for task_id in task_ids))
+
+    # ===========================
+    # CONSULTAS
+    # ===========================
+    def get(self, task_id):
+        row = self.conn.execute(
+            "SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def query(self, status=None, category=None, due_after=None, due_before=None,
+              order_by=None, reverse=False, limit=None, offset=0):
+        """Devuelve las tareas que cumplen los filtros.
+        due_after / due_before -> rango de fecha límite (inclusivo)
+        order_by -> columna de orden; sin ella se usa el orden de inserción
+        limit / offset -> ventana de resultados (paginación)"""
+        sql, params = self._where(status, category, due_after, due_before)
+        sql = "SELECT * FROM tasks" + sql
+
+        if order_by is not None:
+            if order_by not in SORTABLE:
+                raise ValueError(f"No se puede ordenar por: {order_by}")
+            # rowid desempata igual que un sort estable de Python
+            sql += f" ORDER BY {order_by} {'DESC' if reverse else 'ASC'}, rowid"
+        else:
+            sql += " ORDER BY rowid"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend((-1 if limit is None else limit, offset))
+
+        rows = self.conn.execute(sql, params)
+        return list(Task.from_dicts(dict(zip(COLUMNS, row)) for row in rows))
+
+    def count(self, status=None, category=None, due_after=None, due_before=None):
+        sql, params = self._where(status, category, due_after, due_before)
+        return self.conn.execute("SELECT COUNT(*) FROM tasks" + sql, params).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    # ===========================
+    # AUXILIARES
+    # ===========================
+    @staticmethod
+    def _where(status, category, due_after, due_before):
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if due_after is not None:
+            clauses.append("deadline >= ?")
+            params.append(_date_key(due_after))
+        if due_before is not None:
+            clauses.append("deadline <= ?")
+            params.append(_date_key(due_before))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _to_row(task):
+        data = task.to_dict()
+        return tuple(data[column] for column in COLUMNS)
+
+    @staticmethod
+    def _from_row(row):
+        return Task.from_dict(dict(zip(COLUMNS, row)))
+
+
+def migrate_from_json(json_file, db_file):
+    # Copia todas las tareas de un tasks.json a una base SQLite
+    if not os.path.exists(json_file):
+        raise FileNotFoundError(json_file)
+    tasks = JSONStorage(json_file).load_all()
+    storage = SQLiteStorage(db_file)
+    storage.save_all(tasks)
+    storage.close()
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrar tasks.json a SQLite")
+    parser.add_argument("json_file", help="archivo tasks.json de origen")
+    parser.add_argument("db_file", help="base de datos SQLite de destino")
+    args = parser.parse_args()
+
+    total = migrate_from_json(args.json_file, args.db_file)
+    print(f"Migradas {total} tareas a {args.db_file}")
@@ -0,0 +1,264 @@
+from bisect import bisect_left, insort
+from itertools import islice
+from operator import itemgetter
+
+
+# Desde este tamaño de lote los cambios a la lista ordenada se difieren y se
+# aplican juntos, en lugar de un desplazamiento de la lista por tarea (O(k n))
+BULK_MIN = 64
+
+
+class _SortedKeys:
+    """Base de los índices que guardan una lista ordenada de claves.
+
+    Los lotes grandes no tocan la lista: anotan las claves nuevas y las que
+    sobran y se aplican todas juntas (un filtrado y un sort que intercala
+    dos tramos ya ordenados) en la próxima lectura. Una carga por lotes sin
+    consultas intermedias ordena así una sola vez.
+    """
+
+    def _reset(self, keys):
+        self._sorted = sorted(keys)
+        self._added = []      # claves nuevas aún fuera de la lista
+        self._stale = set()   # claves que ya no valen (en la lista o en _added)
+
+    def _stage_add(self, key):
+        if key in self._stale:
+            # La clave volvió antes de aplicarse su baja
+            self._stale.discard(key)
+        else:
+            self._added.append(key)
+
+    def _stage_remove(self, key):
+        self._stale.add(key)
+
+    def _settle(self):
+        # Aplica los cambios anotados; debe llamarse antes de usar _sorted
+        if self._stale:
+            stale = self._stale
+            self._sorted = [key for key in self._sorted if key not in stale]
+            self._added = [key for key in self._added if key not in stale]
+            self._stale = set()
+        if self._added:
+            self._added.sort()
+            self._sorted.extend(self._added)
+            self._sorted.sort()
+            self._added = []
+
+
+class PriorityIndex(_SortedKeys):
+    """Índice secundario ordenado por prioridad.
+
+    Guarda claves (-prioridad, secuencia, id) en una lista ordenada, así el
+    orden de mayor a menor prioridad (con empates en orden de inserción,
+    como un sort estable) se obtiene sin reordenar nada. Agregar, quitar y
+    actualizar una tarea cuesta una búsqueda binaria más un desplazamiento
+    de la lista, en lugar de un sort completo. Los lotes grandes
+    (update_many, remove_many) se aplican juntos al leer (_SortedKeys).
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        self._keys = {}
+        for seq, task in enumerate(tasks):
+            self._keys[task.id] = (-task.priority, seq, task.id)
+        self._seq = len(self._keys)
+        self._reset(self._keys.values())
+
+    def add(self, task):
+        self._settle()
+        key = (-task.priority, self._seq, task.id)
+        self._seq += 1
+        self._keys[task.id] = key
+        insort(self._sorted, key)
+
+    def remove(self, task_id):
+        self._settle()
+        key = self._keys.pop(task_id, None)
+        if key is not None:
+            del self._sorted[bisect_left(self._sorted, key)]
+
+    def update(self, task):
+        key = self._keys.get(task.id)
+        if key is None:
+            self.add(task)
+            return
+        new_key = (-task.priority, key[1], task.id)
+        if new_key != key:
+            self._settle()
+            del self._sorted[bisect_left(self._sorted, key)]
+            self._keys[task.id] = new_key
+            insort(self._sorted, new_key)
+
+    def update_many(self, tasks):
+        # Agrega o actualiza un lote de tareas
+        if len(tasks) < BULK_MIN:
+            for task in tasks:
+                self.update(task)
+            return
+        for task in tasks:
+            key = self._keys.get(task.id)
+            if key is None:
+                new_key = (-task.priority, self._seq, task.id)
+                self._seq += 1
+            else:
+                new_key = (-task.priority, key[1], task.id)
+                if new_key == key:
+                    continue
+                self._stage_remove(key)
+            self._keys[task.id] = new_key
+            self._stage_add(new_key)
+
+    def remove_many(self, task_ids):
+        if len(task_ids) < BULK_MIN:
+            for task_id in task_ids:
+                self.remove(task_id)
+            return
+        for task_id in task_ids:
+            key = self._keys.pop(task_id, None)
+            if key is not None:
+                self._stage_remove(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def iter_ids(self, reverse=True):
+        # reverse=True -> de mayor a menor prioridad (recorrido directo)
+        self._settle()
+        if reverse:
+            for key in self._sorted:
+                yield key[2]
+            return
+        # De menor a mayor: los grupos de igual prioridad se recorren desde
+        # el final, cada uno en orden de inserción
+        end = len(self._sorted)
+        while end > 0:
+            start = bisect_left(self._sorted, (self._sorted[end - 1][0],))
+            for key in self._sorted[start:end]:
+                yield key[2]
+            end = start
+
+    def page_ids(self, offset, limit, reverse=True):
+        if reverse:
+            self._settle()
+            return [key[2] for key in self._sorted[offset:offset + limit]]
+        return list(islice(self.iter_ids(reverse=False), offset, offset + limit))
+
+    def top_ids(self, n):
+        return self.page_ids(0, n)
+
+    def sort_ids(self, ids, reverse=None):
+        # Ordena un subconjunto de ids como lo haría la vista completa:
+        # reverse=None -> orden de inserción; True/False -> por prioridad
+        keys = [self._keys[task_id] for task_id in ids]
+        if reverse is None:
+            keys.sort(key=itemgetter(1))
+        elif reverse:
+            keys.sort()
+        else:
+            keys.sort(key=lambda key: (-key[0], key[1]))
+        return [key[2] for key in keys]
+
+
+class FieldIndex:
+    """Índice de igualdad sobre un atributo (p. ej. status o category):
+    valor -> conjunto de ids."""
+
+    def __init__(self, field, tasks=()):
+        self.field = field
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        self._values = {}
+        self._ids = {}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        value = getattr(task, self.field)
+        self._values[task.id] = value
+        self._ids.setdefault(value, set()).add(task.id)
+
+    def remove(self, task_id):
+        if task_id not in self._values:
+            return
+        value = self._values.pop(task_id)
+        ids = self._ids[value]
+        ids.discard(task_id)
+        if not ids:
+            del self._ids[value]
+
+    def update(self, task):
+        value = getattr(task, self.field)
+        if task.id not in self._values or self._values[task.id] != value:
+            self.remove(task.id)
+            self.add(task)
+
+    def ids(self, value):
+        return self._ids.get(value, set())
+
+    def counts(self):
+        # Cantidad de tareas por valor
+        return {value: len(ids) for value, ids in self._ids.items()}
+
+
+class DeadlineIndex(_SortedKeys):
+    """Índice ordenado por fecha límite para consultas por rango. Como
+    PriorityIndex, los lotes grandes se aplican juntos al leer."""
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        self._ordinals = {task.id: task.deadline_ordinal for task in tasks}
+        self._reset((ordinal, task_id) for task_id, ordinal in self._ordinals.items())
+
+    def add(self, task):
+        self._settle()
+        self._ordinals[task.id] = task.deadline_ordinal
+        insort(self._sorted, (task.deadline_ordinal, task.id))
+
+    def remove(self, task_id):
+        self._settle()
+        ordinal = self._ordinals.pop(task_id, None)
+        if ordinal is not None:
+            del self._sorted[bisect_left(self._sorted, (ordinal, task_id))]
+
+    def update(self, task):
+        if self._ordinals.get(task.id) != task.deadline_ordinal:
+            self.remove(task.id)
+            self.add(task)
+
+    def update_many(self, tasks):
+        # Agrega o actualiza un lote de tareas
+        if len(tasks) < BULK_MIN:
+            for task in tasks:
+                self.update(task)
+            return
+        for task in tasks:
+            ordinal = self._ordinals.get(task.id)
+            if ordinal == task.deadline_ordinal:
+                continue
+            if ordinal is not None:
+                self._stage_remove((ordinal, task.id))
+            self._ordinals[task.id] = task.deadline_ordinal
+            self._stage_add((task.deadline_ordinal, task.id))
+
+    def remove_many(self, task_ids):
+        if len(task_ids) < BULK_MIN:
+            for task_id in task_ids:
+                self.remove(task_id)
+            return
+        for task_id in task_ids:
+            ordinal = self._ordinals.pop(task_id, None)
+            if ordinal is not None:
+                self._stage_remove((ordinal, task_id))
+
+    def ids_between(self, first=None, last=None):
+        # ids con first <= fecha límite <= last (ordinales; None = sin límite)
+        self._settle()
+        start = 0 if first is None else bisect_left(self._sorted, (first,))
+        end = len(self._sorted) if last is None else bisect_left(self._sorted, (last + 1,))
+        return [task_id for _, task_id in self._sorted[start:end]]
@@ -1,45 +1,471 @@
 import uuid
+from bisect import bisect_right, insort
+from datetime import datetime
+import metrics
 from models import Task
+from search_index import SearchIndex, matches
 from storage_json import JSONStorage
+from task_indexes import BULK_MIN, DeadlineIndex, FieldIndex, PriorityIndex
+from task_stats import TaskStatistics
 
 
 class TaskManager:
-    def __init__(self, storage: JSONStorage):
+    def __init__(self, storage: JSONStorage, load=True):
         self.storage = storage
-        self.tasks = self.storage.load_all()
+        # Los almacenamientos con operaciones por tarea (p. ej. JournalStorage)
+        # se usan de forma incremental en vez de reescribir todo
+        self._incremental = all(hasattr(self.storage, op)
+                                for op in ("append", "update", "delete"))
+        # Los almacenamientos con consultas (p. ej. SQLiteStorage) resuelven
+        # búsquedas, filtros y orden por su cuenta: no se cargan en memoria
+        self._pushdown = self._incremental and all(
+            hasattr(self.storage, op) for op in ("get", "query"))
+        # Los almacenamientos que detectan cambios de otros procesos (p. ej.
+        # JSONStorage) reciben en cada guardado los ids que cambiaron aquí
+        # para combinarlos con lo ajeno en vez de sobrescribirlo
+        self._shared = not self._incremental and hasattr(self.storage, "changed")
+        # None -> orden de inserción; True/False -> por prioridad (desc/asc)
+        self._sort_reverse = None
+        self._listeners = []
+        # Lista con el orden de inserción para acceder por posición
+        # (get_page). Se construye al pedirla y se mantiene con cada cambio
+        # (ver _View)
+        self._view = None
+
+        # Índice id -> tarea. Los dict conservan el orden de inserción,
+        # así que el mismo diccionario sirve de índice y de vista ordenada:
+        # buscar, actualizar y eliminar cuestan O(1).
+        # Con load=False se empieza vacío y las tareas llegan con add_loaded
+        # (p. ej. cargadas por partes desde un hilo de E/S)
+        if self._pushdown or not load:
+            self._index = {}
+        else:
+            self._index = {task.id: task for task in self.storage.load_all()}
+
+        # Índices secundarios que se mantienen en cada alta, cambio o baja
+        self._priority_index = PriorityIndex(self._index.values())
+        self._status_index = FieldIndex("status", self._index.values())
+        self._category_index = FieldIndex("category", self._index.values())
+        self._deadline_index = DeadlineIndex(self._index.values())
+        self._search_index = SearchIndex(self._index.values())
+        # Los totales (por estado, categoría, vencidas...) se mantienen igual.
+        # En modo pushdown se cuentan recién al pedirlos (una sola pasada)
+        self._statistics = TaskStatistics(self._index.values())
+        self._statistics_loaded = not self._pushdown
+        self._secondary_indexes = [self._priority_index, self._status_index,
+                                   self._category_index, self._deadline_index,
+                                   self._search_index, self._statistics]
+
+    def subscribe(self, callback):
+        """Registra callback(event, payload) para enterarse de los cambios:
+        ("added", tarea), ("updated", tarea), ("deleted", id), ("sorted", None),
+        ("loaded", lista de tareas)"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def _notify(self, event, payload=None):
+        for callback in list(self._listeners):
+            callback(event, payload)
+
+    @property
+    def tasks(self):
+        return self.get_all_tasks()
+
+    @tasks.setter
+    def tasks(self, tasks):
+        if self._pushdown:
+            self.storage.save_all(tasks)
+            self._statistics_loaded = False
+        else:
+            self._index = {task.id: task for task in tasks}
+            self._view = None
+            for index in self._secondary_indexes:
+                index.rebuild(self._index.values())
+
+    def count(self):
+        if self._pushdown:
+            return self.storage.count()
+        return len(self._index)
+
+    def get_page(self, offset, limit):
+        # Tareas en las posiciones [offset, offset + limit) del orden actual
+        if self._pushdown:
+            order_by = "priority" if self._sort_reverse is not None else None
+            return self.storage.query(order_by=order_by, reverse=bool(self._sort_reverse),
+                                      limit=limit, offset=offset)
+        if self._sort_reverse is not None:
+            ids = self._priority_index.page_ids(offset, limit, reverse=self._sort_reverse)
+            return [self._index[task_id] for task_id in ids]
+        if self._view is None:
+            self._view = _View(self._index.values())
+        return self._view.page(offset, limit)
 
     def get_all_tasks(self):
-        return self.tasks
+        if self._pushdown:
+            return self.query()
+        return list(self._ordered())
+
+    def iter_tasks(self):
+        # Recorre las tareas sin construir una lista completa
+        if self._pushdown and self._sort_reverse is None:
+            return self.storage.iter_all()
+        return self._ordered()
+
+    def iter_by_priority(self, reverse=True):
+        # Recorre por prioridad sin ordenar ni cambiar el orden guardado
+        if self._pushdown:
+            return iter(self.storage.query(order_by="priority", reverse=reverse))
+        return (self._index[task_id] for task_id in self._priority_index.iter_ids(reverse))
+
+    def top_k(self, n):
+        # Las n tareas de mayor prioridad (empates en orden de inserción)
+        if self._pushdown:
+            return self.storage.query(order_by="priority", reverse=True, limit=n)
+        return [self._index[task_id] for task_id in self._priority_index.top_ids(n)]
+
+    def _ordered(self):
+        if self._sort_reverse is None:
+            return iter(self._index.values())
+        return self.iter_by_priority(self._sort_reverse)
 
     def get_task(self, task_id):
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        if self._pushdown:
+            return self.storage.get(task_id)
+        return self._index.get(task_id)
+
+    @metrics.timed("task_manager_seconds", op="query")
+    def query(self, status=None, category=None, due_after=None, due_before=None):
+        """Filtra tareas por estado, categoría y rango de fecha límite (inclusivo).
+        Los filtros en None no se aplican."""
+        if self._pushdown:
+            order_by = "priority" if self._sort_reverse is not None else None
+            return self.storage.query(status=status, category=category,
+                                      due_after=due_after, due_before=due_before,
+                                      order_by=order_by, reverse=bool(self._sort_reverse))
+
+        # Se intersectan los conjuntos de ids de cada índice, empezando por
+        # el más chico; el costo depende de los resultados, no del total
+        candidates = []
+        if status is not None:
+            candidates.append(self._status_index.ids(status))
+        if category is not None:
+            candidates.append(self._category_index.ids(category))
+        if due_after is not None or due_before is not None:
+            after = _as_date(due_after)
+            before = _as_date(due_before)
+            candidates.append(set(self._deadline_index.ids_between(
+                after.toordinal() if after else None,
+                before.toordinal() if before else None)))
+        if not candidates:
+            return list(self._ordered())
+
+        candidates.sort(key=len)
+        ids = candidates[0].intersection(*candidates[1:])
+        return [self._index[task_id]
+                for task_id in self._priority_index.sort_ids(ids, self._sort_reverse)]
+
+    @metrics.timed("task_manager_seconds", op="search")
+    def search(self, text):
+        """Tareas cuyo título o descripción contienen todas las palabras de
+        text (como prefijo, sin distinguir mayúsculas ni acentos)."""
+        if self._pushdown:
+            # Sin índice en memoria: se recorre la base
+            tasks = (self.storage.iter_all() if self._sort_reverse is None
+                     else self.iter_by_priority(self._sort_reverse))
+            return [task for task in tasks if matches(task, text)]
+        ids = self._search_index.search(text)
+        return [self._index[task_id]
+                for task_id in self._priority_index.sort_ids(ids, self._sort_reverse)]
+
+    def statistics(self):
+        """Estadísticas agregadas (TaskStatistics), al día con cada cambio.
+        En modo pushdown la primera consulta recorre el almacenamiento y
+        luego se mantienen con los cambios hechos por este gestor."""
+        if not self._statistics_loaded:
+            self._statistics.rebuild(self.storage.iter_all())
+            self._statistics_loaded = True
+        return self._statistics
+
+    def add_loaded(self, tasks):
+        # Incorpora tareas leídas del almacenamiento (no se vuelven a guardar)
+        tasks = list(tasks)
+        self._put_many(tasks)
+        self._notify("loaded", tasks)
 
     def add_task(self, task: Task):
-        # asignar id si no tiene
-        if not getattr(task, "id", None):
-            task.id = str(uuid.uuid4())
-        self.tasks.append(task)
-        self.save()
+        self.add_tasks([task])
 
     def update_task(self, updated_task: Task):
-        for i, task in enumerate(self.tasks):
-            if task.id == updated_task.id:
-                self.tasks[i] = updated_task
-                break
-        self.save()
+        self.update_tasks([updated_task])
 
     def delete_task(self, task_id):
-        self.tasks = [t for t in self.tasks if t.id != task_id]
-        self.save()
+        self.delete_tasks([task_id])
+
+    @metrics.timed("task_manager_seconds", op="add")
+    def add_tasks(self, tasks):
+        """Agrega varias tareas y las guarda en una sola operación."""
+        tasks = list(tasks)
+        metrics.inc("task_mutations_total", len(tasks), op="add")
+        for task in tasks:
+            # asignar id si no tiene
+            if not getattr(task, "id", None):
+                task.id = str(uuid.uuid4())
+        if not self._pushdown:
+            self._put_many(tasks)
+        elif self._statistics_loaded:
+            for task in tasks:
+                self._statistics.add(task)
+        self._persist(added=tasks)
+        for task in tasks:
+            self._notify("added", task)
+        return tasks
+
+    @metrics.timed("task_manager_seconds", op="update")
+    def update_tasks(self, tasks):
+        """Guarda los cambios de varias tareas en una sola operación.
+        Devuelve las que existían."""
+        # Reemplazar en el índice conserva la posición de cada tarea
+        found = [task for task in tasks if self._pushdown or task.id in self._index]
+        metrics.inc("task_mutations_total", len(found), op="update")
+        if not self._pushdown:
+            self._put_many(found)
+        elif self._statistics_loaded:
+            for task in found:
+                # Sin el índice en memoria no se sabe si existía: solo se
+                # actualizan las que ya estaban contadas
+                if task.id in self._statistics:
+                    self._statistics.update(task)
+        self._persist(updated=found)
+        for task in found:
+            self._notify("updated", task)
+        return found
+
+    @metrics.timed("task_manager_seconds", op="delete")
+    def delete_tasks(self, task_ids):
+        """Elimina varias tareas en una sola operación. Devuelve los ids eliminados."""
+        if self._pushdown:
+            removed = list(task_ids)
+            for task_id in removed:
+                self._statistics.remove(task_id)
+        else:
+            removed = self._pop_many(task_ids)
+        metrics.inc("task_mutations_total", len(removed), op="delete")
+        self._persist(deleted=removed)
+        for task_id in removed:
+            self._notify("deleted", task_id)
+        return removed
+
+    @metrics.timed("task_manager_seconds", op="reprioritize")
+    def reprioritize(self, strategy, tasks=None):
+        """Recalcula en bloque las prioridades con una estrategia
+        (assign_priorities) y guarda una sola vez. Sin tasks se recalculan
+        todas. Devuelve las tareas cuya prioridad cambió."""
+        tasks = list(self.iter_tasks()) if tasks is None else list(tasks)
+        previous = [task.priority for task in tasks]
+        strategy.assign_priorities(tasks)
+        changed = [task for task, old in zip(tasks, previous) if task.priority != old]
+        self.update_tasks(changed)
+        return changed
+
+    def _put(self, task):
+        # Agrega o reemplaza una tarea en el índice principal y los secundarios
+        replaced = self._index.get(task.id)
+        self._index[task.id] = task
+        if replaced is None:
+            if self._view is not None:
+                self._view.append(task)
+            for index in self._secondary_indexes:
+                index.add(task)
+        else:
+            if replaced is not task and self._view is not None:
+                self._view.replace(task)
+            for index in self._secondary_indexes:
+                index.update(task)
+
+    def _put_many(self, tasks):
+        # Como _put para un lote: los índices ordenados se rearman una sola
+        # vez en lugar de insertar tarea por tarea
+        if len(tasks) < BULK_MIN:
+            for task in tasks:
+                self._put(task)
+            return
+        for task in tasks:
+            replaced = self._index.get(task.id)
+            self._index[task.id] = task
+            if self._view is None:
+                continue
+            if replaced is None:
+                self._view.append(task)
+            elif replaced is not task:
+                self._view.replace(task)
+        for index in self._secondary_indexes:
+            update_many = getattr(index, "update_many", None)
+            if update_many is not None:
+                update_many(tasks)
+            else:
+                for task in tasks:
+                    index.update(task)
+
+    def _pop(self, task_id):
+        if self._index.pop(task_id, None) is None:
+            return False
+        self._drop_from_view([task_id])
+        for index in self._secondary_indexes:
+            index.remove(task_id)
+        return True
+
+    def _pop_many(self, task_ids):
+        # Como _pop para un lote; devuelve los ids que existían
+        removed = [task_id for task_id in task_ids if self._index.pop(task_id, None) is not None]
+        self._drop_from_view(removed)
+        for index in self._secondary_indexes:
+            remove_many = getattr(index, "remove_many", None)
+            if remove_many is not None:
+                remove_many(removed)
+            else:
+                for task_id in removed:
+                    index.remove(task_id)
+        return removed
+
+    def _drop_from_view(self, task_ids):
+        if self._view is None or not task_ids:
+            return
+        if self._view.stale(len(task_ids)):
+            # Demasiados huecos: sale más barato rearmarla en la próxima página
+            self._view = None
+            return
+        for task_id in task_ids:
+            self._view.remove(task_id)
+
+    def _persist(self, added=(), updated=(), deleted=()):
+        # Guarda un lote de cambios: una reescritura completa o, si el
+        # almacenamiento es incremental, una operación por tipo de cambio
+        if not self._incremental:
+            if self._shared:
+                changed_ids = [task.id for task in added]
+                changed_ids.extend(task.id for task in updated)
+                changed_ids.extend(deleted)
+                if changed_ids:
+                    self.storage.save_all(self._index.values(), changed_ids)
+            elif added or updated or deleted:
+                self.save()
+            return
+        for op, items in (("append", added), ("update", updated), ("delete", deleted)):
+            if not items:
+                continue
+            write_many = getattr(self.storage, op + "_many", None)
+            if write_many is not None:
+                write_many(items)
+            else:
+                for item in items:
+                    getattr(self.storage, op)(item)
+
+    @metrics.timed("task_manager_seconds", op="reload")
+    def reload_if_changed(self):
+        """Vuelve a leer el almacenamiento solo si otro proceso lo cambió
+        (una comprobación barata, p. ej. un stat del archivo) e incorpora
+        los cambios con merge_external. Devuelve True si hubo recarga."""
+        if not self._shared or not self.storage.changed():
+            return False
+        self.merge_external(self.storage.load_changes())
+        return True
+
+    def merge_external(self, tasks):
+        """Deja el índice igual a tasks (el contenido actual del archivo),
+        notificando solo las altas, cambios y bajas que hubo."""
+        incoming = {task.id: task for task in tasks}
+        removed = self._pop_many([task_id for task_id in self._index if task_id not in incoming])
+        added = [task for task_id, task in incoming.items() if task_id not in self._index]
+        updated = [task for task_id, task in incoming.items() if task_id in self._index
+                   and _fields(self._index[task_id]) != _fields(task)]
+        self._put_many(added + updated)
+        for task_id in removed:
+            self._notify("deleted", task_id)
+        for task in added:
+            self._notify("added", task)
+        for task in updated:
+            self._notify("updated", task)
 
     def sort_tasks(self, reverse=True):
         """Ordena la lista de tareas por prioridad.
         reverse=True  -> de mayor prioridad a menor 
-        reverse=False -> de menor a mayor """
-        self.tasks.sort(key=lambda t: t.priority, reverse=reverse)
+        reverse=False -> de menor a mayor
+        No reordena lo guardado: el orden queda como criterio de las
+        consultas (el índice de prioridad en memoria u ORDER BY en SQL)."""
+        self._sort_reverse = reverse
+        self._notify("sorted")
 
     def save(self):
-        self.storage.save_all(self.tasks)
+        if self._pushdown:
+            # Cada cambio ya se guardó en la base de datos
+            return
+        self.storage.save_all(self._index.values())
+
+
+class _View:
+    """Tareas en orden de inserción, accesibles por posición.
+
+    Un reemplazo cambia la tarea en su lugar (id -> posición) y una baja
+    deja un hueco en vez de correr toda la lista; get_page salta los huecos
+    y, cuando son muchos, TaskManager descarta la vista para rearmarla."""
+    __slots__ = ("tasks", "positions", "holes")
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
+        self.positions = {task.id: position for position, task in enumerate(self.tasks)}
+        # Posiciones vacías, ordenadas
+        self.holes = []
+
+    def append(self, task):
+        self.positions[task.id] = len(self.tasks)
+        self.tasks.append(task)
+
+    def replace(self, task):
+        self.tasks[self.positions[task.id]] = task
+
+    def remove(self, task_id):
+        position = self.positions.pop(task_id)
+        self.tasks[position] = None
+        insort(self.holes, position)
+
+    def stale(self, removing):
+        # True si al quitar removing tareas quedarían demasiados huecos
+        return len(self.holes) + removing > max(BULK_MIN, len(self.tasks) // 8)
+
+    def page(self, offset, limit):
+        tasks = self.tasks
+        if not self.holes:
+            return tasks[offset:offset + limit]
+        # Posición de la tarea número offset: se suman los huecos anteriores
+        # hasta que el resultado deja de moverse
+        position = offset
+        while True:
+            moved = offset + bisect_right(self.holes, position)
+            if moved == position:
+                break
+            position = moved
+        page = []
+        while position < len(tasks) and len(page) < limit:
+            if tasks[position] is not None:
+                page.append(tasks[position])
+            position += 1
+        return page
+
+
+def _fields(task):
+    # Compara contenido sin armar (ni cachear) el diccionario de cada tarea
+    return (task.title, task.description, task.category, task.deadline_ordinal,
+            task.priority, task.status)
+
+
+def _as_date(value):
+    # Normaliza str / datetime / date a date para comparar fechas límite
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
@@ -0,0 +1,147 @@
+from datetime import date
+
+
+# Estado que cuenta como terminado (no puede estar vencida)
+DONE_STATUS = "Completado"
+
+
+def week_start(ordinal):
+    # Ordinal del lunes de la semana (el ordinal 1, 0001-01-01, fue lunes)
+    return ordinal - (ordinal - 1) % 7
+
+
+def _bump(counts, key, delta):
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        del counts[key]
+
+
+class TaskStatistics:
+    """Estadísticas agregadas que se mantienen con cada cambio.
+
+    Tiene la misma interfaz add/remove/update/rebuild que los índices de
+    task_indexes, así que TaskManager la actualiza junto con ellos: cada
+    alta, cambio o baja cuesta O(1) y consultar los totales no recorre las
+    tareas.
+
+    Lleva la cuenta por estado, por categoría, por semana de la fecha límite
+    y de tareas vencidas (no completadas con fecha límite anterior a hoy).
+    Para las vencidas se guardan las tareas abiertas por día: cuando cambia
+    el día solo se suman los días que pasaron.
+    """
+
+    def __init__(self, tasks=(), today=None):
+        # today: fecha fija para los cálculos (por defecto, la de hoy)
+        self.today = today
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        self._rows = {}
+        self._by_status = {}
+        self._by_category = {}
+        self._by_week = {}
+        self._open_by_day = {}
+        self._overdue = 0
+        self._today_ordinal = self._current_ordinal()
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        if task.id in self._rows:
+            self.update(task)
+            return
+        row = (task.status, task.category, task.deadline_ordinal)
+        self._rows[task.id] = row
+        self._count(row, 1)
+
+    def remove(self, task_id):
+        row = self._rows.pop(task_id, None)
+        if row is not None:
+            self._count(row, -1)
+
+    def update(self, task):
+        old = self._rows.get(task.id)
+        if old is None:
+            self.add(task)
+            return
+        row = (task.status, task.category, task.deadline_ordinal)
+        if row != old:
+            self._count(old, -1)
+            self._count(row, 1)
+            self._rows[task.id] = row
+
+    def _count(self, row, delta):
+        status, category, ordinal = row
+        _bump(self._by_status, status, delta)
+        _bump(self._by_category, category, delta)
+        _bump(self._by_week, week_start(ordinal), delta)
+        if status != DONE_STATUS:
+            _bump(self._open_by_day, ordinal, delta)
+            if ordinal < self._today_ordinal:
+                self._overdue += delta
+
+    # ===========================
+    # CONSULTAS
+    # ===========================
+    def __contains__(self, task_id):
+        return task_id in self._rows
+
+    @property
+    def total(self):
+        return len(self._rows)
+
+    def count_status(self, status):
+        return self._by_status.get(status, 0)
+
+    def count_category(self, category):
+        return self._by_category.get(category, 0)
+
+    def by_status(self):
+        return dict(self._by_status)
+
+    def by_category(self):
+        return dict(self._by_category)
+
+    def overdue(self):
+        """Tareas no completadas cuya fecha límite ya pasó."""
+        self._roll_day()
+        return self._overdue
+
+    def due_in_week(self, day=None):
+        """Tareas con fecha límite en la semana (lunes a domingo) de day
+        (por defecto, la semana actual)."""
+        ordinal = day.toordinal() if day is not None else self._current_ordinal()
+        return self._by_week.get(week_start(ordinal), 0)
+
+    def by_week(self):
+        """Histograma {lunes de la semana (YYYY-MM-DD): tareas}, ordenado."""
+        return {date.fromordinal(ordinal).isoformat(): count
+                for ordinal, count in sorted(self._by_week.items())}
+
+    def summary(self):
+        return {
+            "total": self.total,
+            "by_status": self.by_status(),
+            "by_category": self.by_category(),
+            "overdue": self.overdue(),
+            "due_by_week": self.by_week(),
+        }
+
+    def _current_ordinal(self):
+        return (self.today or date.today()).toordinal()
+
+    def _roll_day(self):
+        # Cambio de día: las tareas abiertas de los días que pasaron vencen
+        today = self._current_ordinal()
+        if today == self._today_ordinal:
+            return
+        if self._today_ordinal < today <= self._today_ordinal + len(self._open_by_day):
+            for ordinal in range(self._today_ordinal, today):
+                self._overdue += self._open_by_day.get(ordinal, 0)
+        else:
+            # Salto grande (o hacia atrás): se recuenta por día, no por tarea
+            self._overdue = sum(count for ordinal, count in self._open_by_day.items()
+                                if ordinal < today)
+        self._today_ordinal = today
@@ -1,19 +1,72 @@
 import unittest
 import sys
 import os
-from datetime import datetime, timedelta
+import time
+import tracemalloc
+import io
+import json
+import subprocess
+import contextlib
+import random
+from datetime import date, datetime, timedelta
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'source')))
 
 from models import Task
 from task_manager import TaskManager
-from storage_json import JSONStorage
-from priority_strategies import ManualPriorityStrategy, DatePriorityStrategy
+from storage_json import JSONStorage, iter_json_array
+from storage_journal import JournalStorage
+from storage_sqlite import SQLiteStorage, migrate_from_json
+from storage_snapshot import (SnapshotStorage, compare_formats, json_to_snapshot,
+                              snapshot_to_json, write_snapshot)
+from storage_async import AsyncStorage, StorageWorker
+from file_lock import FileLock
+import cli
+import metrics
+import benchmarks
+import asyncio
+from api_server import HTTPError, TaskAPI, serve
+from api_loadtest import request, run_load
+from priority_strategies import (ManualPriorityStrategy, DatePriorityStrategy,
+                                 CategoryPriorityStrategy, WeightedPriorityStrategy)
+from priority_scheduler import DatePriorityScheduler
+from task_stats import TaskStatistics
 
 
 print("PRUEBAS SISTEMA GESTIÓN DE TAREAS")
 
 
+# Los benchmarks usan tamaños pequeños por defecto; con TAREAS_BENCH=1
+# se ejecutan con los tamaños completos (1k / 100k / 1M).
+BENCH_COMPLETO = bool(os.environ.get("TAREAS_BENCH"))
+TAMANOS_BENCH = [1_000, 100_000, 1_000_000] if BENCH_COMPLETO else [1_000]
+
+
+class MemoryStorage:
+    """Almacenamiento en memoria para medir TaskManager sin disco"""
+
+    def __init__(self, tasks=None):
+        self.tasks = list(tasks or [])
+
+    def load_all(self):
+        return list(self.tasks)
+
+    def save_all(self, tasks):
+        pass
+
+
+def borrar_archivo(nombre):
+    # Borra el archivo de prueba y los auxiliares que crean los almacenamientos
+    for sufijo in ("", ".bak", ".tmp", ".corrupt", ".lock"):
+        if os.path.exists(nombre + sufijo):
+            os.remove(nombre + sufijo)
+
+
+def generar_tareas(n):
+    return [Task(f"Tarea {i}", "D", "C", "2025-12-31", priority=i % 10,
+                 task_id=str(i)) for i in range(n)]
+
+
 
 class TestTask(unittest.TestCase):
     """Pruebas básicas de Task"""
@@ -31,6 +84,79 @@ class TestTask(unittest.TestCase):
         self.assertEqual(tarea_nueva.title, "Test")
         print("✓ Task - Creación y conversión: OK")
 
+    def test_cache_serializacion(self):
+        """to_dict reutiliza el resultado hasta que la tarea cambia"""
+        tarea = Task("Test", "Descripción", "Personal", "2025-12-31")
+        self.assertIs(tarea.to_dict(), tarea.to_dict())
+
+        tarea.deadline = datetime(2026, 1, 15, 10, 30)
+        self.assertEqual(tarea.to_dict()["deadline"], "2026-01-15")
+        tarea.status = "Completado"
+        self.assertEqual(tarea.to_dict()["status"], "Completado")
+        self.assertEqual(tarea.deadline, datetime(2026, 1, 15))
+        print("✓ Task - Caché de serialización: OK")
+
+    def test_carga_en_bloque(self):
+        """from_dicts equivale a from_dict, también con registros incompletos"""
+        datos = [
+            Task("A", "D", "Personal", "2025-12-31", priority=3, task_id="a").to_dict(),
+            {"id": "b", "title": "B", "deadline": "2025-1-5"},
+        ]
+        rapidas = list(Task.from_dicts(datos))
+        normales = [Task.from_dict(d) for d in datos]
+        self.assertEqual([t.to_dict() for t in rapidas], [t.to_dict() for t in normales])
+        self.assertEqual(rapidas[1].category, "General")
+        print("✓ Task - Carga en bloque: OK")
+
+    def test_benchmark_carga(self):
+        """Tiempo de carga: from_dict (strptime) frente a from_dicts"""
+        tamanos = [100_000, 1_000_000] if BENCH_COMPLETO else [10_000]
+        for n in tamanos:
+            datos = [{"id": str(i), "title": f"Tarea {i}", "description": "D",
+                      "category": "C", "deadline": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                      "priority": 5, "status": "Pendiente"} for i in range(n)]
+
+            inicio = time.perf_counter()
+            normales = [Task.from_dict(d) for d in datos]
+            antes = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            rapidas = list(Task.from_dicts(datos))
+            despues = time.perf_counter() - inicio
+
+            self.assertEqual(rapidas[-1].to_dict(), normales[-1].to_dict())
+            print(f"  {n:>9} registros: from_dict {antes:.2f}s, from_dicts {despues:.2f}s")
+
+    def test_benchmark_memoria(self):
+        """Bytes por tarea: objeto con __dict__ y datetime frente a __slots__"""
+
+        class TareaSinSlots:
+            # Representación anterior de Task
+            def __init__(self, title, description, category, deadline, priority, status, task_id):
+                self.id = task_id
+                self.title = title
+                self.description = description
+                self.category = category
+                self.priority = priority
+                self.status = status
+                self.deadline = datetime.strptime(deadline, "%Y-%m-%d")
+
+        def bytes_por_tarea(clase, n):
+            tracemalloc.start()
+            inicio = tracemalloc.get_traced_memory()[0]
+            tareas = [clase("T", "D", "C", "2025-12-31", 5, "Pendiente", "id")
+                      for _ in range(n)]
+            total = tracemalloc.get_traced_memory()[0] - inicio
+            tracemalloc.stop()
+            del tareas
+            return total / n
+
+        n = 100_000 if BENCH_COMPLETO else 5_000
+        antes = bytes_por_tarea(TareaSinSlots, n)
+        despues = bytes_por_tarea(Task, n)
+        print(f"  {n} tareas: {antes:.0f} B/tarea antes, {despues:.0f} B/tarea con __slots__")
+        self.assertLess(despues, antes)
+
 
 class TestStorage(unittest.TestCase):
     """Pruebas de almacenamiento JSON"""
@@ -39,8 +165,7 @@ class TestStorage(unittest.TestCase):
         self.test_file = "test_temp.json"
     
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        borrar_archivo(self.test_file)
     
     def test_guardar_y_cargar(self):
         """Guardar tareas y cargarlas después"""
@@ -58,19 +183,1132 @@ class TestStorage(unittest.TestCase):
         self.assertEqual(tareas_cargadas[0].title, "T1")
         print("✓ Storage - Guardar y cargar: OK")
 
+    def test_prioridad_como_texto(self):
+        """Un archivo editado a mano con prioridades no numéricas se carga igual"""
+        registros = [{"id": i, "title": i, "description": "", "category": "C",
+                      "deadline": "2025-12-31", "priority": prioridad, "status": "Pendiente"}
+                     for i, prioridad in (("a", "7"), ("b", "alta"), ("c", 2.0), ("d", None))]
+        with open(self.test_file, "w") as f:
+            json.dump(registros, f)
+        manager = TaskManager(JSONStorage(self.test_file))
+        self.assertEqual([t.priority for t in manager.get_all_tasks()], [7, 5, 2, 5])
+        self.assertEqual([t.id for t in manager.top_k(2)], ["a", "b"])
+        print("✓ Storage - Prioridad como texto: OK")
+
+
+class TestCargaStreaming(unittest.TestCase):
+    """Pruebas del cargador JSON por partes"""
+
+    def setUp(self):
+        self.test_file = "test_streaming.json"
+        borrar_archivo(self.test_file)
+
+    def tearDown(self):
+        borrar_archivo(self.test_file)
+
+    def test_bloques_pequenos(self):
+        """Elementos partidos entre bloques se decodifican igual que json.loads"""
+        texto = json.dumps([{"a": 1, "b": "Diseño, [x]"}, 12345, [1, 2], {}], indent=4)
+        for tamano in (1, 3, 7, 1024):
+            elementos = list(iter_json_array(io.StringIO(texto), chunk_size=tamano))
+            self.assertEqual(elementos, json.loads(texto))
+        self.assertEqual(list(iter_json_array(io.StringIO("  "))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"a": 1}, {"b"')))
+        print("✓ Streaming - Bloques pequeños: OK")
+
+    def test_iter_all_memoria_acotada(self):
+        """iter_all recorre el archivo sin cargarlo completo"""
+        storage = JSONStorage(self.test_file)
+        storage.save_all(generar_tareas(20_000))
+
+        tracemalloc.start()
+        total = sum(1 for _ in storage.iter_all())
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.assertEqual(total, 20_000)
+        self.assertLess(pico, os.path.getsize(self.test_file))
+        print(f"  pico {pico / 1024:.0f} KiB para un archivo de "
+              f"{os.path.getsize(self.test_file) / 1024:.0f} KiB")
+        print("✓ Streaming - Memoria acotada: OK")
+
+
+class TestEscrituraSegura(unittest.TestCase):
+    """Pruebas de escritura atómica, agrupación y recuperación en JSONStorage"""
+
+    def setUp(self):
+        self.test_file = "test_seguro.json"
+        borrar_archivo(self.test_file)
+
+    def tearDown(self):
+        borrar_archivo(self.test_file)
+
+    def test_recupera_ultima_instantanea(self):
+        """Un archivo dañado se aparta y se carga la copia anterior"""
+        storage = JSONStorage(self.test_file)
+        storage.save_all([Task("T1", "D", "C", "2025-12-31")])
+        storage.save_all([Task("T1", "D", "C", "2025-12-31"), Task("T2", "D", "C", "2025-12-31")])
+
+        with open(self.test_file, "w") as f:
+            f.write('[{"id": "cortado", "tit')
+
+        tareas = JSONStorage(self.test_file).load_all()
+        self.assertEqual([t.title for t in tareas], ["T1"])
+        self.assertTrue(os.path.exists(self.test_file + ".corrupt"))
+        print("✓ Storage - Recuperación de instantánea: OK")
+
+    def test_agrupa_escrituras(self):
+        """Con flush_every=N solo se escribe cada N cambios"""
+        storage = JSONStorage(self.test_file, flush_every=3)
+        manager = TaskManager(storage)
+        manager.add_task(Task("T1", "D", "C", "2025-12-31"))
+        manager.add_task(Task("T2", "D", "C", "2025-12-31"))
+        self.assertEqual(JSONStorage(self.test_file).load_all(), [])
+
+        manager.add_task(Task("T3", "D", "C", "2025-12-31"))
+        self.assertEqual(len(JSONStorage(self.test_file).load_all()), 3)
+
+        manager.add_task(Task("T4", "D", "C", "2025-12-31"))
+        storage.close()
+        self.assertEqual(len(JSONStorage(self.test_file).load_all()), 4)
+        print("✓ Storage - Agrupación de escrituras: OK")
+
+    def test_escritura_diferida(self):
+        """Con flush_interval_ms el archivo se escribe tras el intervalo"""
+        storage = JSONStorage(self.test_file, flush_interval_ms=100)
+        storage.save_all([Task("T1", "D", "C", "2025-12-31")])
+        storage.save_all([Task("T1", "D", "C", "2025-12-31"), Task("T2", "D", "C", "2025-12-31")])
+        # Solo con el intervalo, los cambios no se escriben uno por uno
+        self.assertEqual(JSONStorage(self.test_file).load_all(), [])
+        time.sleep(0.3)
+        self.assertEqual(len(JSONStorage(self.test_file).load_all()), 2)
+        storage.close()
+        print("✓ Storage - Escritura diferida: OK")
+
+    def test_lotes_sin_copia(self):
+        """Agrupando escrituras se guarda una sola vez lo último de la colección"""
+        storage = JSONStorage(self.test_file, flush_every=sys.maxsize)
+        manager = TaskManager(storage)
+        escrituras = []
+        escribir = storage._write_atomic
+        storage._write_atomic = lambda texto: (escrituras.append(texto), escribir(texto))
+        for inicio in range(0, 300, 100):
+            manager.add_tasks(generar_tareas(300)[inicio:inicio + 100])
+        tarea = manager.get_task("5")
+        tarea.title = "Cambiada después del último lote"
+        manager.update_task(tarea)
+        self.assertEqual(escrituras, [])
+
+        storage.close()
+        self.assertEqual(len(escrituras), 1)
+        tareas = JSONStorage(self.test_file).load_all()
+        self.assertEqual(len(tareas), 300)
+        self.assertEqual(tareas[5].title, "Cambiada después del último lote")
+        print("✓ Storage - Lotes sin copia: OK")
+
+
+class TestJournalStorage(unittest.TestCase):
+    """Pruebas del almacenamiento en diario"""
+
+    def setUp(self):
+        self.test_file = "test_journal.jsonl"
+        borrar_archivo(self.test_file)
+
+    def tearDown(self):
+        borrar_archivo(self.test_file)
+
+    def test_operaciones_incrementales(self):
+        """El gestor escribe registros pequeños y se reproducen al cargar"""
+        storage = JournalStorage(self.test_file)
+        manager = TaskManager(storage)
+        t1 = Task("T1", "D1", "Cat1", "2025-12-31")
+        t2 = Task("T2", "D2", "Cat2", "2025-11-30")
+        manager.add_task(t1)
+        manager.add_task(t2)
+        t1.title = "T1 modificada"
+        manager.update_task(t1)
+        manager.delete_task(t2.id)
+        storage.close()
+
+        with open(self.test_file, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+        storage = JournalStorage(self.test_file)
+        tareas = TaskManager(storage).get_all_tasks()
+        storage.close()
+        self.assertEqual([t.title for t in tareas], ["T1 modificada"])
+        print("✓ Journal - Operaciones incrementales: OK")
+
+    def test_compactacion(self):
+        """Al superar el umbral el diario se compacta sin perder datos"""
+        storage = JournalStorage(self.test_file, compact_threshold=2048, background=False)
+        tarea = Task("T", "D", "C", "2025-12-31")
+        storage.append(tarea)
+        for i in range(100):
+            tarea.priority = i
+            storage.update(tarea)
+        storage.close()
+
+        self.assertLess(os.path.getsize(self.test_file), 4096)
+        storage = JournalStorage(self.test_file)
+        tareas = storage.load_all()
+        storage.close()
+        self.assertEqual(len(tareas), 1)
+        self.assertEqual(tareas[0].priority, 99)
+        print("✓ Journal - Compactación: OK")
+
+    def test_compactacion_y_guardado_simultaneos(self):
+        """Un save_all entre las dos fases de la compactación no se pierde"""
+        storage = JournalStorage(self.test_file, background=False)
+        storage.append_many(generar_tareas(20))
+        unica = Task("Única", "D", "C", "2025-12-31", task_id="unica")
+        replay = storage._replay
+
+        def replay_y_guardar(limit=None):
+            records = replay(limit)
+            storage.save_all([unica])
+            return records
+
+        storage._replay = replay_y_guardar
+        storage.compact()
+        storage._replay = replay
+        storage.close()
+
+        storage = JournalStorage(self.test_file)
+        tareas = storage.load_all()
+        storage.close()
+        self.assertEqual([t.id for t in tareas], ["unica"])
+        print("✓ Journal - Compactación y guardado simultáneos: OK")
+
+    def test_registro_incompleto(self):
+        """Una escritura cortada no impide cargar ni seguir escribiendo"""
+        storage = JournalStorage(self.test_file)
+        storage.append(Task("T1", "D", "C", "2025-12-31"))
+        storage.close()
+        with open(self.test_file, "ab") as f:
+            f.write(b'{"op": "put", "task": {"id": "x"')
+
+        storage = JournalStorage(self.test_file)
+        storage.append(Task("T2", "D", "C", "2025-12-31"))
+        tareas = storage.load_all()
+        storage.close()
+        self.assertEqual([t.title for t in tareas], ["T1", "T2"])
+        print("✓ Journal - Registro incompleto: OK")
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Pruebas del almacenamiento SQLite y las consultas en SQL"""
+
+    def setUp(self):
+        self.test_file = "test_tasks.db"
+        self.json_file = "test_migracion.json"
+        for f in (self.test_file, self.json_file):
+            borrar_archivo(f)
+        self.storage = SQLiteStorage(self.test_file)
+        self.manager = TaskManager(self.storage)
+
+    def tearDown(self):
+        self.storage.close()
+        for f in (self.test_file, self.json_file):
+            borrar_archivo(f)
+
+    def test_crud_y_orden(self):
+        """El gestor delega búsqueda, cambios y orden en SQLite"""
+        t1 = Task("Baja", "D", "Personal", "2025-12-31", priority=2)
+        t2 = Task("Alta", "D", "Universidad", "2025-11-30", priority=10)
+        self.manager.add_task(t1)
+        self.manager.add_task(t2)
+        self.assertEqual(self.manager._index, {})
+
+        t1.status = "Completado"
+        self.manager.update_task(t1)
+        self.assertEqual(self.manager.get_task(t1.id).status, "Completado")
+
+        self.manager.sort_tasks(reverse=True)
+        self.assertEqual([t.title for t in self.manager.get_all_tasks()], ["Alta", "Baja"])
+
+        self.assertEqual([t.title for t in self.manager.get_page(1, 5)], ["Baja"])
+
+        self.manager.delete_task(t2.id)
+        self.assertIsNone(self.manager.get_task(t2.id))
+        self.assertEqual(len(self.manager.get_all_tasks()), 1)
+        print("✓ SQLite - CRUD y orden: OK")
+
+    def test_filtros(self):
+        """Filtros por estado, categoría y rango de fechas"""
+        self.manager.add_task(Task("A", "D", "Personal", "2025-11-01"))
+        self.manager.add_task(Task("B", "D", "Personal", "2025-11-15", status="Completado"))
+        self.manager.add_task(Task("C", "D", "Universidad", "2025-12-01"))
+
+        self.assertEqual([t.title for t in self.manager.query(category="Personal")], ["A", "B"])
+        self.assertEqual([t.title for t in self.manager.query(status="Pendiente")], ["A", "C"])
+        rango = self.manager.query(due_after="2025-11-10", due_before=datetime(2025, 12, 1))
+        self.assertEqual([t.title for t in rango], ["B", "C"])
+        self.assertEqual([t.title for t in self.manager.search("c")], ["C"])
+
+        # La consulta en memoria da los mismos resultados
+        memoria = TaskManager(MemoryStorage(self.storage.load_all()))
+        rango = memoria.query(due_after="2025-11-10", due_before=datetime(2025, 12, 1))
+        self.assertEqual([t.title for t in rango], ["B", "C"])
+        print("✓ SQLite - Filtros: OK")
+
+    def test_migracion_desde_json(self):
+        """Migrar un tasks.json existente"""
+        JSONStorage(self.json_file).save_all([
+            Task("T1", "D1", "Cat1", "2025-12-31"),
+            Task("T2", "D2", "Cat2", "2025-11-30"),
+        ])
+        self.storage.close()
+        os.remove(self.test_file)
+
+        self.assertEqual(migrate_from_json(self.json_file, self.test_file), 2)
+        self.storage = SQLiteStorage(self.test_file)
+        self.assertEqual([t.title for t in self.storage.load_all()], ["T1", "T2"])
+        print("✓ SQLite - Migración desde JSON: OK")
+
+
+class TestEntradaSalidaAsincrona(unittest.TestCase):
+    """Pruebas de la E/S en segundo plano"""
+
+    def setUp(self):
+        self.test_file = "test_async.jsonl"
+        borrar_archivo(self.test_file)
+        self.worker = StorageWorker()
+
+    def tearDown(self):
+        self.worker.close()
+        borrar_archivo(self.test_file)
+
+    def test_escrituras_en_orden_y_vaciado(self):
+        """Las escrituras se aplican en orden y close espera a todas"""
+        storage = AsyncStorage(JournalStorage(self.test_file), self.worker)
+        manager = TaskManager(storage, load=False)
+        tarea = Task("T", "D", "C", "2025-12-31")
+        manager.add_task(tarea)
+        for i in range(50):
+            tarea.priority = i
+            manager.update_task(tarea)
+        manager.delete_task(tarea.id)
+        manager.add_task(Task("Final", "D", "C", "2025-12-31"))
+        storage.close()
+
+        storage = JournalStorage(self.test_file)
+        tareas = storage.load_all()
+        storage.close()
+        self.assertEqual([t.title for t in tareas], ["Final"])
+        print("✓ Async - Escrituras en orden: OK")
+
+    def test_carga_por_lotes(self):
+        """La carga llega por lotes y se aplica al procesar los resultados"""
+        manager = TaskManager(MemoryStorage(), load=False)
+        lotes = []
+        fin = []
+        manager.subscribe(lambda evento, dato: lotes.append(len(dato)))
+        self.worker.stream(lambda: iter(generar_tareas(2500)), on_batch=manager.add_loaded,
+                           on_done=lambda resultado, error: fin.append(error), batch_size=1000)
+        self.worker.close()
+
+        self.assertEqual(manager.count(), 0)
+        self.worker.process_results()
+        self.assertEqual(lotes, [1000, 1000, 500])
+        self.assertEqual(fin, [None])
+        self.assertEqual(manager.count(), 2500)
+        print("✓ Async - Carga por lotes: OK")
+
+    def test_cambios_durante_la_carga(self):
+        """Un cambio antes de terminar la carga no pisa las tareas aún no leídas"""
+        archivo = "test_async.json"
+        borrar_archivo(archivo)
+        self.addCleanup(borrar_archivo, archivo)
+        JSONStorage(archivo).save_all(generar_tareas(5000))
+
+        storage = AsyncStorage(JSONStorage(archivo), self.worker)
+        manager = TaskManager(storage, load=False)
+        self.worker.stream(storage.iter_all, on_batch=manager.add_loaded)
+        # Solo se procesa parte de la carga antes de agregar
+        self.worker.process_results(limit=2)
+        manager.add_task(Task("Nueva", "D", "C", "2025-12-31", task_id="nueva"))
+        storage.close()
+
+        tareas = JSONStorage(archivo).load_all()
+        self.assertEqual(len(tareas), 5001)
+        self.assertIn("nueva", {t.id for t in tareas})
+        print("✓ Async - Cambios durante la carga: OK")
+
+    def test_archivo_danado_durante_la_carga(self):
+        """Si el archivo resulta dañado a mitad de la carga, lo ya cargado
+        se reemplaza por la copia de respaldo"""
+        archivo = "test_async.json"
+        borrar_archivo(archivo)
+        self.addCleanup(borrar_archivo, archivo)
+        self.addCleanup(borrar_archivo, archivo + ".bak")
+        self.addCleanup(borrar_archivo, archivo + ".corrupt")
+        respaldo = [Task(f"B{i}", "D", "C", "2025-12-31", task_id=f"b{i}") for i in range(3)]
+        JSONStorage(archivo + ".bak").save_all(respaldo)
+        nuevas = [Task(f"N{i}", "D", "C", "2025-12-31", task_id=f"n{i}") for i in range(3)]
+        JSONStorage(archivo).save_all(respaldo + nuevas)
+        with open(archivo, "r+") as f:
+            texto = f.read()
+            f.seek(0)
+            f.truncate()
+            f.write(texto[:-20])
+
+        storage = AsyncStorage(JSONStorage(archivo), self.worker)
+        manager = TaskManager(storage, load=False)
+        fin = []
+        self.worker.stream(storage.iter_all, on_batch=manager.add_loaded,
+                           on_done=lambda resultado, error: fin.append(error), batch_size=2)
+        limite = time.time() + 10
+        while not fin and time.time() < limite:
+            self.worker.process_results()
+        self.assertIsInstance(fin[0], ValueError)
+        self.assertGreater(manager.count(), 0)
+
+        # Lo que hace la interfaz: releer con load_all y reemplazar
+        manager.merge_external(storage.load_all())
+        self.assertEqual([t.id for t in manager.get_all_tasks()], ["b0", "b1", "b2"])
+        manager.add_task(Task("X", "D", "C", "2025-12-31", task_id="x"))
+        storage.close()
+        self.assertEqual([t.id for t in JSONStorage(archivo).load_all()],
+                         ["b0", "b1", "b2", "x"])
+        print("✓ Async - Archivo dañado durante la carga: OK")
+
+
+class TestOperacionesEnLote(unittest.TestCase):
+    """Pruebas de los métodos en lote y de importar/exportar"""
+
+    def setUp(self):
+        self.archivos = ["test_lote.json", "test_lote.jsonl", "test_lote.csv", "test_salida.jsonl"]
+        for archivo in self.archivos:
+            borrar_archivo(archivo)
+
+    def tearDown(self):
+        for archivo in self.archivos:
+            borrar_archivo(archivo)
+
+    def test_un_guardado_por_lote(self):
+        """add_tasks, update_tasks y delete_tasks guardan una vez por lote"""
+        class ContadorStorage(MemoryStorage):
+            guardados = 0
+
+            def save_all(self, tasks):
+                self.guardados += 1
+
+        storage = ContadorStorage()
+        manager = TaskManager(storage)
+        tareas = manager.add_tasks(generar_tareas(100))
+        for tarea in tareas:
+            tarea.status = "Completado"
+        manager.update_tasks(tareas)
+        manager.delete_tasks([t.id for t in tareas[:50]])
+
+        self.assertEqual(storage.guardados, 3)
+        self.assertEqual(len(manager.query(status="Completado")), 50)
+        print("✓ Lote - Un guardado por lote: OK")
+
+    def test_importar_y_exportar(self):
+        """CSV -> diario -> JSON Lines conserva los datos"""
+        with open("test_lote.csv", "w", encoding="utf-8", newline="") as f:
+            f.write("title,description,category,deadline,priority,status\n")
+            f.write("Diseño,Proyecto,Universidad,2025-11-18,7,\n")
+            f.write("Compras,,Personal,2025-11-20,,Completado\n")
+
+        self.assertEqual(cli.main(["--store", "test_lote.jsonl", "import", "test_lote.csv",
+                                   "--batch-size", "1"]), 0)
+        cli.main(["--store", "test_lote.jsonl", "export", "test_salida.jsonl"])
+
+        with open("test_salida.jsonl", encoding="utf-8") as f:
+            registros = [json.loads(linea) for linea in f]
+        self.assertEqual([r["title"] for r in registros], ["Diseño", "Compras"])
+        self.assertEqual(registros[0]["priority"], 7)
+        self.assertEqual(registros[1]["priority"], 5)
+        self.assertEqual(registros[0]["status"], "Pendiente")
+        print("✓ Lote - Importar y exportar: OK")
+
+    def test_importar_json_una_escritura(self):
+        """Con JSONStorage la importación escribe el archivo una sola vez"""
+        with open("test_lote.jsonl", "w", encoding="utf-8") as f:
+            for tarea in generar_tareas(30):
+                f.write(json.dumps(tarea.to_dict()) + "\n")
+
+        cli.main(["--store", "test_lote.json", "import", "test_lote.jsonl", "--batch-size", "10"])
+        self.assertEqual(len(JSONStorage("test_lote.json").load_all()), 30)
+        # La copia de seguridad es el archivo vacío inicial: hubo una sola escritura
+        with open("test_lote.json.bak") as f:
+            self.assertEqual(f.read(), "[]")
+        print("✓ Lote - Importación JSON en una escritura: OK")
+
+
+class TestLineaDeComandos(unittest.TestCase):
+    """Pruebas de los comandos sin interfaz gráfica"""
+
+    def setUp(self):
+        borrar_archivo("test_cli.json")
+        borrar_archivo("test_cli.db")
+
+    def tearDown(self):
+        borrar_archivo("test_cli.json")
+        borrar_archivo("test_cli.db")
+
+    def ejecutar(self, *argumentos, store="test_cli.json"):
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            codigo = cli.main(["--store", store, *argumentos])
+        return codigo, salida.getvalue().splitlines()
+
+    def test_comandos(self):
+        """add, done, query, reprioritize y list sobre el mismo archivo"""
+        _, (id_diseno,) = self.ejecutar("add", "Diseño", "--deadline", "2025-11-18",
+                                        "--category", "Universidad", "--priority", "2")
+        self.ejecutar("add", "Compras", "--deadline", "2025-11-20", "--category", "Personal")
+
+        self.assertEqual(self.ejecutar("done", id_diseno)[0], 0)
+        _, lineas = self.ejecutar("query", "--status", "Completado")
+        self.assertEqual([linea.split("\t")[0] for linea in lineas], [id_diseno])
+
+        self.ejecutar("reprioritize", "--strategy", "category")
+        _, lineas = self.ejecutar("list", "--sort", "--limit", "1")
+        self.assertEqual(lineas[0].split("\t")[-1], "Diseño")
+        self.assertEqual(lineas[0].split("\t")[2], "8")
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(self.ejecutar("done", "no-existe")[0], 1)
+        print("✓ CLI - Comandos: OK")
+
+    def test_orden_en_base_de_datos(self):
+        """list --sort ordena también sobre SQLite (consultas en la base)"""
+        for titulo, prioridad in (("Baja", "1"), ("Alta", "9"), ("Media", "5")):
+            self.ejecutar("add", titulo, "--deadline", "2025-12-01", "--priority", prioridad,
+                          store="test_cli.db")
+        titulos = lambda lineas: [linea.split("\t")[-1] for linea in lineas]
+        self.assertEqual(titulos(self.ejecutar("list", store="test_cli.db")[1]),
+                         ["Baja", "Alta", "Media"])
+        self.assertEqual(titulos(self.ejecutar("list", "--sort", store="test_cli.db")[1]),
+                         ["Alta", "Media", "Baja"])
+        self.assertEqual(titulos(self.ejecutar("list", "--sort", "--limit", "2",
+                                               store="test_cli.db")[1]), ["Alta", "Media"])
+        print("✓ CLI - Orden en base de datos: OK")
+
+    def test_no_importa_tkinter(self):
+        """La línea de comandos no carga tkinter ni la interfaz"""
+        codigo = (f"import sys, cli; cli.main(['--store', {os.path.abspath('test_cli.json')!r}, 'list']); "
+                  "print('tkinter' in sys.modules, 'ui' in sys.modules)")
+        resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(cli.__file__)))
+        self.assertEqual(resultado.stdout.strip().splitlines()[-1], "False False")
+        print("✓ CLI - Sin tkinter: OK")
+
+    def test_benchmark_arranque(self):
+        """Benchmark: arranque en frío de la CLI frente a importar la interfaz gráfica"""
+        carpeta = os.path.dirname(os.path.abspath(cli.__file__))
+        archivo = os.path.abspath("test_cli.json")
+        comandos = {
+            "CLI list": [sys.executable, "cli.py", "--store", archivo, "list"],
+            "GUI import": [sys.executable, "-c", "import app"],
+        }
+        repeticiones = 5 if BENCH_COMPLETO else 2
+        for nombre, comando in comandos.items():
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                subprocess.run(comando, cwd=carpeta, capture_output=True, check=True)
+                tiempos.append(time.perf_counter() - inicio)
+            print(f"  {nombre:<10}: {min(tiempos) * 1000:.1f} ms")
+        print("✓ CLI - Benchmark de arranque: OK")
+
+
+class TestAPI(unittest.TestCase):
+    """Pruebas de la API HTTP local y su control de concurrencia"""
+
+    def con_servidor(self, prueba, tareas=()):
+        # Levanta la API sobre un TaskManager en memoria y ejecuta prueba(host, puerto, manager)
+        manager = TaskManager(MemoryStorage(tareas))
+
+        async def ejecutar():
+            servidor = await serve(TaskAPI(manager), "127.0.0.1", 0)
+            try:
+                return await prueba("127.0.0.1", servidor.sockets[0].getsockname()[1], manager)
+            finally:
+                servidor.close()
+                await servidor.wait_closed()
+
+        return asyncio.run(ejecutar())
+
+    def test_crud_y_consultas(self):
+        """Alta, lectura, cambio, consulta y baja por HTTP"""
+        async def prueba(host, puerto, manager):
+            reader, writer = await asyncio.open_connection(host, puerto)
+            estado, cabeceras, tarea = await request(reader, writer, "POST", "/tasks", {
+                "title": "Diseño", "category": "Universidad", "deadline": "2025-11-18"})
+            self.assertEqual(estado, 201)
+            version = tarea["version"]
+            self.assertEqual(cabeceras["etag"], f'"{version}"')
+
+            estado, _, tarea = await request(reader, writer, "PATCH", f"/tasks/{tarea['id']}",
+                                             {"status": "Completado", "version": version})
+            self.assertEqual(estado, 200)
+            self.assertNotEqual(tarea["version"], version)
+            self.assertEqual(manager.get_task(tarea["id"]).status, "Completado")
+
+            _, _, lista = await request(reader, writer, "GET", "/tasks?status=Completado")
+            self.assertEqual([t["title"] for t in lista], ["Diseño"])
+            _, _, lista = await request(reader, writer, "GET", "/tasks?q=dise")
+            self.assertEqual(len(lista), 1)
+
+            self.assertEqual((await request(reader, writer, "POST", "/tasks", {"title": "x"}))[0], 400)
+            self.assertEqual((await request(reader, writer, "GET", "/tasks/no-existe"))[0], 404)
+            self.assertEqual((await request(reader, writer, "DELETE", f"/tasks/{tarea['id']}"))[0], 204)
+            self.assertEqual(manager.count(), 0)
+            writer.close()
+
+        self.con_servidor(prueba)
+        print("✓ API - CRUD y consultas: OK")
+
+    def test_validacion(self):
+        """Tipos no válidos dan 400 sin tocar el gestor; 413 cierra la conexión"""
+        async def prueba(host, puerto, manager):
+            reader, writer = await asyncio.open_connection(host, puerto)
+            for datos in ({"title": 5, "deadline": "2025-12-01"},
+                          {"title": "T", "category": ["a"], "deadline": "2025-12-01"},
+                          {"title": "T", "deadline": 20251201}):
+                self.assertEqual((await request(reader, writer, "POST", "/tasks", datos))[0], 400)
+            self.assertEqual(manager.count(), 1)
+            self.assertEqual((await request(reader, writer, "PATCH", "/tasks/0", {"status": 3}))[0], 400)
+            self.assertEqual(manager.get_task("0").status, "Pendiente")
+
+            await request(reader, writer, "POST", "/tasks", {"title": "Tarea nueva",
+                                                             "deadline": "2026-03-01"})
+            _, _, lista = await request(reader, writer, "GET", "/tasks?q=tarea&due_after=2026-01-01")
+            self.assertEqual([t["title"] for t in lista], ["Tarea nueva"])
+            self.assertEqual((await request(reader, writer, "GET", "/tasks?q=tarea&due_before=x"))[0], 400)
+            for consulta in ("limit=-1", "offset=-1", "offset=-1&limit=5"):
+                self.assertEqual((await request(reader, writer, "GET", f"/tasks?{consulta}"))[0], 400)
+            for datos in ({"title": "T", "deadline": "2025-12-01", "priority": "alta"},
+                          {"title": "T", "deadline": "01/12/2025"}):
+                self.assertEqual((await request(reader, writer, "POST", "/tasks", datos))[0], 400)
+
+            # Content-Length no numérico o negativo: 400 y se cierra
+            for largo in ("abc", "-5"):
+                otro_reader, otro_writer = await asyncio.open_connection(host, puerto)
+                otro_writer.write(f"POST /tasks HTTP/1.1\r\nContent-Length: {largo}\r\n\r\n"
+                                  .encode())
+                await otro_writer.drain()
+                self.assertTrue((await otro_reader.read()).startswith(b"HTTP/1.1 400"))
+                otro_writer.close()
+
+            # Cuerpo demasiado grande: se responde 413 y se cierra sin leerlo
+            writer.write(f"POST /tasks HTTP/1.1\r\nContent-Length: {1 << 21}\r\n\r\n".encode()
+                         + b"GET /tasks HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            respuesta = await reader.read()
+            writer.close()
+            return respuesta
+
+        respuesta = self.con_servidor(prueba, generar_tareas(1))
+        self.assertTrue(respuesta.startswith(b"HTTP/1.1 413"))
+        self.assertIn(b"Connection: close", respuesta)
+        self.assertEqual(respuesta.count(b"HTTP/1.1"), 1)
+        print("✓ API - Validación: OK")
+
+    def test_conflicto_de_version(self):
+        """Dos clientes editan la misma versión: el segundo recibe 409"""
+        async def prueba(host, puerto, manager):
+            reader, writer = await asyncio.open_connection(host, puerto)
+            ruta = "/tasks/0"
+            _, cabeceras, _ = await request(reader, writer, "GET", ruta)
+            primero = await request(reader, writer, "PUT", ruta, {"priority": 9},
+                                    {"If-Match": cabeceras["etag"]})
+            segundo = await request(reader, writer, "PUT", ruta, {"priority": 1},
+                                    {"If-Match": cabeceras["etag"]})
+            writer.close()
+            return primero, segundo
+
+        primero, segundo = self.con_servidor(prueba, generar_tareas(1))
+        self.assertEqual(primero[0], 200)
+        self.assertEqual(segundo[0], 409)
+        self.assertEqual(segundo[2]["task"]["priority"], 9)
+        self.assertEqual(segundo[2]["task"]["version"], primero[2]["version"])
+        print("✓ API - Conflicto de versión: OK")
+
+    def test_version_tras_reiniciar(self):
+        """La versión no vuelve a empezar al reiniciar el servidor: una
+        versión vieja sigue dando 409"""
+        manager = TaskManager(MemoryStorage(generar_tareas(1)))
+        vieja = TaskAPI(manager).version(manager.get_task("0"))
+        tarea = manager.get_task("0")
+        tarea.priority = 9
+        manager.update_task(tarea)
+
+        reiniciada = TaskAPI(manager)
+        self.assertNotEqual(reiniciada.version(tarea), vieja)
+        self.assertEqual(reiniciada.version(tarea), TaskAPI(manager).version(tarea))
+        with self.assertRaises(HTTPError) as error:
+            reiniciada._update("0", {"priority": 1}, vieja)
+        self.assertEqual(error.exception.status, 409)
+        print("✓ API - Versión tras reiniciar: OK")
+
+    def test_escrituras_concurrentes(self):
+        """Muchos clientes a la vez: ninguna escritura se pierde"""
+        async def prueba(host, puerto, manager):
+            async def cliente(numero):
+                reader, writer = await asyncio.open_connection(host, puerto)
+                for i in range(10):
+                    await request(reader, writer, "POST", "/tasks", {
+                        "title": f"{numero}-{i}", "deadline": "2025-12-01"})
+                writer.close()
+
+            await asyncio.gather(*(cliente(numero) for numero in range(10)))
+            return manager.count()
+
+        self.assertEqual(self.con_servidor(prueba), 100)
+        print("✓ API - Escrituras concurrentes: OK")
+
+    def test_benchmark_carga(self):
+        """Benchmark: peticiones por segundo y p99 con lecturas y escrituras"""
+        peticiones = 20_000 if BENCH_COMPLETO else 1_000
+
+        async def prueba(host, puerto, manager):
+            ids = [tarea.id for tarea in manager.iter_tasks()]
+            return await run_load(host, puerto, ids, clients=20, requests=peticiones)
+
+        resultado = self.con_servidor(prueba, generar_tareas(1_000))
+        self.assertEqual(resultado["statuses"], {200: resultado["requests"]})
+        print(f"  {resultado['requests']} peticiones: {resultado['requests_per_second']:.0f} req/s, "
+              f"p99 {resultado['p99_ms']:.2f} ms")
+        print("✓ API - Benchmark de carga: OK")
+
+
+class TestVariosProcesos(unittest.TestCase):
+    """Pruebas de candado y detección de cambios entre instancias"""
+
+    def setUp(self):
+        borrar_archivo("test_compartido.json")
+
+    def tearDown(self):
+        borrar_archivo("test_compartido.json")
+
+    def test_cambios_de_ambos_se_conservan(self):
+        """Dos instancias sobre el mismo archivo no se pisan"""
+        a = TaskManager(JSONStorage("test_compartido.json"))
+        b = TaskManager(JSONStorage("test_compartido.json"))
+        comun = a.add_tasks(generar_tareas(2))
+        self.assertFalse(a.reload_if_changed())
+        self.assertTrue(b.reload_if_changed())
+        self.assertEqual(b.count(), 2)
+
+        a.add_task(Task("De A", "", "General", "2025-11-18"))
+        editada = Task.from_dict(b.get_task(comun[0].id).to_dict())
+        editada.status = "Completado"
+        b.update_task(editada)
+        b.delete_task(comun[1].id)
+
+        guardadas = {t.title: t for t in JSONStorage("test_compartido.json").load_all()}
+        self.assertEqual(set(guardadas), {"Tarea 0", "De A"})
+        self.assertEqual(guardadas["Tarea 0"].status, "Completado")
+
+        # Cada uno incorpora lo del otro al releer
+        eventos = []
+        a.subscribe(lambda evento, dato: eventos.append(evento))
+        self.assertTrue(a.reload_if_changed())
+        self.assertTrue(b.reload_if_changed())
+        self.assertEqual(sorted(eventos), ["deleted", "updated"])
+        for manager in (a, b):
+            self.assertEqual(sorted(t.title for t in manager.get_all_tasks()), ["De A", "Tarea 0"])
+            self.assertEqual(manager.query(status="Completado")[0].id, comun[0].id)
+        print("✓ Procesos - Cambios de ambos se conservan: OK")
+
+    def test_candado_entre_procesos(self):
+        """El candado de un proceso hace esperar al otro"""
+        codigo = ("import sys, time; from file_lock import FileLock\n"
+                  "with FileLock(sys.argv[1]):\n"
+                  "    print('listo', flush=True); time.sleep(0.3)")
+        candado = os.path.abspath("test_compartido.json.lock")
+        proceso = subprocess.Popen([sys.executable, "-c", codigo, candado], stdout=subprocess.PIPE,
+                                   cwd=os.path.dirname(os.path.abspath(cli.__file__)))
+        proceso.stdout.readline()
+        inicio = time.perf_counter()
+        with FileLock(candado):
+            espera = time.perf_counter() - inicio
+        proceso.wait()
+        proceso.stdout.close()
+        self.assertGreater(espera, 0.1)
+        print("✓ Procesos - Candado entre procesos: OK")
+
+    def test_altas_concurrentes(self):
+        """Varios procesos agregan tareas a la vez sin perder ninguna"""
+        codigo = ("import sys; from models import Task; from task_manager import TaskManager\n"
+                  "from storage_json import JSONStorage\n"
+                  "manager = TaskManager(JSONStorage(sys.argv[1]))\n"
+                  "for i in range(15):\n"
+                  "    manager.add_task(Task(sys.argv[2] + str(i), '', 'General', '2025-12-01'))")
+        archivo = os.path.abspath("test_compartido.json")
+        JSONStorage(archivo)
+        procesos = [subprocess.Popen([sys.executable, "-c", codigo, archivo, f"p{n}-"],
+                                     cwd=os.path.dirname(os.path.abspath(cli.__file__)))
+                    for n in range(4)]
+        for proceso in procesos:
+            self.assertEqual(proceso.wait(), 0)
+        self.assertEqual(len(JSONStorage(archivo).load_all()), 60)
+        print("✓ Procesos - Altas concurrentes: OK")
+
+
+class TestMetricas(unittest.TestCase):
+    """Pruebas de la capa de métricas y del perfilado"""
+
+    def setUp(self):
+        self.archivos = ["test_metricas.json", "test_metricas.prom", "test_informe.json",
+                         "test_perfil.out", "test_perfil.out.mem.txt"]
+        for archivo in self.archivos:
+            borrar_archivo(archivo)
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        for archivo in self.archivos:
+            borrar_archivo(archivo)
+
+    def test_apagadas_no_registran(self):
+        """Sin activar, las operaciones no dejan métricas"""
+        manager = TaskManager(JSONStorage("test_metricas.json"))
+        manager.add_tasks(generar_tareas(10))
+        self.assertEqual(metrics.snapshot()["counters"], {})
+        self.assertEqual(metrics.snapshot()["histograms"], {})
+        print("✓ Métricas - Apagadas no registran: OK")
+
+    def test_contadores_e_histogramas(self):
+        """Carga, guardado y cambios quedan medidos"""
+        metrics.enable()
+        manager = TaskManager(JSONStorage("test_metricas.json"))
+        tareas = manager.add_tasks(generar_tareas(10))
+        manager.delete_tasks([tareas[0].id, "no-existe"])
+        TaskManager(JSONStorage("test_metricas.json"))
+
+        datos = metrics.snapshot()
+        self.assertEqual(datos["counters"]['task_mutations_total{op="add"}'], 10)
+        self.assertEqual(datos["counters"]['task_mutations_total{op="delete"}'], 1)
+        self.assertEqual(datos["counters"]["tasks_loaded_total"], 9)
+        self.assertEqual(datos["histograms"]["storage_save_bytes"]["count"], 2)
+        self.assertEqual(datos["histograms"]['task_manager_seconds{op="add"}']["count"], 1)
+        self.assertGreater(datos["derived"]["tasks_loaded_per_second"], 0)
+        self.assertGreater(datos["derived"]["bytes_per_save"], 0)
+
+        texto = metrics.to_prometheus()
+        self.assertIn("# TYPE storage_save_seconds histogram", texto)
+        self.assertIn('task_manager_seconds_count{op="add"} 1', texto)
+        self.assertIn('storage_load_seconds_bucket{storage="json",le="+Inf"} 2', texto)
+        print("✓ Métricas - Contadores e histogramas: OK")
+
+    def test_informe_y_perfil_desde_cli(self):
+        """--metrics y --profile escriben sus archivos"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main(["--store", "test_metricas.json", "--metrics", "test_informe.json",
+                      "add", "Diseño", "--deadline", "2025-11-18"])
+            cli.main(["--store", "test_metricas.json", "--metrics", "test_metricas.prom",
+                      "--profile", "test_perfil.out", "list"])
+
+        with open("test_informe.json", encoding="utf-8") as f:
+            informe = json.load(f)
+        self.assertEqual(informe["counters"]['task_mutations_total{op="add"}'], 1)
+        with open("test_metricas.prom", encoding="utf-8") as f:
+            self.assertIn("tasks_loaded_total", f.read())
+        self.assertTrue(os.path.getsize("test_perfil.out") > 0)
+        with open("test_perfil.out.mem.txt", encoding="utf-8") as f:
+            self.assertTrue(f.readline().startswith("Memoria actual"))
+        print("✓ Métricas - Informe y perfil desde la CLI: OK")
+
+    def test_benchmark_costo(self):
+        """Benchmark: costo de las métricas apagadas y encendidas"""
+        n = 200_000 if BENCH_COMPLETO else 20_000
+        manager = TaskManager(MemoryStorage())
+        tareas = manager.add_tasks(generar_tareas(100))
+        sin_decorar = TaskManager.query.__wrapped__
+
+        def medir(funcion):
+            inicio = time.perf_counter()
+            for _ in range(n):
+                funcion(manager, status="Pendiente")
+            return (time.perf_counter() - inicio) / n * 1e6
+
+        base = medir(sin_decorar)
+        apagadas = medir(TaskManager.query)
+        metrics.enable()
+        encendidas = medir(TaskManager.query)
+        self.assertEqual(len(tareas), 100)
+        print(f"  query: {base:.2f} µs sin medir, {apagadas:.2f} µs apagadas, "
+              f"{encendidas:.2f} µs encendidas")
+        print("✓ Métricas - Benchmark de costo: OK")
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Pruebas del generador de datos y de la comparación con la línea base"""
+
+    def test_generador_reproducible(self):
+        """La misma semilla genera las mismas tareas, con categorías sesgadas"""
+        primeras = [t.to_dict() for t in benchmarks.generate_tasks(2_000, seed=7)]
+        segundas = [t.to_dict() for t in benchmarks.generate_tasks(2_000, seed=7)]
+        otras = [t.to_dict() for t in benchmarks.generate_tasks(2_000, seed=8)]
+        self.assertEqual(primeras, segundas)
+        self.assertNotEqual(primeras, otras)
+
+        categorias = {}
+        for tarea in primeras:
+            categorias[tarea["category"]] = categorias.get(tarea["category"], 0) + 1
+        self.assertGreater(categorias["Universidad"], 10 * categorias.get("Viajes", 1))
+        vencidas = [t for t in primeras if t["deadline"] < benchmarks.TODAY.isoformat()]
+        self.assertTrue(0 < len(vencidas) < len(primeras) / 4)
+        print("✓ Benchmarks - Generador reproducible: OK")
+
+    def test_detecta_regresiones(self):
+        """Solo se marcan los empeoramientos mayores al umbral y al ruido"""
+        base = {"load/1000": 0.100, "sort/1000": 0.0001, "save/1000": 0.100}
+        actual = {"load/1000": 0.150, "sort/1000": 0.0005, "save/1000": 0.110,
+                  "nuevo/1000": 1.0}
+        regresiones = benchmarks.compare(actual, base, threshold=0.25)
+        self.assertEqual([r[0] for r in regresiones], ["load/1000"])
+        self.assertAlmostEqual(regresiones[0][3], 0.5)
+
+        # Si la referencia tardó el doble, la máquina anda más lenta: la
+        # base se escala y load ya no cuenta como regresión
+        referencia_base = {"load/1000": 0.050, "save/1000": 0.050}
+        referencia = {"load/1000": 0.100, "save/1000": 0.050}
+        regresiones = benchmarks.compare(actual, base, 0.25, referencia, referencia_base)
+        self.assertEqual([r[0] for r in regresiones], [])
+        referencia["save/1000"] = 0.025
+        regresiones = benchmarks.compare(actual, base, 0.25, referencia, referencia_base)
+        self.assertEqual([r[0] for r in regresiones], ["save/1000"])
+        print("✓ Benchmarks - Detección de regresiones: OK")
+
+    def test_suite_completa(self):
+        """La suite mide todos los casos con un tamaño chico"""
+        resultados = benchmarks.run_suite([300], repeat=1, ui=False, log=lambda texto: None)
+        self.assertEqual(set(resultados), {f"{nombre}/300" for nombre in (
+            "save", "load", "crud", "sort", "query", "search", "reprioritize")})
+        self.assertTrue(all(segundos > 0 for segundos in resultados.values()))
+        print("✓ Benchmarks - Suite completa: OK")
+
+    def test_confirma_regresiones(self):
+        """Una medición lenta aislada se vuelve a medir antes de darla por
+        regresión; una regresión real se mantiene"""
+        base = {"crud/300": 10.0, "load/300": 1e-6}
+        actual = {"crud/300": 100.0, "load/300": 5.0}
+        regresiones = benchmarks.confirm(actual, base, threshold=0.25, repeat=1, retries=1,
+                                         log=lambda texto: None)
+        self.assertEqual([r[0] for r in regresiones], ["load/300"])
+        self.assertLess(actual["crud/300"], 10.0)
+        self.assertLess(actual["load/300"], 5.0)
+
+        # Con calibración se guarda la referencia de la medición que quedó
+        referencia = {"crud/300": 1.0, "load/300": 1.0}
+        actual = {"crud/300": 100.0, "load/300": 5.0}
+        benchmarks.confirm(actual, base, 0.25, repeat=1, retries=1, log=lambda texto: None,
+                           calibration=referencia, baseline_calibration=dict(referencia))
+        self.assertLess(referencia["crud/300"], 1.0)
+        print("✓ Benchmarks - Confirmación de regresiones: OK")
+
+
+class TestSnapshot(unittest.TestCase):
+    """Pruebas de la instantánea binaria columnar"""
+
+    def setUp(self):
+        self.archivos = ["test_snapshot.snap", "test_snapshot.json", "test_vuelta.json"]
+        for archivo in self.archivos:
+            borrar_archivo(archivo)
+
+    def tearDown(self):
+        for archivo in self.archivos:
+            borrar_archivo(archivo)
+
+    def test_ida_y_vuelta(self):
+        """Con y sin compresión se recuperan las mismas tareas"""
+        tareas = generar_tareas(50)
+        tareas.append(Task("Año nuevo ñandú", "línea 1\nlínea 2 — ✓", "Viajes", "2026-01-01",
+                           priority=100, status="En progreso"))
+        for compresion in (None, "zlib", "lzma"):
+            write_snapshot("test_snapshot.snap", tareas, compresion)
+            cargadas = SnapshotStorage("test_snapshot.snap").load_all()
+            self.assertEqual([t.to_dict() for t in cargadas], [t.to_dict() for t in tareas])
+            self.assertEqual(SnapshotStorage("test_snapshot.snap").compression, compresion)
+        self.assertIs(cargadas[-1].category, sys.intern("Viajes"))
+        print("✓ Snapshot - Ida y vuelta: OK")
+
+    def test_columnas_perezosas(self):
+        """Se puede leer una columna sin decodificar las demás"""
+        write_snapshot("test_snapshot.snap", generar_tareas(100))
+        with SnapshotStorage("test_snapshot.snap").reader() as lector:
+            self.assertEqual(len(lector), 100)
+            self.assertEqual(lector.column("priority")[13], 3)
+            self.assertEqual(set(lector.column("status")), {"Pendiente"})
+            self.assertEqual(lector.column("id")[99], "99")
+        print("✓ Snapshot - Columnas perezosas: OK")
+
+    def test_conversion_y_manager(self):
+        """JSON -> instantánea -> JSON, y TaskManager sobre la instantánea"""
+        JSONStorage("test_snapshot.json").save_all(generar_tareas(20))
+        self.assertEqual(json_to_snapshot("test_snapshot.json", "test_snapshot.snap", "zlib"), 20)
+
+        manager = TaskManager(cli.open_storage("test_snapshot.snap"))
+        manager.add_task(Task("Nueva", "", "General", "2025-12-01"))
+        manager.delete_task("0")
+        self.assertEqual(snapshot_to_json("test_snapshot.snap", "test_vuelta.json"), 20)
+        titulos = [t.title for t in JSONStorage("test_vuelta.json").load_all()]
+        self.assertEqual((titulos[0], titulos[-1]), ("Tarea 1", "Nueva"))
+        print("✓ Snapshot - Conversión y TaskManager: OK")
+
+    def test_prioridades_grandes(self):
+        """Las prioridades fuera de 32 bits se guardan sin desbordar"""
+        manager = TaskManager(SnapshotStorage("test_snapshot.snap"))
+        manager.add_task(Task("Grande", "", "General", "2025-12-01",
+                              priority=10_000_000_000, task_id="g"))
+        manager.add_task(Task("Negativa", "", "General", "2025-12-01",
+                              priority=-2**40, task_id="n"))
+        cargadas = SnapshotStorage("test_snapshot.snap").load_all()
+        self.assertEqual([t.priority for t in cargadas], [10_000_000_000, -2**40])
+        print("✓ Snapshot - Prioridades grandes: OK")
+
+    def test_recupera_copia_de_seguridad(self):
+        """Una instantánea dañada se aparta y se usa la copia .bak"""
+        storage = SnapshotStorage("test_snapshot.snap")
+        storage.save_all(generar_tareas(5))
+        storage.save_all(generar_tareas(6))
+        with open("test_snapshot.snap", "wb") as f:
+            f.write(b"TASKSNP1 roto")
+        self.assertEqual(len(storage.load_all()), 5)
+        self.assertTrue(os.path.exists("test_snapshot.snap.corrupt"))
+        os.remove("test_snapshot.snap.corrupt")
+        print("✓ Snapshot - Recupera la copia de seguridad: OK")
+
+    def test_benchmark_formatos(self):
+        """Benchmark: tamaño y tiempo de carga de JSON frente a la instantánea"""
+        for n in TAMANOS_BENCH:
+            JSONStorage("test_snapshot.json").save_all(benchmarks.generate_tasks(n))
+            resultados = compare_formats("test_snapshot.json")
+            tamanos = dict((nombre, tamano) for nombre, tamano, _ in resultados)
+            self.assertLess(tamanos["snapshot sin compresión"], tamanos["json"] / 2)
+            for nombre, tamano, segundos in resultados:
+                print(f"  {n:>9} tareas {nombre:<24} {tamano / 1e6:8.2f} MB {segundos * 1000:9.1f} ms")
+        print("✓ Snapshot - Benchmark de formatos: OK")
+
+
+class TestEstadisticas(unittest.TestCase):
+    """Pruebas de las estadísticas incrementales"""
+
+    def setUp(self):
+        borrar_archivo("test_estadisticas.json")
+
+    def tearDown(self):
+        borrar_archivo("test_estadisticas.json")
+
+    def test_coincide_con_recalcular(self):
+        """Tras altas, cambios y bajas los totales son los de recalcular todo"""
+        manager = TaskManager(MemoryStorage())
+        tareas = manager.add_tasks(benchmarks.generate_tasks(300, seed=3))
+        for tarea in tareas[:100]:
+            tarea.status = "Completado"
+            tarea.deadline = "2025-10-01"
+        manager.update_tasks(tareas[:100])
+        manager.delete_tasks([t.id for t in tareas[250:]])
+
+        incremental = manager.statistics().summary()
+        recalculado = TaskStatistics(manager.get_all_tasks()).summary()
+        self.assertEqual(incremental, recalculado)
+        self.assertEqual(incremental["total"], 250)
+        self.assertEqual(incremental["by_status"]["Completado"],
+                         len(manager.query(status="Completado")))
+        print("✓ Estadísticas - Coinciden con recalcular: OK")
+
+    def test_base_de_datos_sin_recorrer(self):
+        """Con SQLite se cuenta una vez y luego se sigue cada cambio"""
+        borrar_archivo("test_estadisticas.db")
+        self.addCleanup(borrar_archivo, "test_estadisticas.db")
+        storage = SQLiteStorage("test_estadisticas.db")
+        self.addCleanup(storage.close)
+        manager = TaskManager(storage)
+        manager.add_tasks(benchmarks.generate_tasks(200, seed=5))
+        estadisticas = manager.statistics()
+
+        recorridos = []
+        iter_all = storage.iter_all
+        storage.iter_all = lambda: recorridos.append(1) or iter_all()
+        tarea = manager.get_task("t00000003")
+        tarea.status = "Completado"
+        manager.update_tasks([tarea, Task("X", "", "C", "2025-12-01", task_id="no-existe")])
+        manager.delete_tasks(["t00000004", "no-existe"])
+        manager.add_task(Task("Nueva", "", "Hogar", "2025-11-20"))
+
+        self.assertIs(manager.statistics(), estadisticas)
+        self.assertEqual(recorridos, [])
+        self.assertEqual(estadisticas.summary(), TaskStatistics(iter_all()).summary())
+        print("✓ Estadísticas - Base de datos sin recorrer: OK")
+
+    def test_vencidas_y_cambio_de_dia(self):
+        """Las vencidas excluyen completadas y se actualizan al cambiar el día"""
+        estadisticas = TaskStatistics(today=date(2025, 11, 10))
+        estadisticas.add(Task("Vencida", "", "General", "2025-11-05"))
+        estadisticas.add(Task("Hecha", "", "General", "2025-11-05", status="Completado"))
+        mañana = Task("Mañana", "", "General", "2025-11-11")
+        estadisticas.add(mañana)
+        estadisticas.add(Task("Lejana", "", "General", "2025-12-20"))
+        self.assertEqual(estadisticas.overdue(), 1)
+
+        estadisticas.today = date(2025, 11, 12)
+        self.assertEqual(estadisticas.overdue(), 2)
+        mañana.status = "Completado"
+        estadisticas.update(mañana)
+        self.assertEqual(estadisticas.overdue(), 1)
+        estadisticas.today = date(2026, 1, 1)
+        self.assertEqual(estadisticas.overdue(), 2)
+        estadisticas.today = date(2025, 1, 1)
+        self.assertEqual(estadisticas.overdue(), 0)
+        print("✓ Estadísticas - Vencidas y cambio de día: OK")
+
+    def test_histograma_semanal(self):
+        """Las fechas se agrupan por semana (de lunes a domingo)"""
+        estadisticas = TaskStatistics(
+            Task(f"T{dia}", "", "General", f"2025-11-{dia:02d}") for dia in (9, 10, 16, 17))
+        self.assertEqual(estadisticas.by_week(), {"2025-11-03": 1, "2025-11-10": 2,
+                                                  "2025-11-17": 1})
+        self.assertEqual(estadisticas.due_in_week(date(2025, 11, 13)), 2)
+        print("✓ Estadísticas - Histograma semanal: OK")
+
+    def test_cli(self):
+        """El comando stats muestra el resumen"""
+        JSONStorage("test_estadisticas.json").save_all(generar_tareas(12))
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            cli.main(["--store", "test_estadisticas.json", "stats", "--json"])
+        resumen = json.loads(salida.getvalue())
+        self.assertEqual(resumen["total"], 12)
+        self.assertEqual(resumen["by_category"], {"C": 12})
+        self.assertEqual(resumen["due_by_week"], {"2025-12-29": 12})
+        print("✓ Estadísticas - CLI: OK")
+
+    def test_benchmark_por_cambio(self):
+        """Benchmark: costo por cambio independiente de la cantidad de tareas"""
+        for n in TAMANOS_BENCH:
+            tareas = list(benchmarks.generate_tasks(n))
+            estadisticas = TaskStatistics(tareas)
+            inicio = time.perf_counter()
+            for tarea in tareas[:1000]:
+                tarea.status = "Completado"
+                estadisticas.update(tarea)
+                estadisticas.overdue()
+            por_cambio = (time.perf_counter() - inicio) / min(n, 1000) * 1e6
+            print(f"  {n:>9} tareas: {por_cambio:.2f} µs por cambio")
+        print("✓ Estadísticas - Benchmark por cambio: OK")
+
 
 class TestTaskManager(unittest.TestCase):
     """Pruebas del gestor de tareas"""
     
     def setUp(self):
         self.test_file = "test_manager.json"
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        borrar_archivo(self.test_file)
         self.manager = TaskManager(JSONStorage(self.test_file))
     
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        borrar_archivo(self.test_file)
     
     def test_crud_completo(self):
         """Probar crear, leer, actualizar y eliminar"""
@@ -118,6 +1356,269 @@ class TestTaskManager(unittest.TestCase):
         print("✓ Manager - Persistencia: OK")
 
 
+class TestIndiceTaskManager(unittest.TestCase):
+    """Pruebas del índice id -> tarea"""
+
+    def setUp(self):
+        self.manager = TaskManager(MemoryStorage(generar_tareas(5)))
+
+    def test_actualizar_conserva_posicion(self):
+        """Reemplazar una tarea no cambia su posición en la lista"""
+        nueva = Task("Reemplazo", "D", "C", "2025-12-31", task_id="2")
+        self.manager.update_task(nueva)
+        tareas = self.manager.get_all_tasks()
+        self.assertIs(tareas[2], nueva)
+        self.assertIs(self.manager.get_task("2"), nueva)
+        print("✓ Índice - Actualizar conserva posición: OK")
+
+    def test_eliminar_y_ordenar(self):
+        """Eliminar y ordenar mantienen el índice consistente"""
+        self.manager.delete_task("3")
+        self.assertIsNone(self.manager.get_task("3"))
+        self.manager.sort_tasks(reverse=True)
+        ids = [t.id for t in self.manager.get_all_tasks()]
+        self.assertEqual(ids, ["4", "2", "1", "0"])
+        self.assertEqual(self.manager.get_task("4").title, "Tarea 4")
+        print("✓ Índice - Eliminar y ordenar: OK")
+
+    def test_paginas(self):
+        """get_page devuelve la ventana pedida del orden actual"""
+        self.assertEqual([t.id for t in self.manager.get_page(1, 2)], ["1", "2"])
+        self.manager.add_task(Task("Nueva", "D", "C", "2025-12-31", task_id="n"))
+        self.assertEqual([t.id for t in self.manager.get_page(4, 10)], ["4", "n"])
+        self.manager.delete_task("0")
+        self.manager.sort_tasks(reverse=True)
+        self.assertEqual([t.id for t in self.manager.get_page(0, 2)], ["n", "4"])
+        self.assertEqual(self.manager.count(), 5)
+        print("✓ Índice - Páginas: OK")
+
+    def test_paginas_tras_ediciones(self):
+        """Las páginas siguen siendo correctas tras reemplazos, bajas y altas
+        mezcladas (la vista se actualiza en su lugar)"""
+        azar = random.Random(4)
+        manager = TaskManager(MemoryStorage(generar_tareas(500)))
+        manager.get_page(0, 10)
+        for paso in range(600):
+            ids = [t.id for t in manager.get_page(0, manager.count())]
+            accion = azar.random()
+            if accion < 0.5:
+                manager.update_task(Task(f"Editada {paso}", "D", "C", "2025-12-31",
+                                         task_id=azar.choice(ids)))
+            elif accion < 0.8:
+                manager.delete_task(azar.choice(ids))
+            else:
+                manager.add_task(Task(f"Nueva {paso}", "D", "C", "2025-12-31"))
+            esperado = manager.get_all_tasks()
+            inicio = azar.randrange(len(esperado))
+            self.assertEqual(manager.get_page(inicio, 7), esperado[inicio:inicio + 7])
+        print("✓ Índice - Páginas tras ediciones: OK")
+
+    def test_benchmark_escalado(self):
+        """Buscar, actualizar y eliminar no dependen del tamaño"""
+        for n in TAMANOS_BENCH:
+            manager = TaskManager(MemoryStorage(generar_tareas(n)))
+            ids = [str(i) for i in range(0, n, max(1, n // 1000))]
+
+            inicio = time.perf_counter()
+            for task_id in ids:
+                manager.update_task(manager.get_task(task_id))
+            for task_id in ids:
+                manager.delete_task(task_id)
+            total = time.perf_counter() - inicio
+
+            self.assertEqual(len(manager.get_all_tasks()), n - len(ids))
+            print(f"  {n:>9} tareas: {total / len(ids) * 1e6:.2f} µs por operación")
+
+
+class TestIndicePrioridad(unittest.TestCase):
+    """Pruebas del índice de prioridad"""
+
+    def setUp(self):
+        prioridades = [3, 7, 3, 9, 7]
+        self.manager = TaskManager(MemoryStorage(
+            [Task(f"T{i}", "D", "C", "2025-12-31", priority=p, task_id=str(i))
+             for i, p in enumerate(prioridades)]))
+
+    def ids(self, tareas):
+        return [t.id for t in tareas]
+
+    def test_orden_estable_sin_reordenar(self):
+        """Ordenar no cambia el orden guardado y respeta los empates"""
+        self.manager.sort_tasks(reverse=True)
+        self.assertEqual(self.ids(self.manager.get_all_tasks()), ["3", "1", "4", "0", "2"])
+        self.assertEqual(self.ids(self.manager.iter_by_priority(reverse=False)),
+                         ["0", "2", "1", "4", "3"])
+        self.assertEqual(list(self.manager._index), ["0", "1", "2", "3", "4"])
+        print("✓ Prioridad - Orden estable: OK")
+
+    def test_top_k_incremental(self):
+        """top_k refleja altas, cambios y bajas sin reordenar todo"""
+        self.assertEqual(self.ids(self.manager.top_k(2)), ["3", "1"])
+
+        tarea = self.manager.get_task("0")
+        tarea.priority = 10
+        self.manager.update_task(tarea)
+        self.manager.add_task(Task("Nueva", "D", "C", "2025-12-31", priority=9, task_id="n"))
+        self.manager.delete_task("3")
+
+        self.assertEqual(self.ids(self.manager.top_k(3)), ["0", "n", "1"])
+        self.manager.sort_tasks(reverse=False)
+        self.assertEqual(self.ids(self.manager.get_page(0, 2)), ["2", "1"])
+        print("✓ Prioridad - top_k incremental: OK")
+
+    def test_lotes_grandes(self):
+        """Los lotes grandes rearman los índices y quedan como uno nuevo"""
+        manager = TaskManager(MemoryStorage(generar_tareas(500)))
+        tareas = manager.get_all_tasks()
+        for i, tarea in enumerate(tareas[:300]):
+            tarea.priority = (i * 7) % 11
+            tarea.deadline = f"2025-{i % 12 + 1:02d}-15"
+        manager.update_tasks(tareas[:300])
+        manager.delete_tasks([t.id for t in tareas[100:200]])
+        manager.add_tasks([Task(f"Nueva {i}", "D", "C", "2026-01-01", priority=i % 10)
+                           for i in range(200)])
+
+        nuevo = TaskManager(MemoryStorage(manager.get_all_tasks()))
+        for reverse in (True, False):
+            self.assertEqual(self.ids(manager.iter_by_priority(reverse)),
+                             self.ids(nuevo.iter_by_priority(reverse)))
+        self.assertEqual(self.ids(manager.query(due_after="2025-03-01", due_before="2025-06-30")),
+                         self.ids(nuevo.query(due_after="2025-03-01", due_before="2025-06-30")))
+        self.assertEqual(self.ids(manager.search("nueva")), self.ids(nuevo.search("nueva")))
+        print("✓ Prioridad - Lotes grandes: OK")
+
+
+class TestConsultas(unittest.TestCase):
+    """Pruebas de los índices de estado, categoría y fecha límite"""
+
+    def setUp(self):
+        self.manager = TaskManager(MemoryStorage([
+            Task("A", "D", "Personal", "2025-11-01", task_id="a"),
+            Task("B", "D", "Personal", "2025-11-15", status="Completado", task_id="b"),
+            Task("C", "D", "Universidad", "2025-12-01", task_id="c"),
+            Task("D", "D", "Personal", "2025-11-20", task_id="d"),
+        ]))
+
+    def ids(self, **filtros):
+        return [t.id for t in self.manager.query(**filtros)]
+
+    def test_interseccion(self):
+        """Se combinan los filtros y se respeta el orden de la vista"""
+        self.assertEqual(self.ids(status="Pendiente", category="Personal"), ["a", "d"])
+        self.assertEqual(self.ids(category="Personal", due_after="2025-11-10",
+                                  due_before=datetime(2025, 11, 30)), ["b", "d"])
+        self.assertEqual(self.ids(due_before="2025-11-15"), ["a", "b"])
+        self.assertEqual(self.ids(category="Otra"), [])
+        print("✓ Consultas - Intersección: OK")
+
+    def test_indices_consistentes(self):
+        """Altas, cambios y bajas mantienen los índices al día"""
+        tarea = self.manager.get_task("a")
+        tarea.status = "Completado"
+        tarea.deadline = "2025-12-24"
+        self.manager.update_task(tarea)
+        self.manager.delete_task("b")
+        self.manager.add_task(Task("E", "D", "Personal", "2025-11-16", task_id="e"))
+
+        self.assertEqual(self.ids(status="Completado"), ["a"])
+        self.assertEqual(self.ids(category="Personal", due_before="2025-11-30"), ["d", "e"])
+        self.assertEqual(self.ids(due_after="2025-12-02"), ["a"])
+        print("✓ Consultas - Índices consistentes: OK")
+
+    def test_benchmark_consultas(self):
+        """Consulta indexada frente a recorrer todas las tareas"""
+        categorias = ["Personal", "Universidad", "Trabajo", "General"]
+        for n in TAMANOS_BENCH:
+            tareas = [Task(f"T{i}", "D", categorias[i % 4], f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                           status="Completado" if i % 3 else "Pendiente", task_id=str(i))
+                      for i in range(n)]
+            manager = TaskManager(MemoryStorage(tareas))
+            # Pendientes de una categoría que vencen en una semana dada
+            filtros = dict(status="Pendiente", category="Trabajo",
+                           due_after="2025-07-01", due_before="2025-07-07")
+
+            inicio = time.perf_counter()
+            resultado = manager.query(**filtros)
+            indexada = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            lineal = [t for t in tareas if t.status == "Pendiente" and t.category == "Trabajo"
+                      and datetime(2025, 7, 1) <= t.deadline <= datetime(2025, 7, 7)]
+            recorrido = time.perf_counter() - inicio
+
+            self.assertEqual(resultado, lineal)
+            print(f"  {n:>9} tareas: indexada {indexada * 1000:.2f} ms, "
+                  f"recorrido {recorrido * 1000:.2f} ms ({len(resultado)} resultados)")
+
+
+class TestBusqueda(unittest.TestCase):
+    """Pruebas del índice de búsqueda de texto"""
+
+    def setUp(self):
+        self.manager = TaskManager(MemoryStorage([
+            Task("Diseño de software", "El mejor proyecto del salón", "U", "2025-11-18", task_id="a"),
+            Task("Comprar disco", "Para el proyecto", "P", "2025-11-20", task_id="b"),
+            Task("Leer", "Capítulo de diseño", "U", "2025-11-22", task_id="c"),
+        ]))
+
+    def ids(self, texto):
+        return [t.id for t in self.manager.search(texto)]
+
+    def test_acentos_prefijos_y_varias_palabras(self):
+        """Sin acentos, por prefijo y con todas las palabras"""
+        self.assertEqual(self.ids("diseno"), ["a", "c"])
+        self.assertEqual(self.ids("DIS"), ["a", "b", "c"])
+        self.assertEqual(self.ids("proyecto salon"), ["a"])
+        self.assertEqual(self.ids("capitulo xyz"), [])
+        self.assertEqual(self.ids("  "), [])
+        print("✓ Búsqueda - Acentos, prefijos y varias palabras: OK")
+
+    def test_indice_incremental(self):
+        """Cambios, altas y bajas se reflejan en la búsqueda"""
+        tarea = self.manager.get_task("b")
+        tarea.title = "Comprar libro"
+        self.manager.update_task(tarea)
+        self.manager.delete_task("a")
+        self.manager.add_task(Task("Diseñar logo", "", "P", "2025-12-01", task_id="d"))
+
+        self.assertEqual(self.ids("disc"), [])
+        self.assertEqual(self.ids("libro"), ["b"])
+        self.assertEqual(self.ids("disen"), ["c", "d"])
+        self.assertEqual(self.manager._search_index._vocabulary.count("software"), 0)
+        print("✓ Búsqueda - Índice incremental: OK")
+
+    def test_reconstruccion(self):
+        """rebuild deja el mismo vocabulario ordenado que las altas una a una"""
+        indice = self.manager._search_index
+        incremental = list(indice._vocabulary)
+        indice.rebuild(self.manager.get_all_tasks())
+        self.assertEqual(indice._vocabulary, incremental)
+        self.assertEqual(indice._vocabulary, sorted(indice._postings))
+        self.assertEqual(self.ids("DIS"), ["a", "b", "c"])
+        print("✓ Búsqueda - Reconstrucción: OK")
+
+
+class TestNotificaciones(unittest.TestCase):
+    """Pruebas de las notificaciones de cambios de TaskManager"""
+
+    def test_eventos(self):
+        """Cada operación notifica solo el cambio realizado"""
+        manager = TaskManager(MemoryStorage(generar_tareas(3)))
+        eventos = []
+        manager.subscribe(lambda evento, dato: eventos.append((evento, dato)))
+
+        tarea = Task("Nueva", "D", "C", "2025-12-31", task_id="n")
+        manager.add_task(tarea)
+        manager.update_task(tarea)
+        manager.delete_task("n")
+        manager.delete_task("no-existe")
+        manager.sort_tasks()
+
+        self.assertEqual(eventos, [("added", tarea), ("updated", tarea),
+                                   ("deleted", "n"), ("sorted", None)])
+        print("✓ Manager - Notificaciones: OK")
+
+
 class TestStrategies(unittest.TestCase):
     """Pruebas de estrategias de prioridad"""
     
@@ -149,19 +1650,129 @@ class TestStrategies(unittest.TestCase):
         self.assertEqual(tarea_lejana.priority, 1)
         print("✓ Strategy - Fecha: OK")
 
+    def test_category_strategy(self):
+        """Estrategia por categoría con tabla por defecto y desde archivo"""
+        tarea = Task("Test", "D", "Universidad", "2025-12-31")
+        self.assertEqual(CategoryPriorityStrategy().assign_priority(tarea).priority, 8)
+
+        archivo = "test_categorias.json"
+        with open(archivo, "w", encoding="utf-8") as f:
+            json.dump({"Diseño": 9, "Universidad": 2}, f)
+        try:
+            strategy = CategoryPriorityStrategy.from_file(archivo, default=1)
+        finally:
+            os.remove(archivo)
+        tareas = [Task("A", "D", "Diseño", "2025-12-31"), tarea,
+                  Task("C", "D", "Otra", "2025-12-31")]
+        self.assertEqual([t.priority for t in strategy.assign_priorities(tareas)], [9, 2, 1])
+        print("✓ Strategy - Categoría: OK")
+
+    def test_weighted_strategy(self):
+        """La estrategia compuesta en bloque coincide con la de una tarea"""
+        strategy = WeightedPriorityStrategy([
+            (DatePriorityStrategy(today=datetime(2025, 1, 1).date()), 0.5),
+            (CategoryPriorityStrategy(), 2),
+        ])
+        tareas = [Task("T", "D", c, f"2025-01-{d:02d}")
+                  for c, d in [("Personal", 1), ("Trabajo", 10), ("Otra", 31)]]
+        esperadas = [strategy.calculate_priority(t) for t in tareas]
+        self.assertEqual(esperadas, [60, 24, 0])
+        self.assertEqual([t.priority for t in strategy.assign_priorities(tareas)], esperadas)
+        print("✓ Strategy - Compuesta: OK")
+
+    def test_prioridades_en_bloque(self):
+        """assign_priorities da lo mismo que assign_priority tarea a tarea"""
+        strategy = DatePriorityStrategy()
+        hoy = datetime.now()
+        dias = [-3, 0, 1, 5, 29, 30, 50]
+        en_bloque = [Task("T", "D", "C", hoy + timedelta(days=d)) for d in dias]
+        una_a_una = [Task("T", "D", "C", hoy + timedelta(days=d)) for d in dias]
+
+        strategy.assign_priorities(en_bloque)
+        for tarea in una_a_una:
+            strategy.assign_priority(tarea)
+        self.assertEqual([t.priority for t in en_bloque], [t.priority for t in una_a_una])
+        print("✓ Strategy - Prioridades en bloque: OK")
+
+    def test_reprioritize_guarda_cambios(self):
+        """TaskManager.reprioritize actualiza índice y notifica solo los cambios"""
+        hoy = datetime.now()
+        manager = TaskManager(MemoryStorage([
+            Task("Vencida", "D", "C", hoy - timedelta(days=1), priority=100, task_id="a"),
+            Task("Cercana", "D", "C", hoy + timedelta(days=5), priority=1, task_id="b"),
+        ]))
+        eventos = []
+        manager.subscribe(lambda evento, dato: eventos.append(dato.id))
+
+        cambiadas = manager.reprioritize(DatePriorityStrategy())
+        self.assertEqual([t.id for t in cambiadas], ["b"])
+        self.assertEqual(eventos, ["b"])
+        self.assertEqual([t.priority for t in manager.top_k(2)], [100, 25])
+        print("✓ Strategy - Reprioritize: OK")
+
+    def test_programador_por_cubos(self):
+        """El programador recalcula solo las tareas cuyo cubo venció"""
+        hoy = datetime(2025, 1, 1)
+        dias = {"vencida": -1, "cercana": 5, "borde": 29, "lejana": 60}
+        manager = TaskManager(MemoryStorage([
+            Task(nombre, "D", "C", hoy + timedelta(days=d), task_id=nombre)
+            for nombre, d in dias.items()]))
+        programador = DatePriorityScheduler(manager)
+        programador.start(today=hoy.date())
+        self.assertEqual(manager.get_task("cercana").priority, 25)
+        self.assertEqual(programador.pending(), 3)
+
+        # Al día siguiente solo cambian la cercana y la que entra en la ventana
+        cambiadas = programador.tick(today=(hoy + timedelta(days=1)).date())
+        self.assertEqual(sorted(t.id for t in cambiadas), ["borde", "cercana"])
+        self.assertEqual(manager.get_task("borde").priority, 2)
+
+        # Saltando varios días, cada tarea queda como si se recalculara todo
+        manana = hoy + timedelta(days=40)
+        programador.tick(today=manana.date())
+        strategy = DatePriorityStrategy(today=manana.date())
+        for tarea in manager.get_all_tasks():
+            self.assertEqual(tarea.priority, strategy.calculate_priority(tarea))
+
+        # Una tarea nueva se calcula en el siguiente tick
+        manager.add_task(Task("Nueva", "D", "C", manana + timedelta(days=3), task_id="n"))
+        programador.tick(today=manana.date())
+        self.assertEqual(manager.get_task("n").priority, 27)
+
+        # Detenido, ya no sigue los cambios ni recalcula
+        programador.stop()
+        manager.add_task(Task("Otra", "D", "C", manana + timedelta(days=3), task_id="o"))
+        self.assertEqual((programador.pending(), programador.tick(today=manana.date())), (0, []))
+        self.assertEqual(manager.get_task("o").priority, 5)
+        print("✓ Strategy - Programador por cubos: OK")
+
+    def test_benchmark_prioridades(self):
+        """Tiempo: assign_priority tarea a tarea frente a assign_priorities"""
+        strategy = DatePriorityStrategy()
+        n = 1_000_000 if BENCH_COMPLETO else 20_000
+        tareas = generar_tareas(n)
+
+        inicio = time.perf_counter()
+        for tarea in tareas:
+            strategy.assign_priority(tarea)
+        una_a_una = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        strategy.assign_priorities(tareas)
+        en_bloque = time.perf_counter() - inicio
+        print(f"  {n} tareas: una a una {una_a_una:.3f}s, en bloque {en_bloque:.3f}s")
+
 
 class TestIntegracion(unittest.TestCase):
     """Prueba de integración completa"""
     
     def setUp(self):
         self.test_file = "test_integration.json"
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        borrar_archivo(self.test_file)
         self.manager = TaskManager(JSONStorage(self.test_file))
     
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        borrar_archivo(self.test_file)
     
     def test_flujo_completo(self):
         """Flujo completo: crear, modificar, ordenar, estrategias"""
@@ -198,8 +1809,26 @@ def main():
     
     suite.addTests(loader.loadTestsFromTestCase(TestTask))
     suite.addTests(loader.loadTestsFromTestCase(TestStorage))
+    suite.addTests(loader.loadTestsFromTestCase(TestCargaStreaming))
+    suite.addTests(loader.loadTestsFromTestCase(TestEscrituraSegura))
+    suite.addTests(loader.loadTestsFromTestCase(TestVariosProcesos))
+    suite.addTests(loader.loadTestsFromTestCase(TestJournalStorage))
+    suite.addTests(loader.loadTestsFromTestCase(TestSQLiteStorage))
+    suite.addTests(loader.loadTestsFromTestCase(TestSnapshot))
+    suite.addTests(loader.loadTestsFromTestCase(TestEntradaSalidaAsincrona))
+    suite.addTests(loader.loadTestsFromTestCase(TestOperacionesEnLote))
+    suite.addTests(loader.loadTestsFromTestCase(TestLineaDeComandos))
+    suite.addTests(loader.loadTestsFromTestCase(TestAPI))
     suite.addTests(loader.loadTestsFromTestCase(TestTaskManager))
+    suite.addTests(loader.loadTestsFromTestCase(TestIndiceTaskManager))
+    suite.addTests(loader.loadTestsFromTestCase(TestIndicePrioridad))
+    suite.addTests(loader.loadTestsFromTestCase(TestConsultas))
+    suite.addTests(loader.loadTestsFromTestCase(TestBusqueda))
+    suite.addTests(loader.loadTestsFromTestCase(TestEstadisticas))
+    suite.addTests(loader.loadTestsFromTestCase(TestNotificaciones))
     suite.addTests(loader.loadTestsFromTestCase(TestStrategies))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetricas))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmarks))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegracion))
     
     runner = unittest.TextTestRunner(verbosity=1)
@@ -1,19 +1,73 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime
+import metrics
 from models import Task
+from priority_scheduler import DatePriorityScheduler
+
+
+# A partir de cuántas tareas la tabla pasa a modo virtual
+VIRTUAL_THRESHOLD = 5000
+# Filas que se piden de más por encima y por debajo de la ventana visible
+VIRTUAL_BUFFER = 50
+# Espera (ms) tras la última tecla antes de buscar
+SEARCH_DELAY_MS = 150
+# Cada cuánto (ms) se actualizan el resumen y las prioridades automáticas
+# aunque no haya cambios (cambio de día)
+SUMMARY_REFRESH_MS = 60_000
+# Cada cuánto (ms) se comprueba si otro proceso cambió el archivo de tareas
+EXTERNAL_CHECK_MS = 1000
 
 
 class TaskUI:
-    def __init__(self, task_manager):
+    def __init__(self, task_manager, virtual=None, worker=None, auto_priority=False):
         self.task_manager = task_manager
+        # worker (StorageWorker): si se indica, la carga y los guardados se
+        # hacen en segundo plano y la tabla se llena a medida que llegan datos
+        self.worker = worker
+        # Prioridad automática por fecha: DatePriorityScheduler activo
+        self._scheduler = None
         self.root = tk.Tk()
         self.root.title("Gestión de Tareas Inteligente")
         self.root.geometry("850x450")
 
+        # En modo virtual la tabla solo contiene las filas visibles; el resto
+        # se pide a TaskManager por páginas al desplazarse
+        self._auto_virtual = virtual is None
+        self.virtual = False
+        self._offset = 0
+        self._visible_rows = 20
+        self._total = 0
+        self._cache_offset = 0
+        self._cache = None
+
+        # Búsqueda: _filter es la lista de tareas encontradas (None = todas)
+        self._filter = None
+        self._search_job = None
+        # Recarga de cambios externos en curso (con worker)
+        self._reloading = False
+        self._reload_again = False
+        self._edited_while_reloading = False
+        search_frame = tk.Frame(self.root)
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+        tk.Label(search_frame, text="Buscar:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self._on_search_typed)
+        tk.Entry(search_frame, textvariable=self.search_var).pack(
+            side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        # Resumen: lee los totales que TaskManager mantiene al día
+        summary_frame = tk.LabelFrame(self.root, text="Resumen")
+        summary_frame.pack(fill=tk.X, padx=5)
+        self.summary = tk.Label(summary_frame, text="", anchor="w")
+        self.summary.pack(fill=tk.X, padx=5)
+
+        table = tk.Frame(self.root)
+        table.pack(fill=tk.BOTH, expand=True)
+
         # Tabla con columnas en español
         self.tree = ttk.Treeview(
-            self.root,
+            table,
             columns=("Título", "Descripción", "Categoría",
                      "Fecha límite", "Estado", "Prioridad"),
             show="headings"
@@ -32,59 +86,345 @@ class TaskUI:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=width)
 
+        self.scrollbar = ttk.Scrollbar(table, orient=tk.VERTICAL)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.tree.pack(fill=tk.BOTH, expand=True)
 
+        if virtual or (self._auto_virtual and task_manager.count() > VIRTUAL_THRESHOLD):
+            self._enable_virtual()
+        else:
+            self.scrollbar.configure(command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+
         # Botones
         frame = tk.Frame(self.root)
         frame.pack(pady=10)
 
-        tk.Button(frame, text="Agregar tarea",
-                  command=self.add_task).pack(side=tk.LEFT, padx=5)
-        tk.Button(frame, text="Editar tarea", command=self.edit_task).pack(
-            side=tk.LEFT, padx=5)
-        tk.Button(frame, text="Eliminar tarea",
-                  command=self.delete_task).pack(side=tk.LEFT, padx=5)
+        # Botones que modifican tareas (deshabilitados mientras se carga)
+        self._edit_buttons = [
+            tk.Button(frame, text="Agregar tarea", command=self.add_task),
+            tk.Button(frame, text="Editar tarea", command=self.edit_task),
+            tk.Button(frame, text="Eliminar tarea", command=self.delete_task),
+        ]
+        # Prioridad automática: se recalcula por fecha límite al activarla y
+        # luego solo lo que cambia con el paso de los días
+        self.auto_priority = tk.BooleanVar(value=auto_priority)
+        self._edit_buttons.append(tk.Checkbutton(
+            frame, text="Prioridad por fecha", variable=self.auto_priority,
+            command=self._toggle_auto_priority))
+        for button in self._edit_buttons:
+            button.pack(side=tk.LEFT, padx=5)
         # El botón de actualizar ahora solicita ordenamiento (sort=True)
         tk.Button(frame, text="Actualizar lista", command=lambda: self.refresh_list(
             sort=True)).pack(side=tk.LEFT, padx=5)
 
-        # Mostrar lista sin ordenar al inicio
+        self.status = tk.Label(self.root, text="", anchor="w")
+        self.status.pack(fill=tk.X, padx=5)
+
+        # Mostrar lista sin ordenar al inicio; después la tabla se
+        # actualiza con las notificaciones de cambios de TaskManager
         self.refresh_list(sort=False)
+        self._refresh_summary()
+        self.root.after(SUMMARY_REFRESH_MS, self._tick_summary)
+        self.task_manager.subscribe(self._on_task_change)
+
+        if self.worker is not None:
+            # Hasta que termine la carga no se permiten cambios: se
+            # guardarían sobre una lista de tareas incompleta
+            self._set_editing(False)
+            self.status.config(text="Cargando…")
+            self.worker.on_error = lambda e: messagebox.showerror(
+                "Error", f"Error de almacenamiento: {e}")
+            self.worker.stream(self.task_manager.storage.iter_all,
+                               on_batch=self.task_manager.add_loaded,
+                               on_done=self._on_loaded)
+            self.root.after(50, self._poll_io)
+        else:
+            self._toggle_auto_priority()
+            if hasattr(self.task_manager.storage, "changed"):
+                self.root.after(EXTERNAL_CHECK_MS, self._poll_external)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def run(self):
         self.root.mainloop()
 
+    # ===========================
+    # E/S EN SEGUNDO PLANO
+    # ===========================
+    def _poll_io(self):
+        # Los resultados del hilo de E/S se aplican aquí, en el hilo de Tk
+        self.worker.process_results(limit=20)
+        self.root.after(50, self._poll_io)
+
+    def _on_loaded(self, result, error):
+        if isinstance(error, ValueError):
+            # Archivo dañado a mitad de la lectura: load_all recupera la
+            # última copia buena y merge_external descarta lo ya cargado
+            self.worker.submit(self.task_manager.storage.load_all,
+                               callback=self._on_recovered)
+            return
+        if error is not None:
+            # Sin la carga completa los cambios siguen deshabilitados
+            self.status.config(text="")
+            messagebox.showerror("Error", f"No se pudieron cargar las tareas: {error}")
+            return
+        self._set_editing(True)
+        self._toggle_auto_priority()
+        self.status.config(text=f"{self.task_manager.count()} tareas")
+        if hasattr(self.task_manager.storage, "changed"):
+            self.root.after(EXTERNAL_CHECK_MS, self._poll_external)
+
+    def _on_recovered(self, tasks, error):
+        if error is not None:
+            self.status.config(text="")
+            messagebox.showerror("Error", f"No se pudieron cargar las tareas: {error}")
+            return
+        self.task_manager.merge_external(tasks)
+        self._on_loaded(None, None)
+
+    def _toggle_auto_priority(self):
+        # Arranca o detiene el programador según la casilla
+        if self.auto_priority.get() and self._scheduler is None:
+            self._scheduler = DatePriorityScheduler(self.task_manager)
+            self._scheduler.start()
+        elif not self.auto_priority.get() and self._scheduler is not None:
+            self._scheduler.stop()
+            self._scheduler = None
+
+    def _set_editing(self, enabled):
+        for button in self._edit_buttons:
+            button.config(state=tk.NORMAL if enabled else tk.DISABLED)
+
+    def _poll_external(self):
+        # Otra instancia pudo cambiar el archivo: se relee solo si cambió
+        if self.worker is None:
+            self.task_manager.reload_if_changed()
+        elif not self._reloading and (self._reload_again
+                                      or self.task_manager.storage.changed()):
+            # La lectura va a la cola del hilo de E/S, detrás de los guardados
+            self._reloading = True
+            self._reload_again = False
+            self._edited_while_reloading = False
+            self.worker.submit(self.task_manager.storage.load_changes,
+                               callback=self._on_external_loaded)
+        self.root.after(EXTERNAL_CHECK_MS, self._poll_external)
+
+    def _on_external_loaded(self, tasks, error):
+        self._reloading = False
+        # Si se editó algo mientras se leía, la lectura ya no sirve:
+        # se descarta y se vuelve a pedir en la próxima comprobación
+        if error is not None:
+            return
+        if self._edited_while_reloading:
+            self._reload_again = True
+            return
+        self.task_manager.merge_external(tasks)
+        self.status.config(text=f"{self.task_manager.count()} tareas")
+
+    def _on_close(self):
+        # Vaciar la cola de escrituras pendientes antes de cerrar
+        if hasattr(self.task_manager.storage, "close"):
+            self.task_manager.storage.close()
+        self.root.destroy()
+
+    @metrics.timed("ui_refresh_seconds")
     def refresh_list(self, sort=False):
 
         # Carga y muestra las tareas. Si sort=True, primero ordena por prioridad.
+        # Ordenar notifica "sorted" y la tabla se reordena con tree.move.
         if sort:
             # ordena de mayor prioridad a menor (reverse=True)
             self.task_manager.sort_tasks(reverse=True)
+            return
 
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        if self.virtual:
+            self._cache = None
+            self._render_window()
+            return
 
-        for task in self.task_manager.get_all_tasks():
-            # Manejo seguro de fecha (puede ser datetime o string)
-            try:
-                due = task.deadline.strftime(
-                    "%Y-%m-%d") if hasattr(task.deadline, "strftime") else str(task.deadline)
-            except Exception:
-                due = str(task.deadline)
-
-            self.tree.insert(
-                "",
-                "end",
-                iid=task.id,
-                values=(
-                    task.title,
-                    task.description,
-                    task.category,
-                    due,
-                    task.status,
-                    task.priority
-                )
-            )
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+
+        tasks = self._filter if self._filter is not None else self.task_manager.get_all_tasks()
+        for task in tasks:
+            self.tree.insert("", "end", iid=task.id, values=self._row_values(task))
+
+    # ===========================
+    # BÚSQUEDA
+    # ===========================
+    def _on_search_typed(self, *args):
+        # Espera a que se deje de escribir para no buscar en cada tecla
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        # La búsqueda usa el índice de TaskManager, no recorre la tabla
+        self._search_job = None
+        text = self.search_var.get().strip()
+        self._filter = self.task_manager.search(text) if text else None
+        self._offset = 0
+        self.refresh_list(sort=False)
+
+    def _on_task_change(self, event, payload):
+        # Aplica a la tabla solo el cambio notificado por TaskManager:
+        # una llamada a Tk por alta, edición o baja
+        if self._reloading and event in ("added", "updated", "deleted"):
+            self._edited_while_reloading = True
+        if event != "sorted":
+            self._refresh_summary()
+        if self._filter is not None:
+            # Con una búsqueda activa se repite la consulta (usa el índice)
+            if event == "loaded" and self._auto_virtual and not self.virtual \
+                    and self.task_manager.count() > VIRTUAL_THRESHOLD:
+                self._enable_virtual()
+            self._filter = self.task_manager.search(self.search_var.get().strip())
+            self.refresh_list(sort=False)
+            return
+
+        if event == "loaded" and not self.virtual:
+            if self._auto_virtual and self.task_manager.count() > VIRTUAL_THRESHOLD:
+                self._enable_virtual()
+            else:
+                # Solo las filas: el resumen ya se actualizó una vez por lote
+                for task in payload:
+                    self._show_row(task)
+            if self.worker is not None:
+                self.status.config(text=f"Cargando… {self.task_manager.count()} tareas")
+
+        if self.virtual:
+            # Solo se vuelve a pintar la ventana visible
+            self._cache = None
+            self._render_window()
+        elif event == "added" or event == "updated":
+            self._show_row(payload)
+        elif event == "deleted":
+            if self.tree.exists(payload):
+                self.tree.delete(payload)
+        elif event == "sorted":
+            for index, task in enumerate(self.task_manager.get_all_tasks()):
+                if self.tree.exists(task.id):
+                    self.tree.move(task.id, "", index)
+
+    def _show_row(self, task):
+        # Actualiza la fila de la tarea o la agrega al final
+        if self.tree.exists(task.id):
+            self.tree.item(task.id, values=self._row_values(task))
+        else:
+            self.tree.insert("", "end", iid=task.id, values=self._row_values(task))
+
+    # ===========================
+    # RESUMEN
+    # ===========================
+    def _refresh_summary(self):
+        # Solo lee contadores: no depende de la cantidad de tareas
+        stats = self.task_manager.statistics()
+        parts = [f"Total: {stats.total}"]
+        parts.extend(f"{status}: {count}" for status, count in sorted(stats.by_status().items()))
+        parts.append(f"Vencidas: {stats.overdue()}")
+        parts.append(f"Vencen esta semana: {stats.due_in_week()}")
+        self.summary.config(text="   ".join(parts))
+
+    def _tick_summary(self):
+        # Pasada la medianoche cambian las vencidas (y las prioridades por
+        # fecha) aunque nada se edite
+        if self._scheduler is not None:
+            self._scheduler.tick()
+        self._refresh_summary()
+        self.root.after(SUMMARY_REFRESH_MS, self._tick_summary)
+
+    # ===========================
+    # MODO VIRTUAL
+    # ===========================
+    def _enable_virtual(self):
+        self.virtual = True
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self._on_virtual_scroll)
+        self.tree.bind("<Configure>", self._on_virtual_resize)
+        self.tree.bind("<MouseWheel>", self._on_virtual_wheel)
+        self.tree.bind("<Button-4>", self._on_virtual_wheel)
+        self.tree.bind("<Button-5>", self._on_virtual_wheel)
+
+    def _render_window(self):
+        # Pinta las filas [offset, offset + visibles) pidiendo a TaskManager
+        # una página (con margen) solo si no está ya en la caché
+        if self._cache is None:
+            self._total = (len(self._filter) if self._filter is not None
+                           else self.task_manager.count())
+        self._offset = max(0, min(self._offset, self._total - self._visible_rows))
+
+        end = min(self._offset + self._visible_rows, self._total)
+        if (self._cache is None or self._offset < self._cache_offset
+                or end > self._cache_offset + len(self._cache)):
+            self._cache_offset = max(0, self._offset - VIRTUAL_BUFFER)
+            limit = self._visible_rows + 2 * VIRTUAL_BUFFER
+            if self._filter is not None:
+                self._cache = self._filter[self._cache_offset:self._cache_offset + limit]
+            else:
+                self._cache = self.task_manager.get_page(self._cache_offset, limit)
+
+        start = self._offset - self._cache_offset
+        window = self._cache[start:start + self._visible_rows]
+
+        selected = self.tree.selection()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for task in window:
+            self.tree.insert("", "end", iid=task.id, values=self._row_values(task))
+        self.tree.selection_set([iid for iid in selected if self.tree.exists(iid)])
+
+        if self._total:
+            self.scrollbar.set(self._offset / self._total, end / self._total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, offset):
+        if offset != self._offset:
+            self._offset = offset
+            self._render_window()
+
+    def _on_virtual_scroll(self, action, amount, unit=None):
+        # Recibe los comandos de la barra: ("moveto", fracción) o ("scroll", n, unidad)
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * self._total))
+        elif action == "scroll":
+            step = self._visible_rows if unit == "pages" else 1
+            self._scroll_to(self._offset + int(amount) * step)
+
+    def _on_virtual_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._offset - 3)
+        else:
+            self._scroll_to(self._offset + 3)
+        return "break"
+
+    def _on_virtual_resize(self, event):
+        # Cuántas filas caben según la altura de la tabla
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - row_height) // row_height)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render_window()
+
+    @staticmethod
+    def _row_values(task):
+        # Manejo seguro de fecha (puede ser datetime o string)
+        try:
+            due = task.deadline.strftime(
+                "%Y-%m-%d") if hasattr(task.deadline, "strftime") else str(task.deadline)
+        except Exception:
+            due = str(task.deadline)
+
+        return (
+            task.title,
+            task.description,
+            task.category,
+            due,
+            task.status,
+            task.priority
+        )
 
     def add_task(self):
         self._open_task_editor()
@@ -116,7 +456,6 @@ class TaskUI:
 
         if messagebox.askyesno("Confirmar", "¿Desea eliminar esta tarea?"):
             self.task_manager.delete_task(task_id)
-            self.refresh_list(sort=False)  # no ordenar automáticamente
 
     # ===========================
     # VENTANA PARA EDITAR O CREAR
@@ -165,24 +504,17 @@ class TaskUI:
                 except Exception:
                     deadline = deadline_str
 
+                # Se arma una tarea nueva (valida la fecha) antes de tocar la
+                # existente: si algo falla, la tarea mostrada queda intacta
+                new_task = Task(title, description, category, deadline,
+                                priority, status, task_id=task.id if task else None)
                 if task:
-                    # Actualizar tarea existente
-                    task.title = title
-                    task.description = description
-                    task.category = category
-                    task.status = status
-                    task.priority = priority
-                    task.deadline = deadline
-                    self.task_manager.update_task(task)
+                    # Reemplaza a la tarea existente (mismo id)
+                    self.task_manager.update_task(new_task)
                 else:
-                    # Nueva tarea
-                    new_task = Task(title, description, category,
-                                    deadline, priority, status)
                     self.task_manager.add_task(new_task)
 
                 editor.destroy()
-                # no ordenar automáticamente al guardar
-                self.refresh_list(sort=False)
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar: {e}")
 